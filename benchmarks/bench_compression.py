@@ -0,0 +1,135 @@
+"""
+Compare the wire size and latency of API calls with and without compression.
+
+Serves the stand-in behind a link of the given bandwidth, then reads a voice
+list, a history page and the TTS catalog once per response encoding, and
+uploads a WAV file to the voice changer once per request encoding:
+
+    python benchmarks/bench_compression.py --payload-size 2000 --mbps 20
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests.stand_in import make_app  # noqa: E402
+
+HOST = "127.0.0.1"
+PORT = 8772
+os.environ.setdefault("VOISPARK_API_URL", f"http://{HOST}:{PORT}")
+
+from voispark_mcp.api.history import get_history_list  # noqa: E402
+from voispark_mcp.api.tts import get_tts_models  # noqa: E402
+from voispark_mcp.api.voice_changer import change_voice  # noqa: E402
+from voispark_mcp.api.voices import list_all_voices  # noqa: E402
+from voispark_mcp.core import api_request  # noqa: E402
+from voispark_mcp.core.api_request import create_session  # noqa: E402
+from voispark_mcp.core.cache import invalidate  # noqa: E402
+from voispark_mcp.core.compression import ENCODINGS as CODECS  # noqa: E402
+from voispark_mcp.msg.voice_changer_msg import ChangeVoiceRequest  # noqa: E402
+
+ENCODINGS = ["identity"] + [encoding for encoding in CODECS if encoding != "deflate"]
+
+
+def _link(app: web.Application, mbps: float, sizes: dict) -> web.Application:
+    """Delay every exchange by the time its bodies take over the link."""
+
+    @web.middleware
+    async def link(request: web.Request, handler):
+        sent = await request.read()
+        response = await handler(request)
+        received = len(response.body) if isinstance(response, web.Response) else 0
+        sizes["request"], sizes["response"] = len(sent), received
+        await asyncio.sleep((len(sent) + received) * 8 / (mbps * 1e6))
+        return response
+
+    # Outermost, to see the bodies as they are on the wire
+    app.middlewares.insert(0, link)
+    return app
+
+
+def _write_wav(path: str, seconds: int, rate: int = 24000) -> None:
+    """A tone with noise, which compresses about as poorly as recorded speech."""
+    rng = random.Random(0)
+    with wave.open(path, "wb") as output:
+        output.setnchannels(1)
+        output.setsampwidth(2)
+        output.setframerate(rate)
+        output.writeframes(
+            b"".join(
+                struct.pack(
+                    "<h",
+                    int(8000 * math.sin(2 * math.pi * 220 * i / rate))
+                    + int(rng.gauss(0, 300)),
+                )
+                for i in range(rate * seconds)
+            )
+        )
+
+
+def _report(label: str, encoding: str, size: int, elapsed: float) -> None:
+    print(
+        f"{label:<14} {encoding:<9} wire={size / 1024:9.1f}KiB "
+        f"time={elapsed * 1000:8.1f}ms"
+    )
+
+
+async def main(payload_size: int, mbps: float, seconds: int) -> None:
+    sizes = {}
+    app = _link(make_app(payload_size=payload_size), mbps, sizes)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    reads = {
+        "voices": lambda session: list_all_voices("cartesia", "tts", session=session),
+        "history": lambda session: get_history_list("tts", session=session),
+        "tts_models": lambda session: get_tts_models(session=session),
+    }
+    file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    file.close()
+    session = create_session()
+    try:
+        for label, read in reads.items():
+            for encoding in ENCODINGS:
+                session.headers["Accept-Encoding"] = encoding
+                invalidate()
+                start = time.perf_counter()
+                assert isinstance(await read(session), dict)
+                _report(label, encoding, sizes["response"], time.perf_counter() - start)
+
+        _write_wav(file.name, seconds)
+        api_request.REQUEST_COMPRESSION_MIN_SIZE = 0
+        for encoding in ENCODINGS:
+            api_request.REQUEST_COMPRESSION = (
+                None if encoding == "identity" else encoding
+            )
+            request = ChangeVoiceRequest(
+                audio_data="", provider="p", model_id="m", voice_id="v"
+            )
+            start = time.perf_counter()
+            resp = await change_voice(request, audio_path=file.name, session=session)
+            assert isinstance(resp, dict), resp
+            _report("upload", encoding, sizes["request"], time.perf_counter() - start)
+    finally:
+        await session.close()
+        os.unlink(file.name)
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--payload-size", type=int, default=2000)
+    parser.add_argument("--mbps", type=float, default=20)
+    parser.add_argument("--seconds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.payload_size, args.mbps, args.seconds))
@@ -0,0 +1,96 @@
+"""
+Compare the ways of decoding a large voice list response.
+
+Decodes a `list_all_voices` response body with the given number of voices by
+decoding the text and validating it into models then dumping them to dicts
+(the original path), by validating the bytes into models then dumping them,
+and by validating the bytes straight into dicts with `decoder(..., as_dict=True)`.
+Then times `list_all_voices` end to end against the local stand-in:
+
+    python benchmarks/bench_decode.py --voices 10000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests.stand_in import make_app, make_voices  # noqa: E402
+
+HOST = "127.0.0.1"
+PORT = 8771
+os.environ.setdefault("VOISPARK_API_URL", f"http://{HOST}:{PORT}")
+
+from voispark_mcp.api.voices import list_all_voices  # noqa: E402
+from voispark_mcp.core.api_request import create_session  # noqa: E402
+from voispark_mcp.core.decode import decoder  # noqa: E402
+from voispark_mcp.msg.base_resp import BaseResponse  # noqa: E402
+from voispark_mcp.msg.voices_msg import VoicesListResponse  # noqa: E402
+
+
+def _time(fn, runs: int) -> list[float]:
+    fn()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _report(label: str, times: list[float]) -> None:
+    print(
+        f"{label:<32} median={statistics.median(times) * 1000:8.2f}ms "
+        f"min={min(times) * 1000:8.2f}ms"
+    )
+
+
+async def main(voices: int, runs: int) -> None:
+    data = {
+        "default_voices": make_voices("cartesia", voices),
+        "user_voices": [],
+        "ip_voices": [],
+    }
+    body = json.dumps({"code": 0, "message": "Success", "data": data}).encode()
+    print(f"{voices} voices, {len(body) / 1e6:.1f} MB")
+    model = BaseResponse[VoicesListResponse]
+    as_dict = decoder(model, as_dict=True)
+    _report(
+        "text, models, model_dump",
+        _time(lambda: model.model_validate_json(body.decode()).data.model_dump(), runs),
+    )
+    _report(
+        "bytes, models, model_dump",
+        _time(lambda: model.model_validate_json(body).data.model_dump(), runs),
+    )
+    _report("bytes, dicts", _time(lambda: as_dict(body)["data"], runs))
+
+    runner = web.AppRunner(make_app(payload_size=voices), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    session = create_session()
+    try:
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            resp = await list_all_voices("cartesia", "all", session=session)
+            times.append(time.perf_counter() - start)
+            assert len(resp["default_voices"]) == voices
+        _report("list_all_voices end to end", times)
+    finally:
+        await session.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--voices", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.voices, args.runs))
@@ -0,0 +1,214 @@
+"""
+Load test the MCP server end to end against the local stand-in.
+
+Starts the stand-in server, connects an in-memory MCP client to the server and
+calls a mix of tools and resources at the given concurrency, then prints the
+latency percentiles, throughput and failures of each operation and overall:
+
+    python benchmarks/bench_load.py --requests 2000 --concurrency 32 --latency 0.02
+    python benchmarks/bench_load.py --mix tools --error-rate 0.05 --no-cache
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests.stand_in import make_app  # noqa: E402
+
+HOST = "127.0.0.1"
+PORT = 8770
+os.environ.setdefault("VOISPARK_API_URL", f"http://{HOST}:{PORT}")
+os.environ.setdefault("VOISPARK_AUDIO_CACHE_DIR", tempfile.mkdtemp())
+if "--no-cache" in sys.argv:
+    os.environ["VOISPARK_CACHE_TTL"] = "0"
+
+from mcp.shared.exceptions import McpError  # noqa: E402
+from mcp.shared.memory import create_connected_server_and_client_session  # noqa: E402
+
+from voispark_mcp.main import _close_context, mcp  # noqa: E402
+
+AUDIO = "UklGR" + "A" * 4000
+
+# Resources read by the "resources" mix
+RESOURCES = [
+    "voices://providers",
+    "voices://cartesia/all/list",
+    "textToSpeech://models",
+    "voiceChanger://models",
+    "conversation://models",
+    "conversation://speakers",
+    "history://tts/list",
+]
+
+# Tools called by the "tools" mix, as (name, arguments)
+TOOLS = [
+    (
+        "generate_tts",
+        {
+            "provider": "cartesia",
+            "model_id": "model-0",
+            "voice_id": "cartesia-voice-0",
+            "text": "The quick brown fox jumps over the lazy dog.",
+        },
+    ),
+    (
+        "change_voice",
+        {
+            "provider": "elevenlabs",
+            "model_id": "model-0",
+            "voice_id": "elevenlabs-voice-0",
+            "audio_data": AUDIO,
+        },
+    ),
+    (
+        "generate_conversation",
+        {
+            "provider": "sesame",
+            "conversation": [
+                {"speaker_index": 0, "text": "How was your day?"},
+                {"speaker_index": 1, "text": "Great, thanks for asking."},
+            ],
+            "speaker": [
+                {"type": "speaker_id", "speaker": {"speaker_id": "speaker-0"}},
+                {"type": "speaker_id", "speaker": {"speaker_id": "speaker-1"}},
+            ],
+        },
+    ),
+    ("get_speaker_details", {"speaker_id": "speaker-0"}),
+]
+
+
+def _succeeded(text: str) -> bool:
+    """Whether a result is a JSON object, as opposed to an error message."""
+    try:
+        return isinstance(json.loads(text), (dict, list))
+    except ValueError:
+        return False
+
+
+async def _call(client, operation) -> bool:
+    try:
+        if isinstance(operation, str):
+            result = await client.read_resource(operation)
+            return _succeeded(result.contents[0].text)
+        name, arguments = operation
+        result = await client.call_tool(name, arguments)
+        return not result.isError and _succeeded(result.content[0].text)
+    except McpError:
+        return False
+
+
+def _label(operation) -> str:
+    return operation if isinstance(operation, str) else operation[0]
+
+
+def _report(label: str, latencies: list[float], failures: int, elapsed: float):
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+    p50, p95, p99 = (
+        (quantiles[49], quantiles[94], quantiles[98]) if quantiles else latencies * 3
+    )
+    print(
+        f"{label:<28} n={len(latencies):6d} "
+        f"p50={p50 * 1000:8.2f}ms p95={p95 * 1000:8.2f}ms p99={p99 * 1000:8.2f}ms "
+        f"rps={len(latencies) / elapsed:8.1f} failed={failures}"
+    )
+
+
+async def main(
+    requests: int,
+    concurrency: int,
+    mix: str,
+    latency: float,
+    error_rate: float,
+    payload_size: int,
+) -> None:
+    operations = {
+        "resources": RESOURCES,
+        "tools": TOOLS,
+        "mixed": RESOURCES + TOOLS,
+    }[mix]
+    schedule = random.Random(0).choices(operations, k=requests)
+    runner = web.AppRunner(
+        make_app(latency, 0.0, error_rate, payload_size, seed=0), access_log=None
+    )
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    latencies: dict[str, list[float]] = defaultdict(list)
+    failures: dict[str, int] = defaultdict(int)
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        async with create_connected_server_and_client_session(
+            mcp._mcp_server
+        ) as client:
+
+            async def one(operation) -> None:
+                async with semaphore:
+                    start = time.perf_counter()
+                    succeeded = await _call(client, operation)
+                    latencies[_label(operation)].append(time.perf_counter() - start)
+                    if not succeeded:
+                        failures[_label(operation)] += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one(operation) for operation in schedule))
+            elapsed = time.perf_counter() - start
+    finally:
+        await _close_context()
+        await runner.cleanup()
+
+    for label in sorted(latencies):
+        _report(label, latencies[label], failures[label], elapsed)
+    _report(
+        f"all c={concurrency}",
+        [value for values in latencies.values() for value in values],
+        sum(failures.values()),
+        elapsed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--mix", choices=("resources", "tools", "mixed"), default="mixed"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Stand-in latency in seconds"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Probability that a stand-in request fails with HTTP 503",
+    )
+    parser.add_argument(
+        "--payload-size",
+        type=int,
+        default=20,
+        help="Voices, history entries and speakers per stand-in list",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Disable the catalog caches"
+    )
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.requests,
+            args.concurrency,
+            args.mix,
+            args.latency,
+            args.error_rate,
+            args.payload_size,
+        )
+    )
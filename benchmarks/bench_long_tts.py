@@ -0,0 +1,98 @@
+"""
+Measure long-form TTS at increasing chunk concurrency.
+
+Runs `generate_tts_long` on a chapter-length text against the local stand-in,
+whose generation time grows with the text length, and prints the time to the
+first ready chunk and the total wall time for every concurrency:
+
+    python benchmarks/bench_long_tts.py --sentences 60 --char-latency 0.0005
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests.stand_in import make_app  # noqa: E402
+
+HOST = "127.0.0.1"
+PORT = 8768
+os.environ.setdefault("VOISPARK_API_URL", f"http://{HOST}:{PORT}")
+
+from voispark_mcp.api.tts import generate_tts, generate_tts_long  # noqa: E402
+from voispark_mcp.core.api_request import (  # noqa: E402
+    create_download_session,
+    create_session,
+    download,
+)
+from voispark_mcp.msg.tts_msg import GenerateTTSRequest  # noqa: E402
+
+SENTENCE = "The quick brown fox jumps over the lazy dog near the quiet river bank."
+
+
+async def _single(text: str, sessions) -> None:
+    request = GenerateTTSRequest(text=text, provider="p", model_id="m", voice_id="v")
+    start = time.perf_counter()
+    resp = await generate_tts(request, session=sessions[0])
+    await download(resp["details"]["url"], session=sessions[1])
+    elapsed = time.perf_counter() - start
+    print(
+        f"single request  chunks=1    "
+        f"first={elapsed * 1000:8.1f}ms total={elapsed * 1000:8.1f}ms"
+    )
+
+
+async def _run(text: str, max_chars: int, concurrency: int, sessions) -> None:
+    request = GenerateTTSRequest(text=text, provider="p", model_id="m", voice_id="v")
+    start = time.perf_counter()
+    first = None
+
+    async def on_chunk(index, total, task):
+        nonlocal first
+        if first is None:
+            first = time.perf_counter() - start
+
+    resp = await generate_tts_long(
+        request,
+        max_chars,
+        concurrency,
+        on_chunk=on_chunk,
+        session=sessions[0],
+        download_session=sessions[1],
+    )
+    elapsed = time.perf_counter() - start
+    assert isinstance(resp, dict), resp
+    os.unlink(resp["path"])
+    print(
+        f"concurrency={concurrency:<3} chunks={len(resp['chunks']):<4} "
+        f"first={first * 1000:8.1f}ms total={elapsed * 1000:8.1f}ms"
+    )
+
+
+async def main(sentences: int, max_chars: int, char_latency: float) -> None:
+    runner = web.AppRunner(make_app(0.02, char_latency), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    sessions = (create_session(), create_download_session())
+    text = " ".join([SENTENCE] * sentences)
+    try:
+        await _single(text, sessions)
+        for concurrency in (1, 2, 4, 8, 16):
+            await _run(text, max_chars, concurrency, sessions)
+    finally:
+        for session in sessions:
+            await session.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sentences", type=int, default=60)
+    parser.add_argument("--max-chars", type=int, default=300)
+    parser.add_argument("--char-latency", type=float, default=0.0005)
+    args = parser.parse_args()
+    asyncio.run(main(args.sentences, args.max_chars, args.char_latency))
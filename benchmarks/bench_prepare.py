@@ -0,0 +1,106 @@
+"""
+Compare uploading a 48 kHz stereo WAV as it is against preparing it first.
+
+Writes a WAV of the given length and sends it with `change_voice` to a
+stand-in `/api/voice_changer/change` route that holds the response for the
+time the body would take over an uplink of the given bandwidth, then prints
+the uploaded bytes and the wall time of each upload:
+
+    python benchmarks/bench_prepare.py --seconds 60 --mbps 20
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests.stand_in import make_app  # noqa: E402
+
+HOST = "127.0.0.1"
+PORT = 8769
+os.environ.setdefault("VOISPARK_API_URL", f"http://{HOST}:{PORT}")
+# The "asis" provider uploads audio as it is, the "prepared" one at 24 kHz
+os.environ["VOISPARK_UPLOAD_SAMPLE_RATE_ASIS"] = "0"
+os.environ["VOISPARK_UPLOAD_SAMPLE_RATE_PREPARED"] = "24000"
+
+from voispark_mcp.api.voice_changer import change_voice  # noqa: E402
+from voispark_mcp.core.api_request import create_session  # noqa: E402
+from voispark_mcp.core.audio_prep import numpy  # noqa: E402
+from voispark_mcp.msg.voice_changer_msg import ChangeVoiceRequest  # noqa: E402
+
+
+def _write_wav(path: str, seconds: int, rate: int = 48000) -> None:
+    with wave.open(path, "wb") as output:
+        output.setnchannels(2)
+        output.setsampwidth(2)
+        output.setframerate(rate)
+        for second in range(seconds):
+            frames = bytearray()
+            for index in range(rate):
+                value = int(16000 * math.sin(2 * math.pi * 220 * index / rate))
+                frames += struct.pack("<hh", value, value)
+            output.writeframes(frames)
+
+
+def _throttled(app: web.Application, mbps: float, sizes: list) -> web.Application:
+    @web.middleware
+    async def uplink(request: web.Request, handler):
+        body = await request.read()
+        sizes.append(len(body))
+        await asyncio.sleep(len(body) * 8 / (mbps * 1e6))
+        return await handler(request)
+
+    app.middlewares.append(uplink)
+    return app
+
+
+async def main(seconds: int, mbps: float, repeat: int) -> None:
+    if numpy() is None:
+        sys.exit('NumPy is required: pip install "voispark-mcp[audio]"')
+    sizes = []
+    runner = web.AppRunner(_throttled(make_app(), mbps, sizes), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    file.close()
+    try:
+        _write_wav(file.name, seconds)
+        session = create_session()
+        try:
+            for _ in range(repeat):
+                for label, provider in (("as-is", "asis"), ("prepared", "prepared")):
+                    request = ChangeVoiceRequest(
+                        audio_data="", provider=provider, model_id="m", voice_id="v"
+                    )
+                    start = time.perf_counter()
+                    resp = await change_voice(
+                        request, audio_path=file.name, session=session
+                    )
+                    elapsed = time.perf_counter() - start
+                    assert isinstance(resp, dict), resp
+                    print(
+                        f"{label:<9} uploaded={sizes[-1] / 1024**2:7.2f}MiB "
+                        f"time={elapsed * 1000:8.1f}ms"
+                    )
+        finally:
+            await session.close()
+    finally:
+        os.unlink(file.name)
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--mbps", type=float, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.mbps, args.repeat))
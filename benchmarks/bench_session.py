@@ -0,0 +1,82 @@
+"""
+Compare a one-shot ClientSession per call against the pooled session.
+
+Starts the local stand-in server and issues `list_all_voices` calls through
+both paths, sequentially and with concurrency, then prints latency
+percentiles and throughput. Each call uses a distinct provider id so that
+concurrent requests are not coalesced:
+
+    python benchmarks/bench_session.py --requests 500 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests.stand_in import make_app  # noqa: E402
+
+HOST = "127.0.0.1"
+PORT = 8766
+os.environ.setdefault("VOISPARK_API_URL", f"http://{HOST}:{PORT}")
+
+from voispark_mcp.api.voices import list_all_voices  # noqa: E402
+from voispark_mcp.core.api_request import create_session  # noqa: E402
+
+
+async def _run(requests: int, concurrency: int, session) -> tuple[list[float], float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(index: int):
+        async with semaphore:
+            start = time.perf_counter()
+            resp = await list_all_voices(f"provider-{index}", "tts", session=session)
+            latencies.append(time.perf_counter() - start)
+            assert isinstance(resp, dict), resp
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+def _report(label: str, latencies: list[float], elapsed: float) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<24} p50={quantiles[49] * 1000:7.2f}ms "
+        f"p95={quantiles[94] * 1000:7.2f}ms "
+        f"mean={statistics.fmean(latencies) * 1000:7.2f}ms "
+        f"rps={len(latencies) / elapsed:9.1f}"
+    )
+
+
+async def main(requests: int, concurrency: int, latency: float) -> None:
+    runner = web.AppRunner(make_app(latency), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    try:
+        for c in (1, concurrency):
+            _report(f"one-shot   c={c}", *await _run(requests, c, None))
+            session = create_session()
+            try:
+                _report(f"pooled     c={c}", *await _run(requests, c, session))
+            finally:
+                await session.close()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Stand-in latency in seconds"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
@@ -0,0 +1,90 @@
+"""
+Measure the cold start of the stdio server.
+
+Spawns `python -m voispark_mcp` repeatedly, as an orchestrator starting one
+server per session would, and prints the time to import `voispark_mcp.main`
+and the time from spawning the process to the first `list_tools` response,
+with an empty and with a warm tool schema cache:
+
+    python benchmarks/bench_startup.py --runs 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+IMPORT = (
+    "import time; start = time.perf_counter(); import voispark_mcp.main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def _import_time(env: dict) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(output.stdout)
+
+
+async def _first_list_tools(env: dict) -> float:
+    server = StdioServerParameters(
+        command=sys.executable, args=["-m", "voispark_mcp"], env=env
+    )
+    start = time.perf_counter()
+    async with stdio_client(server) as (read, write):
+        async with ClientSession(read, write) as client:
+            await client.initialize()
+            tools = await client.list_tools()
+            elapsed = time.perf_counter() - start
+    assert tools.tools
+    return elapsed
+
+
+def _report(label: str, values: list[float]) -> None:
+    print(
+        f"{label:<32} median={statistics.median(values) * 1000:8.1f}ms "
+        f"min={min(values) * 1000:8.1f}ms max={max(values) * 1000:8.1f}ms"
+    )
+
+
+async def main(runs: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        schema_cache = os.path.join(directory, "schemas.json")
+        env = {
+            **os.environ,
+            "VOISPARK_SCHEMA_CACHE_PATH": schema_cache,
+            # Measure the server itself, not the catalog warm-up against the API
+            "VOISPARK_WARMUP": "0",
+            "VOISPARK_API_URL": "http://127.0.0.1:9",
+        }
+        cold_imports, warm_imports, cold_starts, warm_starts = [], [], [], []
+        for _ in range(runs):
+            if os.path.exists(schema_cache):
+                os.remove(schema_cache)
+            cold_imports.append(_import_time(env))
+            cold_starts.append(await _first_list_tools(env))
+            warm_imports.append(_import_time(env))
+            warm_starts.append(await _first_list_tools(env))
+        _report("import, no schema cache", cold_imports)
+        _report("import, schema cache", warm_imports)
+        _report("first list_tools, no cache", cold_starts)
+        _report("first list_tools, schema cache", warm_starts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs))
@@ -0,0 +1,86 @@
+"""
+Compare uploading audio inline as base64 against streaming it from a file.
+
+Writes a random audio file of the given size and sends it to the stand-in
+`/api/voice_changer/change` route both ways, then prints the wall time and
+the peak Python memory allocated during each upload:
+
+    python benchmarks/bench_upload.py --size-mb 20
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests.stand_in import make_app  # noqa: E402
+
+HOST = "127.0.0.1"
+PORT = 8767
+os.environ.setdefault("VOISPARK_API_URL", f"http://{HOST}:{PORT}")
+
+from voispark_mcp.api.voice_changer import change_voice  # noqa: E402
+from voispark_mcp.core.api_request import create_session  # noqa: E402
+from voispark_mcp.msg.voice_changer_msg import ChangeVoiceRequest  # noqa: E402
+
+
+async def _inline(audio_path: str, session) -> dict:
+    with open(audio_path, "rb") as file:
+        audio_data = base64.b64encode(file.read()).decode()
+    request = ChangeVoiceRequest(
+        audio_data=audio_data, provider="elevenlabs", model_id="m", voice_id="v"
+    )
+    return await change_voice(request, session=session)
+
+
+async def _streamed(audio_path: str, session) -> dict:
+    request = ChangeVoiceRequest(
+        audio_data="", provider="elevenlabs", model_id="m", voice_id="v"
+    )
+    return await change_voice(request, audio_path=audio_path, session=session)
+
+
+async def _measure(label: str, upload, audio_path: str, session) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    resp = await upload(audio_path, session)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert isinstance(resp, dict), resp
+    print(f"{label:<10} time={elapsed * 1000:8.1f}ms peak={peak / 1024**2:8.1f}MiB")
+
+
+async def main(size_mb: int, repeat: int) -> None:
+    runner = web.AppRunner(make_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+    file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    try:
+        file.write(os.urandom(size_mb * 1024**2))
+        file.close()
+        session = create_session()
+        try:
+            for _ in range(repeat):
+                await _measure("inline", _inline, file.name, session)
+                await _measure("streamed", _streamed, file.name, session)
+        finally:
+            await session.close()
+    finally:
+        os.unlink(file.name)
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mb, args.repeat))
@@ -1,4 +1,10 @@
-from voispark_mcp.main import main
+def main():
+    """Entry point for the voispark_mcp command."""
+    # Imported here so that importing a submodule does not load the whole server
+    from voispark_mcp.main import main as run
+
+    run()
+
 
 if __name__ == "__main__":
     main()
@@ -1,34 +1,118 @@
-from voispark_mcp.core.api_request import get, post
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Optional
+
+from aiohttp import ClientSession
+
+from voispark_mcp.core.api_request import download, get, post
+from voispark_mcp.core.audio_file import output_path
+from voispark_mcp.core.audio_prep import prepare_base64
+from voispark_mcp.core.audio_stitch import stitch_audio
+from voispark_mcp.core.cache import cached
 from voispark_mcp.core.error_code import ErrorCode
+from voispark_mcp.core.metrics import timed
+from voispark_mcp.core.retry import backoff_delay
+from voispark_mcp.core.settings import CONVERSATION_LONG_CONCURRENCY
 from voispark_mcp.msg.base_resp import BaseResponse
 from voispark_mcp.msg.conversation_msg import (
     ConversationModelsResponse,
+    ConversationSegment,
+    ConversationTurn,
     GenerateConversationRequest,
     GenerateConversationResponse,
+    GenerateLongConversationResponse,
     GetSpeakerDetailsResponse,
     GetSpeakersResponse,
+    SpeakerRawItem,
+)
+
+# Most turns and characters of one segment of a long conversation
+CONVERSATION_SEGMENT_TURNS = int(os.getenv("VOISPARK_CONVERSATION_SEGMENT_TURNS") or 8)
+CONVERSATION_SEGMENT_CHARS = int(
+    os.getenv("VOISPARK_CONVERSATION_SEGMENT_CHARS") or 1000
 )
+CONVERSATION_LONG_MAX_CONCURRENCY = int(
+    os.getenv("VOISPARK_CONVERSATION_LONG_MAX_CONCURRENCY") or 16
+)
+# Attempts of one segment, including the first one
+CONVERSATION_SEGMENT_ATTEMPTS = int(
+    os.getenv("VOISPARK_CONVERSATION_SEGMENT_ATTEMPTS") or 3
+)
+
+
+def split_turns(
+    turns: list[ConversationTurn], max_turns: int, max_chars: int
+) -> list[list[ConversationTurn]]:
+    """
+    Split a conversation into segments of consecutive turns with at most
+    max_turns turns and, unless a single turn is longer, max_chars characters.
+    """
+    segments: list[list[ConversationTurn]] = []
+    chars = 0
+    for turn in turns:
+        if segments and (
+            len(segments[-1]) < max_turns and chars + len(turn.text) <= max_chars
+        ):
+            segments[-1].append(turn)
+            chars += len(turn.text)
+        else:
+            segments.append([turn])
+            chars = len(turn.text)
+    return segments
 
 
-async def get_conversation_models():
+async def _prepare_speakers(
+    request: GenerateConversationRequest,
+) -> GenerateConversationRequest:
+    """The request with the audio of its raw speakers prepared for upload."""
+    speakers = []
+    for item in request.speaker:
+        if isinstance(item.speaker, SpeakerRawItem):
+            audio = await prepare_base64(item.speaker.audio, request.provider)
+            speaker = item.speaker.model_copy(update={"audio": audio})
+            item = item.model_copy(update={"speaker": speaker})
+        speakers.append(item)
+    return request.model_copy(update={"speaker": speakers})
+
+
+@cached("conversation_models")
+@timed("api")
+async def get_conversation_models(session: Optional[ClientSession] = None):
     resp = await get(
         "/api/conversation/models",
         response_model=BaseResponse[ConversationModelsResponse],
+        session=session,
+        as_dict=True,
     )
     if resp is None:
         return "Failed to get conversation models"
-    if resp.code != ErrorCode.SUCCESS.code:
+    if resp["code"] != ErrorCode.SUCCESS.code:
         return "Failed to get conversation models"
-    if resp.data is None:
+    if resp["data"] is None:
         return "No conversation models found"
-    return resp.data.model_dump()
+    return resp["data"]
+
 
+@timed("api")
+async def generate_conversation(
+    request: GenerateConversationRequest, session: Optional[ClientSession] = None
+):
+    return await _generate(await _prepare_speakers(request), session)
 
-async def generate_conversation(request: GenerateConversationRequest):
+
+async def _generate(
+    request: GenerateConversationRequest, session: Optional[ClientSession]
+):
+    """Generate a conversation whose raw speakers are prepared already."""
     resp = await post(
         "/api/conversation/generate",
         data=request,
         response_model=BaseResponse[GenerateConversationResponse],
+        session=session,
+        provider=request.provider,
+        # Conversation models have no credit multiplier
+        cost=sum(len(turn.text) for turn in request.conversation),
     )
     if resp is None:
         return "Failed to generate conversation"
@@ -39,29 +123,148 @@ async def generate_conversation(request: GenerateConversationRequest):
     return resp.data.model_dump()
 
 
-async def get_speaker_details(speaker_id: str):
+@timed("api")
+async def get_speaker_details(speaker_id: str, session: Optional[ClientSession] = None):
     resp = await get(
         f"/api/conversation/speakers/{speaker_id}",
         response_model=BaseResponse[GetSpeakerDetailsResponse],
+        session=session,
+        as_dict=True,
     )
     if resp is None:
         return "Failed to get speaker details"
-    if resp.code != ErrorCode.SUCCESS.code:
+    if resp["code"] != ErrorCode.SUCCESS.code:
         return "Failed to get speaker details"
-    if resp.data is None:
+    if resp["data"] is None:
         return "No speaker details found"
-    return resp.data.model_dump()
+    return resp["data"]
 
 
-async def get_speakers():
+@cached("conversation_speakers")
+@timed("api")
+async def get_speakers(session: Optional[ClientSession] = None):
     resp = await get(
         "/api/conversation/speakers",
         response_model=BaseResponse[GetSpeakersResponse],
+        session=session,
+        as_dict=True,
     )
     if resp is None:
         return "Failed to get speakers"
-    if resp.code != ErrorCode.SUCCESS.code:
+    if resp["code"] != ErrorCode.SUCCESS.code:
         return "Failed to get speakers"
-    if resp.data is None:
+    if resp["data"] is None:
         return "No speakers found"
-    return resp.data.model_dump()
+    return resp["data"]
+
+
+@timed("api")
+async def generate_conversation_long(
+    request: GenerateConversationRequest,
+    max_turns: Optional[int] = None,
+    concurrency: int = CONVERSATION_LONG_CONCURRENCY,
+    on_segment: Optional[
+        Callable[[int, int, GenerateConversationResponse], Awaitable[None]]
+    ] = None,
+    session: Optional[ClientSession] = None,
+    download_session: Optional[ClientSession] = None,
+):
+    """
+    Generate a long conversation as segments of consecutive turns, generated
+    concurrently and stitched in turn order into one local file.
+
+    Every segment is sent with the whole speaker list, so speaker indices
+    and voices are the same in all segments. A failed segment is retried on
+    its own, up to CONVERSATION_SEGMENT_ATTEMPTS attempts.
+
+    Args:
+        max_turns: Most turns per segment, CONVERSATION_SEGMENT_TURNS by default
+        on_segment: Awaited with the index, the number of segments and the task
+            of every segment once its audio has been downloaded
+
+    Returns:
+        A GenerateLongConversationResponse dict
+    """
+    segments = split_turns(
+        request.conversation,
+        max(1, max_turns or CONVERSATION_SEGMENT_TURNS),
+        CONVERSATION_SEGMENT_CHARS,
+    )
+    if not segments:
+        return "No conversation turns to generate"
+    # Once for all segments and their retries
+    request = await _prepare_speakers(request)
+    semaphore = asyncio.Semaphore(
+        max(1, min(concurrency, CONVERSATION_LONG_MAX_CONCURRENCY))
+    )
+
+    async def attempt(
+        turns: list[ConversationTurn],
+    ) -> tuple[GenerateConversationResponse, bytes]:
+        resp = await _generate(
+            request.model_copy(update={"conversation": turns, "sync": True}),
+            session,
+        )
+        if isinstance(resp, str):
+            raise RuntimeError(resp)
+        task = GenerateConversationResponse.model_validate(resp)
+        if task.status != "success" or task.details is None:
+            raise RuntimeError(task.error or "No audio received")
+        return task, await download(task.details.url, session=download_session)
+
+    async def generate(index: int, turns: list[ConversationTurn]):
+        async with semaphore:
+            for number in range(CONVERSATION_SEGMENT_ATTEMPTS):
+                try:
+                    task, audio = await attempt(turns)
+                    break
+                except Exception as e:
+                    if number + 1 == CONVERSATION_SEGMENT_ATTEMPTS:
+                        raise
+                    logging.warning(
+                        "Retrying conversation segment %d after attempt %d: %r",
+                        index,
+                        number + 1,
+                        e,
+                    )
+                    await asyncio.sleep(backoff_delay(number))
+        if on_segment is not None:
+            await on_segment(index, len(segments), task)
+        return task, audio, number + 1
+
+    jobs = [asyncio.create_task(generate(i, turns)) for i, turns in enumerate(segments)]
+    try:
+        results = []
+        for index, job in enumerate(jobs):
+            try:
+                results.append(await job)
+            except Exception as e:
+                logging.exception(
+                    "Failed to generate audio for conversation segment %d", index
+                )
+                return f"Failed to generate conversation segment {index}: {e}"
+    finally:
+        for job in jobs:
+            job.cancel()
+
+    formats = [task.details.format for task, _, _ in results]
+    path = output_path(formats[0].container)
+    try:
+        await asyncio.to_thread(
+            stitch_audio, [audio for _, audio, _ in results], formats, path
+        )
+    except ValueError as e:
+        return f"Failed to stitch conversation audio: {e}"
+    first_turns = [0]
+    for turns in segments[:-1]:
+        first_turns.append(first_turns[-1] + len(turns))
+    return GenerateLongConversationResponse(
+        path=str(path),
+        format=formats[0],
+        segments=[
+            ConversationSegment(
+                first_turn=first, turns=len(turns), attempts=attempts, task=task
+            )
+            for first, turns, (task, _, attempts) in zip(first_turns, segments, results)
+        ],
+    ).model_dump()
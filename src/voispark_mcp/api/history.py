@@ -1,36 +1,257 @@
-from typing import Literal
+import asyncio
+import logging
+import os
+from typing import AsyncIterator, Literal, Optional
+
+from aiohttp import ClientSession
+
 from voispark_mcp.core.api_request import get
 from voispark_mcp.core.error_code import ErrorCode
+from voispark_mcp.core.history_index import HISTORY_SOURCES, HistoryIndex, timestamp
+from voispark_mcp.core.metrics import timed
 from voispark_mcp.msg.base_resp import BaseResponse
 from voispark_mcp.msg.history_msg import HistoryListResponse, HistoryResponse
 
+# Entries per page of the history list, and the largest page a caller may ask for
+HISTORY_PAGE_SIZE = int(os.getenv("VOISPARK_HISTORY_PAGE_SIZE") or 50)
+HISTORY_MAX_PAGE_SIZE = int(os.getenv("VOISPARK_HISTORY_MAX_PAGE_SIZE") or 500)
+
+
+class HistoryPageError(Exception):
+    """Raised by `iter_history` when a page cannot be fetched."""
+
+
+# Windows a page may be fetched from before its start is found, see `get_history_list`
+_HISTORY_PAGE_ATTEMPTS = 3
+
+
+def _cursor(offset: int, entry: dict) -> str:
+    """A cursor for the entries after entry, which was at offset."""
+    return f"{offset}:{entry['created_at']}:{entry['history_id']}"
 
+
+def _parse_cursor(cursor: Optional[str]) -> tuple[int, Optional[tuple[int, str]]]:
+    """
+    The offset of a cursor, and the created_at and history_id of the entry
+    before it. A plain offset is accepted too, without that entry.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return 0, None
+    offset, *last = cursor.split(":", 2)
+    if len(last) == 1:
+        raise ValueError(cursor)
+    return max(int(offset), 0), (int(last[0]), last[1]) if last else None
+
+
+def _start(entries: list[dict], last: tuple[int, str]) -> Optional[int]:
+    """
+    The index of the first entry after last in a window of a newest first
+    history: len(entries) if the window ends before it, or None if the window
+    starts after it.
+    """
+    created_at, history_id = last
+    for index, entry in enumerate(entries):
+        if entry["history_id"] == history_id:
+            return index + 1
+        if entry["created_at"] < created_at:
+            return index or None
+    return len(entries)
+
+
+@timed("api")
 async def get_history_list(
     source: Literal["tts", "voice_changer", "conversation"] = "tts",
+    session: Optional[ClientSession] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
 ):
-    resp = await get(
-        "/api/history/list",
-        query={"source": source},
-        response_model=BaseResponse[HistoryListResponse],
+    """
+    Get one page of the history of a source, newest first.
+
+    The page is requested from the server with offset and limit. The cursor
+    also holds the created_at and id of the last entry of the previous page,
+    and the page starts right after that entry, fetched from one entry
+    earlier: entries added or deleted since then shift it, so that a plain
+    offset would repeat or skip entries. If the entry is not in the window, a
+    later or earlier one is fetched, up to _HISTORY_PAGE_ATTEMPTS windows in
+    all, and then the page starts at the offset of the cursor.
+
+    If the server returns the whole list instead, the page is cut from it. The
+    whole list is then downloaded for every page, so paging does not reduce
+    the transfer.
+
+    Args:
+        cursor: The next_cursor of the previous page, or None for the first page
+        limit: Entries per page, HISTORY_PAGE_SIZE by default and at most
+            HISTORY_MAX_PAGE_SIZE
+
+    Returns:
+        The page as a HistoryListResponse dict, whose next_cursor is None on
+        the last page
+    """
+    try:
+        offset, last = _parse_cursor(cursor)
+    except ValueError:
+        return f"Invalid history cursor: {cursor}"
+    limit = min(max(limit or HISTORY_PAGE_SIZE, 1), HISTORY_MAX_PAGE_SIZE)
+    # The entry before the page is fetched too, to find where the page starts
+    window = max(offset - 1, 0) if last else offset
+    fetched = limit + 1 if last else limit
+    for _ in range(_HISTORY_PAGE_ATTEMPTS):
+        resp = await get(
+            "/api/history/list",
+            query={"source": source, "offset": window, "limit": fetched},
+            response_model=BaseResponse[HistoryListResponse],
+            session=session,
+            as_dict=True,
+        )
+        if resp is None:
+            return "Failed to get history list"
+        if resp["code"] != ErrorCode.SUCCESS.code:
+            return "Failed to get history list"
+        if resp["data"] is None:
+            return "No history list found"
+        entries = resp["data"]["history_list"]
+        total = resp["data"]["total"]
+        # A server that ignores offset and limit returns the whole list
+        if len(entries) > fetched or (window and len(entries) >= total > 0):
+            window = 0
+        if last is None:
+            start = offset - window
+            break
+        start = _start(entries, last)
+        if start is None and window:
+            # Entries before it were deleted: the window grows to keep its end
+            fetched += window - max(window - limit, 0)
+            window = max(window - limit, 0)
+        elif start == len(entries) and window + start < total:
+            # More entries were added than the window holds
+            window += start
+        else:
+            break
+    else:
+        # The entry was not found: fall back to the offset of the cursor
+        start = min(max(offset - window, 0), len(entries))
+    start = start or 0
+    entries = entries[start : start + limit]
+    offset = window + start
+    end = offset + len(entries)
+    # The response may be shared by coalesced requests, so it is copied
+    return {
+        **resp["data"],
+        "history_list": entries,
+        "offset": offset,
+        "next_cursor": (_cursor(end, entries[-1]) if entries and end < total else None),
+    }
+
+
+async def iter_history(
+    source: Literal["tts", "voice_changer", "conversation"] = "tts",
+    session: Optional[ClientSession] = None,
+    page_size: Optional[int] = None,
+) -> AsyncIterator[dict]:
+    """
+    Iterate over the history of a source, newest first, fetching each page
+    only once the entries of the previous one have been consumed.
+
+    Raises:
+        HistoryPageError: If a page cannot be fetched
+    """
+    cursor = None
+    while True:
+        page = await get_history_list(
+            source, session=session, cursor=cursor, limit=page_size
+        )
+        if isinstance(page, str):
+            raise HistoryPageError(page)
+        for entry in page["history_list"]:
+            yield entry
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return
+
+
+@timed("api")
+async def search_history(
+    index: HistoryIndex,
+    query: Optional[str] = None,
+    source: Optional[Literal["tts", "voice_changer", "conversation"]] = None,
+    provider: Optional[str] = None,
+    voice_id: Optional[str] = None,
+    model_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 20,
+    refresh: bool = False,
+    session: Optional[ClientSession] = None,
+):
+    """
+    Search the local history index, first syncing the new entries of the
+    searched sources that were not synced within the sync interval.
+
+    If a sync fails, the source is searched as indexed so far and listed
+    under stale_sources.
+
+    Args:
+        since: ISO 8601 date or datetime of the earliest entry, inclusive
+        until: ISO 8601 date or datetime after the latest entry, exclusive
+        refresh: Sync the searched sources even if they were synced recently
+
+    Returns:
+        The matching entries newest first, each with its source
+    """
+    try:
+        since_ts = timestamp(since) if since else None
+        until_ts = timestamp(until) if until else None
+    except ValueError as e:
+        return f"Invalid time range: {e}"
+    sources = (source,) if source else HISTORY_SOURCES
+    results = await asyncio.gather(
+        *(
+            index.sync(
+                name,
+                lambda name=name: iter_history(name, session=session),
+                force=refresh,
+            )
+            for name in sources
+        ),
+        return_exceptions=True,
     )
-    if resp is None:
-        return "Failed to get history list"
-    if resp.code != ErrorCode.SUCCESS.code:
-        return "Failed to get history list"
-    if resp.data is None:
-        return "No history list found"
-    return resp.data.model_dump()
+    stale_sources = []
+    for name, result in zip(sources, results):
+        if isinstance(result, Exception):
+            logging.warning("Failed to sync %s history: %s", name, result)
+            stale_sources.append(name)
+        elif isinstance(result, BaseException):
+            raise result
+    entries = index.search(
+        query,
+        source=source,
+        provider=provider,
+        voice_id=voice_id,
+        model_id=model_id,
+        since=since_ts,
+        until=until_ts,
+        limit=min(max(limit, 1), HISTORY_MAX_PAGE_SIZE),
+    )
+    return {"results": entries, "count": len(entries), "stale_sources": stale_sources}
 
 
-async def get_history(history_id: str):
+@timed("api")
+async def get_history(history_id: str, session: Optional[ClientSession] = None):
     resp = await get(
         f"/api/history/{history_id}",
         response_model=BaseResponse[HistoryResponse],
+        session=session,
+        as_dict=True,
     )
     if resp is None:
         return "Failed to get history"
-    if resp.code != ErrorCode.SUCCESS.code:
+    if resp["code"] != ErrorCode.SUCCESS.code:
         return "Failed to get history"
-    if resp.data is None:
+    if resp["data"] is None:
         return "No history found"
-    return resp.data.model_dump()
+    return resp["data"]
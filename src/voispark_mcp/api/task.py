@@ -0,0 +1,25 @@
+from typing import Optional
+
+from aiohttp import ClientSession
+
+from voispark_mcp.core.api_request import get
+from voispark_mcp.core.error_code import ErrorCode
+from voispark_mcp.core.metrics import timed
+from voispark_mcp.msg.base_resp import BaseResponse
+from voispark_mcp.msg.task_msg import TaskResponse
+
+
+@timed("api")
+async def get_task(task_id: str, session: Optional[ClientSession] = None):
+    resp = await get(
+        f"/api/task/{task_id}",
+        response_model=BaseResponse[TaskResponse],
+        session=session,
+    )
+    if resp is None:
+        return "Failed to get task"
+    if resp.code != ErrorCode.SUCCESS.code:
+        return "Failed to get task"
+    if resp.data is None:
+        return "No task found"
+    return resp.data.model_dump()
@@ -1,32 +1,86 @@
-from voispark_mcp.core.api_request import get, post
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from aiohttp import ClientSession
+
+from voispark_mcp.core.api_request import download, get, post
+from voispark_mcp.core.audio_file import output_path
+from voispark_mcp.core.audio_stitch import stitch_audio
+from voispark_mcp.core.cache import cached
 from voispark_mcp.core.error_code import ErrorCode
+from voispark_mcp.core.metrics import timed
+from voispark_mcp.core.rate_limit import credit_of, rate_limited
+from voispark_mcp.core.result_cache import ResultCache, tts_key
+from voispark_mcp.core.settings import TTS_BATCH_CONCURRENCY, TTS_LONG_CONCURRENCY
+from voispark_mcp.core.text_split import split_text
 from voispark_mcp.msg.base_resp import BaseResponse
 from voispark_mcp.msg.tts_msg import (
     TTSProviderListResponse,
     GenerateTTSRequest,
     GenerateTTSResponse,
+    TTSBatchItem,
+    TTSBatchResult,
+    GenerateTTSBatchResponse,
+    GenerateLongTTSResponse,
 )
 
+TTS_BATCH_MAX_CONCURRENCY = int(os.getenv("VOISPARK_TTS_BATCH_MAX_CONCURRENCY") or 32)
+TTS_MAX_CHARS = int(os.getenv("VOISPARK_TTS_MAX_CHARS") or 1000)
+
+
+def max_chars_for(provider: str) -> int:
+    """
+    The maximum text length sent to a provider in one long-form TTS chunk,
+    read from `VOISPARK_TTS_MAX_CHARS_<PROVIDER>` with TTS_MAX_CHARS as default.
+    """
+    value = os.getenv(f"VOISPARK_TTS_MAX_CHARS_{provider.upper()}")
+    return int(value) if value else TTS_MAX_CHARS
+
 
-async def get_tts_models():
+@cached("tts_models")
+@timed("api")
+async def get_tts_models(session: Optional[ClientSession] = None):
     resp = await get(
         "/api/tts/models",
         response_model=BaseResponse[TTSProviderListResponse],
+        session=session,
+        as_dict=True,
     )
     if resp is None:
         return "Failed to get tts models"
-    if resp.code != ErrorCode.SUCCESS.code:
+    if resp["code"] != ErrorCode.SUCCESS.code:
         return "Failed to get tts models"
-    if resp.data is None:
+    if resp["data"] is None:
         return "No tts models found"
-    return resp.data.model_dump()
+    return resp["data"]
 
 
-async def generate_tts(request: GenerateTTSRequest):
+@timed("api")
+async def generate_tts(
+    request: GenerateTTSRequest,
+    session: Optional[ClientSession] = None,
+    result_cache: Optional[ResultCache] = None,
+    download_session: Optional[ClientSession] = None,
+):
+    key = tts_key(request) if result_cache is not None else None
+    if key is not None and (cached := result_cache.get(key)) is not None:
+        return cached
+    cost = 1.0
+    if rate_limited(request.provider):
+        catalog = await get_tts_models(session=session)
+        cost = len(request.text) * credit_of(
+            catalog, request.provider, request.model_id
+        )
     resp = await post(
         "/api/tts/generate",
         data=request,
         response_model=BaseResponse[GenerateTTSResponse],
+        session=session,
+        provider=request.provider,
+        cost=cost,
     )
     if resp is None:
         return "Failed to generate TTS audio"
@@ -34,4 +88,138 @@ async def generate_tts(request: GenerateTTSRequest):
         return "Failed to generate TTS audio"
     if resp.data is None:
         return "No task ID received for generated TTS audio"
-    return resp.data.model_dump()
+    result = resp.data.model_dump()
+    if key is not None and resp.data.status == "success":
+        await result_cache.put(key, "tts", result, download_session)
+    return result
+
+
+async def _generate_tts_item(
+    index: int,
+    item: TTSBatchItem,
+    semaphore: asyncio.Semaphore,
+    session: Optional[ClientSession],
+    result_cache: Optional[ResultCache],
+) -> TTSBatchResult:
+    async with semaphore:
+        try:
+            resp = await generate_tts(
+                GenerateTTSRequest(**dict(item)),
+                session=session,
+                result_cache=result_cache,
+            )
+        except Exception as e:
+            logging.exception("Failed to generate TTS audio for batch item %d", index)
+            return TTSBatchResult(index=index, status="failed", error=repr(e))
+    if isinstance(resp, str):
+        return TTSBatchResult(index=index, status="failed", error=resp)
+    task = GenerateTTSResponse.model_validate(resp)
+    status = "success" if task.status == "success" else "failed"
+    return TTSBatchResult(index=index, status=status, task=task, error=task.error)
+
+
+@timed("api")
+async def generate_tts_batch(
+    items: list[TTSBatchItem],
+    concurrency: int = TTS_BATCH_CONCURRENCY,
+    session: Optional[ClientSession] = None,
+    result_cache: Optional[ResultCache] = None,
+):
+    semaphore = asyncio.Semaphore(max(1, min(concurrency, TTS_BATCH_MAX_CONCURRENCY)))
+    # Identical items are generated once, keyed on their serialized fields
+    first_index: dict[str, int] = {}
+    duplicate_of: list[Optional[int]] = []
+    for index, item in enumerate(items):
+        first = first_index.setdefault(item.model_dump_json(), index)
+        duplicate_of.append(first if first != index else None)
+
+    unique = [index for index, first in enumerate(duplicate_of) if first is None]
+    generated = await asyncio.gather(
+        *(
+            _generate_tts_item(i, items[i], semaphore, session, result_cache)
+            for i in unique
+        )
+    )
+    by_index = dict(zip(unique, generated))
+
+    results = [
+        (
+            by_index[index]
+            if first is None
+            else by_index[first].model_copy(
+                update={"index": index, "duplicate_of": first}
+            )
+        )
+        for index, first in enumerate(duplicate_of)
+    ]
+    succeeded = sum(result.status == "success" for result in results)
+    return GenerateTTSBatchResponse(
+        results=results, succeeded=succeeded, failed=len(results) - succeeded
+    ).model_dump()
+
+
+@timed("api")
+async def generate_tts_long(
+    request: GenerateTTSRequest,
+    max_chars: Optional[int] = None,
+    concurrency: int = TTS_LONG_CONCURRENCY,
+    on_chunk: Optional[
+        Callable[[int, int, GenerateTTSResponse], Awaitable[None]]
+    ] = None,
+    session: Optional[ClientSession] = None,
+    download_session: Optional[ClientSession] = None,
+    result_cache: Optional[ResultCache] = None,
+):
+    if max_chars is not None and max_chars <= 0:
+        return "max_chars must be a positive number of characters"
+    chunks = split_text(request.text, max_chars or max_chars_for(request.provider))
+    if not chunks:
+        return "No text to convert to speech"
+    semaphore = asyncio.Semaphore(max(1, min(concurrency, TTS_BATCH_MAX_CONCURRENCY)))
+
+    async def synthesize(index: int, text: str) -> tuple[GenerateTTSResponse, bytes]:
+        async with semaphore:
+            resp = await generate_tts(
+                request.model_copy(update={"text": text}),
+                session=session,
+                result_cache=result_cache,
+                download_session=download_session,
+            )
+            if isinstance(resp, str):
+                raise RuntimeError(resp)
+            task = GenerateTTSResponse.model_validate(resp)
+            if task.status != "success" or task.details is None:
+                raise RuntimeError(task.error or "No audio received")
+            if "local_path" in resp:
+                audio = await asyncio.to_thread(Path(resp["local_path"]).read_bytes)
+            else:
+                audio = await download(task.details.url, session=download_session)
+        if on_chunk is not None:
+            await on_chunk(index, len(chunks), task)
+        return task, audio
+
+    jobs = [asyncio.create_task(synthesize(i, text)) for i, text in enumerate(chunks)]
+    try:
+        results = []
+        for index, job in enumerate(jobs):
+            try:
+                results.append(await job)
+            except Exception as e:
+                logging.exception("Failed to generate TTS audio for chunk %d", index)
+                return f"Failed to generate TTS audio for chunk {index}: {e}"
+    finally:
+        for job in jobs:
+            job.cancel()
+
+    tasks = [task for task, _ in results]
+    formats = [task.details.format for task in tasks]
+    path = output_path(formats[0].container)
+    try:
+        await asyncio.to_thread(
+            stitch_audio, [audio for _, audio in results], formats, path
+        )
+    except ValueError as e:
+        return f"Failed to stitch TTS audio: {e}"
+    return GenerateLongTTSResponse(
+        path=str(path), format=formats[0], chunks=tasks
+    ).model_dump()
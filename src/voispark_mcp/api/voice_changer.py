@@ -1,5 +1,19 @@
+from typing import Optional
+
+from aiohttp import ClientSession
+
 from voispark_mcp.core.api_request import get, post
+from voispark_mcp.core.audio_file import resolve_audio_path
+from voispark_mcp.core.audio_prep import (
+    prepare_base64,
+    prepared_upload,
+    upload_rate_for,
+)
+from voispark_mcp.core.cache import cached
 from voispark_mcp.core.error_code import ErrorCode
+from voispark_mcp.core.metrics import timed
+from voispark_mcp.core.rate_limit import credit_of, rate_limited
+from voispark_mcp.core.result_cache import ResultCache, voice_changer_key
 from voispark_mcp.msg.base_resp import BaseResponse
 from voispark_mcp.msg.voice_changer_msg import (
     VoiceChangerModelsResponse,
@@ -8,30 +22,67 @@ from voispark_mcp.msg.voice_changer_msg import (
 )
 
 
-async def get_voice_changer_models():
+@cached("voice_changer_models")
+@timed("api")
+async def get_voice_changer_models(session: Optional[ClientSession] = None):
     resp = await get(
         "/api/voice_changer/models",
         response_model=BaseResponse[VoiceChangerModelsResponse],
+        session=session,
+        as_dict=True,
     )
     if resp is None:
         return "Failed to get voice changer models"
-    if resp.code != ErrorCode.SUCCESS.code:
+    if resp["code"] != ErrorCode.SUCCESS.code:
         return "Failed to get voice changer models"
-    if resp.data is None:
+    if resp["data"] is None:
         return "No voice changer models found"
-    return resp.data.model_dump()
+    return resp["data"]
 
 
-async def change_voice(request: ChangeVoiceRequest):
-    resp = await post(
-        "/api/voice_changer/change",
-        data=request,
-        response_model=BaseResponse[ChangeVoiceResponse],
-    )
+@timed("api")
+async def change_voice(
+    request: ChangeVoiceRequest,
+    audio_path: Optional[str] = None,
+    session: Optional[ClientSession] = None,
+    result_cache: Optional[ResultCache] = None,
+    download_session: Optional[ClientSession] = None,
+):
+    path = None
+    if audio_path:
+        try:
+            path = resolve_audio_path(audio_path)
+        except (FileNotFoundError, PermissionError) as e:
+            return str(e)
+    key = None
+    if result_cache is not None:
+        key = await voice_changer_key(request, path, upload_rate_for(request.provider))
+        if (cached := result_cache.get(key)) is not None:
+            return cached
+    cost = 1.0
+    if rate_limited(request.provider):
+        catalog = await get_voice_changer_models(session=session)
+        cost = credit_of(catalog, request.provider, request.model_id)
+    if path is None:
+        audio_data = await prepare_base64(request.audio_data, request.provider)
+        request = request.model_copy(update={"audio_data": audio_data})
+    async with prepared_upload(path, request.provider) as upload_path:
+        resp = await post(
+            "/api/voice_changer/change",
+            data=request,
+            audio_path=upload_path,
+            response_model=BaseResponse[ChangeVoiceResponse],
+            session=session,
+            provider=request.provider,
+            cost=cost,
+        )
     if resp is None:
         return "Failed to change voice"
     if resp.code != ErrorCode.SUCCESS.code:
         return "Failed to change voice"
     if resp.data is None:
         return "No task ID received for voice change"
-    return resp.data.model_dump()
+    result = resp.data.model_dump()
+    if key is not None and resp.data.status == "success":
+        await result_cache.put(key, "voice_changer", result, download_session)
+    return result
@@ -1,36 +1,132 @@
+import asyncio
+import base64
+from functools import partial
+import os
+from pathlib import Path
+from typing import Optional
+
+from aiohttp import ClientSession
+
 from voispark_mcp.core.api_request import get, post
+from voispark_mcp.core.audio_file import resolve_audio_path
+from voispark_mcp.core.audio_prep import (
+    prepare_base64,
+    prepared_upload,
+    select_speech,
+    wav_seconds,
+)
+from voispark_mcp.core.cache import cached
 from voispark_mcp.core.error_code import ErrorCode
+from voispark_mcp.core.metrics import timed
+from voispark_mcp.core.rate_limit import credit_of, rate_limited
 from voispark_mcp.msg.base_resp import BaseResponse
 from voispark_mcp.msg.voice_clone_msg import (
     VoiceCloneModelsResponse,
+    CartesiaVoiceCloneConfig,
+    CloneSample,
     CloneVoiceRequest,
     CloneVoiceResponse,
+    CloneVoiceResult,
 )
 
+# Trim silence from clone samples and keep the best window of speech, at
+# least and at most these seconds long, with pauses of at most CLONE_MAX_PAUSE
+CLONE_TRIM = os.getenv("VOISPARK_CLONE_TRIM", "1").lower() in ("1", "true", "yes")
+CLONE_SAMPLE_MIN_SECONDS = float(os.getenv("VOISPARK_CLONE_SAMPLE_MIN_SECONDS") or 10)
+CLONE_SAMPLE_MAX_SECONDS = float(os.getenv("VOISPARK_CLONE_SAMPLE_MAX_SECONDS") or 30)
+CLONE_MAX_PAUSE = float(os.getenv("VOISPARK_CLONE_MAX_PAUSE") or 0.5)
+
+
+def _sample(original: Path | bytes, uploaded: Path | bytes) -> Optional[CloneSample]:
+    """How much of the original audio was removed from the uploaded sample."""
+    original_seconds, seconds = wav_seconds(original), wav_seconds(uploaded)
+    if original_seconds is None or seconds is None:
+        return None
+    original_bytes, size = (
+        audio.stat().st_size if isinstance(audio, Path) else len(audio)
+        for audio in (original, uploaded)
+    )
+    return CloneSample(
+        original_seconds=round(original_seconds, 3),
+        seconds=round(seconds, 3),
+        removed_seconds=round(original_seconds - seconds, 3),
+        original_bytes=original_bytes,
+        removed_bytes=original_bytes - size,
+    )
+
 
-async def get_voice_clone_models():
+@cached("voice_clone_models")
+@timed("api")
+async def get_voice_clone_models(session: Optional[ClientSession] = None):
     resp = await get(
-        "/api/voice_clone/models", response_model=BaseResponse[VoiceCloneModelsResponse]
+        "/api/voice_clone/models",
+        response_model=BaseResponse[VoiceCloneModelsResponse],
+        session=session,
+        as_dict=True,
     )
     if resp is None:
         return "Failed to get voice clone models"
-    if resp.code != ErrorCode.SUCCESS.code:
+    if resp["code"] != ErrorCode.SUCCESS.code:
         return "Failed to get voice clone models"
-    if resp.data is None:
+    if resp["data"] is None:
         return "No voice clone models found"
-    return resp.data.model_dump()
+    return resp["data"]
 
 
-async def clone_voice(request: CloneVoiceRequest):
-    resp = await post(
-        "/api/voice_clone/clone",
-        data=request,
-        response_model=BaseResponse[CloneVoiceResponse],
+@timed("api")
+async def clone_voice(
+    request: CloneVoiceRequest,
+    audio_path: Optional[str] = None,
+    session: Optional[ClientSession] = None,
+):
+    path = None
+    if audio_path:
+        try:
+            path = resolve_audio_path(audio_path)
+        except (FileNotFoundError, PermissionError) as e:
+            return str(e)
+    cost = 1.0
+    if rate_limited(request.provider):
+        catalog = await get_voice_clone_models(session=session)
+        cost = credit_of(catalog, request.provider, request.model_id)
+    transform = None
+    # Similarity mode uses the transcript with the audio, so it is uploaded as it is
+    transcript = (
+        isinstance(request.configs, CartesiaVoiceCloneConfig)
+        and request.configs.transcript
     )
+    if CLONE_TRIM and not transcript:
+        transform = partial(
+            select_speech,
+            min_seconds=CLONE_SAMPLE_MIN_SECONDS,
+            max_seconds=CLONE_SAMPLE_MAX_SECONDS,
+            max_pause=CLONE_MAX_PAUSE,
+        )
+    original = request.audio_data
+    if path is None:
+        audio_data = await prepare_base64(original, request.provider, transform)
+        request = request.model_copy(update={"audio_data": audio_data})
+    async with prepared_upload(path, request.provider, transform) as upload_path:
+        sample = None
+        if upload_path != path or request.audio_data != original:
+            sample = await asyncio.to_thread(
+                _sample,
+                path or base64.b64decode(original),
+                upload_path or base64.b64decode(request.audio_data),
+            )
+        resp = await post(
+            "/api/voice_clone/clone",
+            data=request,
+            audio_path=upload_path,
+            response_model=BaseResponse[CloneVoiceResponse],
+            session=session,
+            provider=request.provider,
+            cost=cost,
+        )
     if resp is None:
         return "Failed to clone voice"
     if resp.code != ErrorCode.SUCCESS.code:
         return "Failed to clone voice"
     if resp.data is None:
         return "No response data received for voice cloning"
-    return resp.data.model_dump()
+    return CloneVoiceResult(**resp.data.model_dump(), sample=sample).model_dump()
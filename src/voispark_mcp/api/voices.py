@@ -1,35 +1,210 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from aiohttp import ClientSession
+
 from voispark_mcp.core.api_request import get
+from voispark_mcp.core.cache import cached
 from voispark_mcp.core.error_code import ErrorCode
+from voispark_mcp.core.metrics import timed
+from voispark_mcp.core.voice_index import VoiceIndex
 from voispark_mcp.msg.base_resp import BaseResponse
 from voispark_mcp.msg.voices_msg import (
+    Ability,
     VoiceProvidersResponse,
     VoicesListResponse,
 )
 
+# The abilities that have voice lists
+VOICE_TYPES = ("tts", "voice_changer", "voice_clone")
+# Providers listed at the same time by `list_voices_of_all_providers`, and the
+# seconds each of them may take
+VOICES_FANOUT_CONCURRENCY = int(os.getenv("VOISPARK_VOICES_FANOUT_CONCURRENCY") or 8)
+VOICES_PROVIDER_TIMEOUT = float(os.getenv("VOISPARK_VOICES_PROVIDER_TIMEOUT") or 10)
+
+
+class VoiceIndexError(Exception):
+    """Raised by `refresh_voice_index` when the providers cannot be listed."""
+
 
-async def list_all_voices(provider_id: str, voice_type: str):
+@timed("api")
+async def list_all_voices(
+    provider_id: str, voice_type: str, session: Optional[ClientSession] = None
+):
     resp = await get(
         f"/api/voices/{provider_id}/list",
         query={"type": voice_type},
         response_model=BaseResponse[VoicesListResponse],
+        session=session,
+        provider=provider_id,
+        as_dict=True,
     )
     if resp is None:
         return "Failed to list all voices"
-    if resp.code != ErrorCode.SUCCESS.code:
+    if resp["code"] != ErrorCode.SUCCESS.code:
         return "Failed to list all voices"
-    if resp.data is None:
+    if resp["data"] is None:
         return "No voices found"
-    return resp.data.model_dump()
+    return resp["data"]
 
 
-async def get_providers():
+@cached("voice_providers")
+@timed("api")
+async def get_providers(session: Optional[ClientSession] = None):
     resp = await get(
-        "/api/voices/providers", response_model=BaseResponse[VoiceProvidersResponse]
+        "/api/voices/providers",
+        response_model=BaseResponse[VoiceProvidersResponse],
+        session=session,
+        as_dict=True,
     )
     if resp is None:
         return "Failed to get voice providers"
-    if resp.code != ErrorCode.SUCCESS.code:
+    if resp["code"] != ErrorCode.SUCCESS.code:
         return "Failed to get voice providers"
-    if resp.data is None:
+    if resp["data"] is None:
         return "No voice providers found"
-    return resp.data.model_dump()
+    return resp["data"]
+
+
+async def _list_provider_voices(
+    provider_id: str,
+    voice_type: str,
+    semaphore: asyncio.Semaphore,
+    timeout: float,
+    session: Optional[ClientSession],
+) -> str | dict:
+    async with semaphore:
+        try:
+            return await asyncio.wait_for(
+                list_all_voices(provider_id, voice_type, session=session), timeout
+            )
+        except asyncio.TimeoutError:
+            return f"No response within {timeout:g}s"
+        except Exception as e:
+            logging.exception("Failed to list %s voices of %s", voice_type, provider_id)
+            return repr(e)
+
+
+@timed("api")
+async def list_voices_of_all_providers(
+    voice_type: Ability,
+    concurrency: int = VOICES_FANOUT_CONCURRENCY,
+    timeout: float = VOICES_PROVIDER_TIMEOUT,
+    session: Optional[ClientSession] = None,
+):
+    """
+    List the voices of every provider with the voice_type ability, fetching
+    the providers' lists concurrently.
+
+    A provider that fails or takes longer than timeout is listed under
+    failed_providers and the voices of the others are still returned.
+
+    Returns:
+        An AllVoicesListResponse dict
+    """
+    resp = await get_providers(session=session)
+    if isinstance(resp, str):
+        return resp
+    provider_ids = [
+        provider["id"]
+        for provider in resp["providers"]
+        if voice_type in provider["abilities"]
+    ]
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results = await asyncio.gather(
+        *(
+            _list_provider_voices(provider_id, voice_type, semaphore, timeout, session)
+            for provider_id in provider_ids
+        )
+    )
+    merged = {
+        "default_voices": [],
+        "user_voices": [],
+        "ip_voices": [],
+        "providers": [],
+        "failed_providers": [],
+    }
+    for provider_id, result in zip(provider_ids, results):
+        if isinstance(result, str):
+            merged["failed_providers"].append(
+                {"provider": provider_id, "error": result}
+            )
+            continue
+        merged["providers"].append(provider_id)
+        for collection in ("default_voices", "user_voices", "ip_voices"):
+            merged[collection].extend(result[collection])
+    return merged
+
+
+async def refresh_voice_index(
+    index: VoiceIndex, session: Optional[ClientSession] = None
+) -> None:
+    """
+    Fetch the voice lists of every provider and ability concurrently and
+    update the index with them. A list that cannot be fetched keeps its
+    indexed voices.
+
+    Raises:
+        VoiceIndexError: If the providers or all of the voice lists cannot be listed
+    """
+    resp = await get_providers(session=session)
+    if isinstance(resp, str):
+        raise VoiceIndexError(resp)
+    lists = [
+        (provider["id"], ability)
+        for provider in resp["providers"]
+        for ability in provider["abilities"]
+        if ability in VOICE_TYPES
+    ]
+    results = await asyncio.gather(
+        *(
+            list_all_voices(provider_id, voice_type, session=session)
+            for provider_id, voice_type in lists
+        ),
+        return_exceptions=True,
+    )
+    index.retain(set(lists))
+    failed = 0
+    for (provider_id, voice_type), result in zip(lists, results):
+        if isinstance(result, dict):
+            index.update(provider_id, voice_type, result)
+        elif isinstance(result, (str, Exception)):
+            failed += 1
+            logging.warning(
+                "Failed to list %s voices of %s: %s", voice_type, provider_id, result
+            )
+        else:
+            raise result
+    if lists and failed == len(lists):
+        raise VoiceIndexError("Failed to list the voices of every provider")
+
+
+@timed("api")
+async def search_voices(
+    index: VoiceIndex,
+    query: Optional[str] = None,
+    ability: Optional[Ability] = None,
+    provider: Optional[str] = None,
+    voice_id: Optional[str] = None,
+    limit: int = 20,
+    session: Optional[ClientSession] = None,
+):
+    """
+    Search the voice index, building it on first use and refreshing it in
+    the background once it is older than its TTL.
+
+    Args:
+        voice_id: Return only the voices with this id, of provider if it is
+            given, ignoring the other filters
+
+    Returns:
+        The matching voices, best match first
+    """
+    await index.ensure(lambda: refresh_voice_index(index, session=session))
+    if index.refreshed_at is None:
+        return "Failed to list voices"
+    if voice_id is not None:
+        return {"voices": index.lookup(voice_id, provider)}
+    return {"voices": index.search(query, ability, provider, max(limit, 1))}
@@ -1,53 +1,453 @@
+import asyncio
+from contextlib import asynccontextmanager
+import itertools
+import logging
 import os
-from typing import Optional, Type, TypeVar
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Hashable, Optional, Type, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
-from aiohttp import ClientSession
+from aiohttp import (
+    ClientConnectorError,
+    ClientPayloadError,
+    ClientSession,
+    TCPConnector,
+)
 import dotenv
 
+from voispark_mcp.core.audio_file import base64_length, iter_base64
+from voispark_mcp.core.circuit_breaker import circuit_breaker
+from voispark_mcp.core.compression import (
+    accept_encoding,
+    compress,
+    compressor,
+    decompress,
+)
+from voispark_mcp.core.decode import decoder
+from voispark_mcp.core.error_code import ErrorCode
+from voispark_mcp.core.metrics import current_endpoint, observe_payload, record_error
+from voispark_mcp.core.rate_limit import admit
+from voispark_mcp.core.retry import (
+    RETRY_ATTEMPTS,
+    RETRYABLE_EXCEPTIONS,
+    RETRYABLE_STATUS,
+    backoff_delay,
+    retry_after,
+)
+
 dotenv.load_dotenv()
 
 U = TypeVar("U", bound=BaseModel)
 V = TypeVar("V", bound=BaseModel)
 
 BASE_URL = os.getenv("VOISPARK_API_URL") or "https://api.voispark.com"
+API_KEY = os.getenv("VOISPARK_API_KEY")
+
+# Ask for compressed responses in every encoding that can be decoded
+COMPRESSION = os.getenv("VOISPARK_COMPRESSION", "1").lower() in ("1", "true", "yes")
+# Encoding of request bodies of at least REQUEST_COMPRESSION_MIN_SIZE bytes,
+# gzip, br or zstd; bodies are sent as they are by default
+REQUEST_COMPRESSION = (os.getenv("VOISPARK_REQUEST_COMPRESSION") or "").lower() or None
+REQUEST_COMPRESSION_MIN_SIZE = int(
+    os.getenv("VOISPARK_REQUEST_COMPRESSION_MIN_SIZE") or 16384
+)
+if REQUEST_COMPRESSION is not None:
+    try:
+        compressor(REQUEST_COMPRESSION)
+    except ValueError as e:
+        logging.warning("Sending request bodies uncompressed: %s", e)
+        REQUEST_COMPRESSION = None
+
 HEADERS = {
     "Content-Type": "application/json",
-    "Authorization": f"Bearer {os.getenv('VOISPARK_API_KEY')}",
+    "Authorization": f"Bearer {API_KEY}",
+    "Accept-Encoding": accept_encoding() if COMPRESSION else "identity",
 }
 
+# Connection pool tuning for the long-lived session
+HTTP_LIMIT = int(os.getenv("VOISPARK_HTTP_LIMIT") or 100)
+HTTP_LIMIT_PER_HOST = int(os.getenv("VOISPARK_HTTP_LIMIT_PER_HOST") or 32)
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("VOISPARK_HTTP_KEEPALIVE_TIMEOUT") or 60)
+HTTP_DNS_CACHE_TTL = int(os.getenv("VOISPARK_HTTP_DNS_CACHE_TTL") or 300)
+
+
+def create_session(base_url: str = BASE_URL) -> ClientSession:
+    """
+    Create a long-lived ClientSession backed by a pooled TCPConnector.
+
+    The session keeps connections to the API alive between calls so that only
+    the first request pays for the TCP and TLS handshake. It must be closed by
+    the caller, normally in the server lifespan. Response bodies are decoded
+    by `_send` rather than by aiohttp, which cannot decode every encoding.
+    """
+    connector = TCPConnector(
+        limit=HTTP_LIMIT,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+    )
+    return ClientSession(
+        base_url=base_url,
+        headers=HEADERS,
+        connector=connector,
+        auto_decompress=False,
+    )
+
+
+def create_download_session() -> ClientSession:
+    """
+    Create a long-lived pooled ClientSession for downloading result audio.
+
+    Audio URLs are absolute (often presigned) URLs on other hosts, so this
+    session has no base URL and never sends the API key.
+    """
+    connector = TCPConnector(
+        limit=HTTP_LIMIT,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+    )
+    return ClientSession(connector=connector)
+
+
+@asynccontextmanager
+async def _use_session(
+    session: Optional[ClientSession],
+) -> AsyncIterator[ClientSession]:
+    """Yield the given session, or a one-shot session when none is provided."""
+    if session is not None:
+        yield session
+        return
+    async with ClientSession(
+        headers=HEADERS, base_url=BASE_URL, auto_decompress=False
+    ) as one_shot:
+        yield one_shot
+
+
+def _code(result: Optional[BaseModel | dict]) -> Optional[int]:
+    """The response code of a parsed response, a model or a dict."""
+    code = (
+        result.get("code")
+        if isinstance(result, dict)
+        else getattr(result, "code", None)
+    )
+    return code if isinstance(code, int) else None
+
+
+def _failed(status: int, result: Optional[BaseModel | dict]) -> bool:
+    """Whether a response is a transient failure, by HTTP status or response code."""
+    if status in RETRYABLE_STATUS:
+        return True
+    code = _code(result)
+    return code is not None and ErrorCode.is_retryable(code)
+
+
+async def _send(
+    method: str,
+    path: str,
+    response_model: Optional[Type[U]],
+    session: Optional[ClientSession],
+    kwargs: dict[str, Any],
+    as_dict: bool = False,
+) -> tuple[int, Optional[float], Optional[U | dict]]:
+    async with _use_session(session) as client:
+        async with client.request(method, path, **kwargs) as response:
+            result = None
+            if response_model:
+                body = await response.read()
+                observe_payload(current_endpoint.get() or path, "response", len(body))
+                try:
+                    body = await decompress(
+                        body, response.headers.get("Content-Encoding")
+                    )
+                except ValueError as e:
+                    raise ClientPayloadError(str(e)) from e
+                try:
+                    result = decoder(response_model, as_dict)(body)
+                except ValidationError:
+                    # Error pages of proxies and gateways are not API responses
+                    if response.status not in RETRYABLE_STATUS:
+                        raise
+            return response.status, retry_after(response.headers), result
+
+
+async def _request(
+    method: str,
+    path: str,
+    response_model: Optional[Type[U]],
+    session: Optional[ClientSession],
+    provider: Optional[str] = None,
+    idempotent: bool = True,
+    request_kwargs: Callable[[], dict[str, Any]] = dict,
+    as_dict: bool = False,
+) -> Optional[U | dict]:
+    """
+    Send a request, retrying transient failures with exponential backoff.
+
+    Network errors and transient failure responses (see `_failed`) are retried
+    for idempotent requests, failures to connect for every request. The last
+    failure response is returned as is, or as None when its body is not an
+    API response. With a provider, the request goes through the provider's
+    circuit breaker, which counts each transient failure.
+
+    Args:
+        request_kwargs: Builds the keyword arguments of every attempt, so that
+            streamed bodies are recreated for each one
+        as_dict: Parse the response into the plain dicts that
+            `response_model(...).model_dump()` would return, see `decoder`
+
+    Raises:
+        CircuitOpenError: If the provider's circuit is open
+    """
+    breaker = circuit_breaker(provider) if provider else None
+    endpoint = current_endpoint.get() or path
+    for attempt in itertools.count():
+        last = attempt >= RETRY_ATTEMPTS - 1
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            status, delay, result = await _send(
+                method, path, response_model, session, request_kwargs(), as_dict
+            )
+        except RETRYABLE_EXCEPTIONS as e:
+            record_error(endpoint, type(e).__name__)
+            if breaker is not None:
+                breaker.record_failure()
+            # A request that may have reached the server is only resent if idempotent
+            if last or not (idempotent or isinstance(e, ClientConnectorError)):
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+            continue
+        code = _code(result)
+        if code is not None and code != ErrorCode.SUCCESS.code:
+            error = ErrorCode.get_by_code(code)
+            record_error(endpoint, error.name if error is not None else str(code))
+        elif status >= 400:
+            record_error(endpoint, f"HTTP_{status}")
+        if not _failed(status, result):
+            if breaker is not None:
+                breaker.record_success()
+            return result
+        if breaker is not None:
+            breaker.record_failure()
+        if last or not idempotent:
+            return result
+        await asyncio.sleep(backoff_delay(attempt, delay))
+
+
+# GET requests currently in flight, keyed on path, query and response model
+_in_flight: dict[Hashable, asyncio.Task] = {}
+
+
+async def _get(
+    path: str,
+    query: Optional[dict],
+    response_model: Optional[Type[U]],
+    session: Optional[ClientSession],
+    provider: Optional[str],
+    as_dict: bool,
+) -> Optional[U | dict]:
+    return await _request(
+        "GET",
+        path,
+        response_model,
+        session,
+        provider,
+        request_kwargs=lambda: {"params": query},
+        as_dict=as_dict,
+    )
+
+
+def _forget(key: Hashable, task: asyncio.Task) -> None:
+    if _in_flight.get(key) is task:
+        del _in_flight[key]
+    # Mark the exception as retrieved in case every waiter was cancelled
+    if not task.cancelled():
+        task.exception()
+
 
 async def get(
     path: str,
     query: Optional[dict] = None,
     response_model: Optional[Type[U]] = None,
-) -> Optional[U]:
-    async with ClientSession(headers=HEADERS, base_url=BASE_URL) as session:
-        async with session.get(path, params=query) as response:
-            if response_model:
-                return response_model.model_validate_json(await response.text())
-            return None
+    session: Optional[ClientSession] = None,
+    provider: Optional[str] = None,
+    as_dict: bool = False,
+) -> Optional[U | dict]:
+    """
+    Send a GET request and parse the response into response_model, or into
+    plain dicts with as_dict for callers that only need JSON-ready data.
+
+    Concurrent identical requests are coalesced: they share one upstream call
+    and all receive the same parsed response object, which must therefore not
+    be mutated. Cancelling one caller does not cancel the shared request.
+    Transient failures are retried, see `_request`.
+    """
+    key = (path, tuple(sorted((query or {}).items())), response_model, as_dict)
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            _get(path, query, response_model, session, provider, as_dict)
+        )
+        _in_flight[key] = task
+        task.add_done_callback(lambda done: _forget(key, done))
+    return await asyncio.shield(task)
+
+
+# Serializers of request models, by model class
+_adapters: dict[type, TypeAdapter] = {}
+
+
+def encode(data: BaseModel, **options: Any) -> bytes:
+    """
+    Serialize a request model straight to JSON bytes, without building a dict
+    or a str first.
+
+    Args:
+        options: Options of `TypeAdapter.dump_json`, such as exclude_none
+    """
+    adapter = _adapters.get(type(data))
+    if adapter is None:
+        adapter = _adapters[type(data)] = TypeAdapter(type(data))
+    return adapter.dump_json(data, **options)
 
 
 async def post(
     path: str,
     data: Optional[V] = None,
     response_model: Optional[Type[U]] = None,
+    session: Optional[ClientSession] = None,
+    audio_path: Optional[Path] = None,
+    audio_field: str = "audio_data",
+    provider: Optional[str] = None,
+    cost: float = 1.0,
+    exclude_none: bool = False,
+    exclude_defaults: bool = False,
 ) -> Optional[U]:
-    async with ClientSession(headers=HEADERS, base_url=BASE_URL) as session:
-        async with session.post(path, json=data) as response:
-            if response_model:
-                return response_model.model_validate_json(await response.text())
-            return None
+    """
+    Send a JSON POST request and parse the response into response_model.
+
+    The body is serialized once, straight to bytes, and omits the fields of
+    data that are None or at their default with exclude_none or
+    exclude_defaults. When audio_path is given, the `audio_field` of the body
+    is replaced by the base64 encoded file and the body is streamed, see
+    `_audio_body`. Bodies of at least REQUEST_COMPRESSION_MIN_SIZE bytes are
+    compressed with REQUEST_COMPRESSION, if set.
+    POST requests are not idempotent, so only failures to connect are retried.
+    With a provider, the request first waits for `cost` credits from the rate
+    limiter, see `admit`.
+
+    Raises:
+        RateLimitExceeded: If the request would wait too long for credits
+    """
+    if provider is not None:
+        await admit(provider, cost, API_KEY)
+    exclude = {"exclude_none": exclude_none, "exclude_defaults": exclude_defaults}
+    endpoint = current_endpoint.get() or path
+    body = None
+    headers = {"Content-Type": "application/json"}
+    if data is not None and audio_path is None:
+        body = encode(data, **exclude)
+        if REQUEST_COMPRESSION and len(body) >= REQUEST_COMPRESSION_MIN_SIZE:
+            body = await compress(body, REQUEST_COMPRESSION)
+            headers["Content-Encoding"] = REQUEST_COMPRESSION
+        observe_payload(endpoint, "request", len(body))
+
+    def request_kwargs() -> dict[str, Any]:
+        if audio_path is not None and data is not None:
+            payload, length = _audio_body(data, audio_path, audio_field, **exclude)
+            if REQUEST_COMPRESSION and length >= REQUEST_COMPRESSION_MIN_SIZE:
+                payload = _compressed(payload, REQUEST_COMPRESSION, endpoint)
+                encoding = {"Content-Encoding": REQUEST_COMPRESSION}
+                return {"data": payload, "headers": encoding}
+            observe_payload(endpoint, "request", length)
+            return {"data": payload, "headers": {"Content-Length": str(length)}}
+        if body is None:
+            return {}
+        return {"data": body, "headers": headers}
+
+    return await _request(
+        "POST",
+        path,
+        response_model,
+        session,
+        provider,
+        idempotent=False,
+        request_kwargs=request_kwargs,
+    )
+
+
+def _audio_body(
+    data: BaseModel, audio_path: Path, field: str, **exclude: bool
+) -> tuple[AsyncIterator[bytes], int]:
+    """
+    Build a streamed JSON body whose `field` is the base64 encoded audio_path.
+
+    The other fields of data are serialized once and the audio file is read
+    and base64 encoded chunk by chunk while it is sent, so neither the raw nor
+    the encoded audio is ever held in memory as a whole.
+
+    Returns:
+        The body iterator and its exact length in bytes
+    """
+    prefix = f'{{"{field}":"'.encode()
+    rest = encode(data, exclude={field}, **exclude)
+    suffix = b'"' + (b"," + rest[1:] if rest != b"{}" else b"}")
+    length = len(prefix) + base64_length(audio_path.stat().st_size) + len(suffix)
+
+    async def body() -> AsyncIterator[bytes]:
+        yield prefix
+        async for chunk in iter_base64(audio_path):
+            yield chunk
+        yield suffix
+
+    return body(), length
+
+
+async def _compressed(
+    body: AsyncIterator[bytes], encoding: str, endpoint: str
+) -> AsyncIterator[bytes]:
+    """
+    Compress a streamed body chunk by chunk, in a worker thread since the
+    chunks are large. Its compressed length is only known once it was sent.
+    """
+    codec = compressor(encoding)
+    length = 0
+    async for chunk in body:
+        chunk = await asyncio.to_thread(codec.process, chunk)
+        length += len(chunk)
+        if chunk:
+            yield chunk
+    chunk = codec.flush()
+    observe_payload(endpoint, "request", length + len(chunk))
+    yield chunk
 
 
 async def delete(
     path: str,
     response_model: Optional[Type[U]] = None,
+    session: Optional[ClientSession] = None,
 ) -> Optional[U]:
-    async with ClientSession(headers=HEADERS, base_url=BASE_URL) as session:
-        async with session.delete(path) as response:
-            if response_model:
-                return response_model.model_validate_json(await response.text())
-            return None
+    return await _request("DELETE", path, response_model, session)
+
+
+async def download(url: str, session: Optional[ClientSession] = None) -> bytes:
+    """
+    Download the body of an absolute URL, such as the url of AudioTaskDetails.
+
+    Args:
+        url: The URL to download
+        session: A session from `create_download_session`, or None for a one-shot session
+
+    Raises:
+        aiohttp.ClientResponseError: If the response status is not successful
+    """
+    if session is None:
+        async with ClientSession() as one_shot:
+            return await download(url, one_shot)
+    async with session.get(url) as response:
+        response.raise_for_status()
+        body = await response.read()
+    observe_payload(current_endpoint.get() or "download", "download", len(body))
+    return body
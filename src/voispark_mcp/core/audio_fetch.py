@@ -0,0 +1,177 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import mimetypes
+import mmap
+import os
+from pathlib import Path
+from typing import Literal, Optional
+
+from aiohttp import ClientSession
+
+from voispark_mcp.core.audio_file import CHUNK_SIZE
+
+AUDIO_CACHE_DIR = Path(
+    os.getenv("VOISPARK_AUDIO_CACHE_DIR")
+    or Path.home() / ".cache" / "voispark" / "audio"
+)
+AUDIO_CACHE_MAX_BYTES = int(
+    os.getenv("VOISPARK_AUDIO_CACHE_MAX_BYTES") or 1024 * 1024 * 1024
+)
+
+# How a tool hands over result audio: the remote URL only, a local file, or
+# the audio itself as an embedded resource
+AudioDelivery = Literal["url", "path", "embedded"]
+
+_MIME_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "ogg": "audio/ogg",
+    "opus": "audio/ogg",
+    "flac": "audio/flac",
+    "aac": "audio/aac",
+    "pcm": "audio/L16",
+    "raw": "audio/L16",
+}
+
+
+def mime_type(path: Path) -> str:
+    """The MIME type of an audio file, from its extension."""
+    suffix = path.suffix.lstrip(".").lower()
+    return (
+        _MIME_TYPES.get(suffix)
+        or mimetypes.guess_type(path.name)[0]
+        or "application/octet-stream"
+    )
+
+
+def read_base64(path: Path) -> str:
+    """Base64 encode a file through a read-only memory map of it."""
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return base64.b64encode(mapped).decode()
+
+
+class AudioFetchCache:
+    """
+    A local directory of downloaded result audio, keyed by URL.
+
+    Downloads are streamed to a `.part` file, so an interrupted download is
+    resumed with a Range request the next time the same URL is fetched.
+    Concurrent fetches of one URL share a single download. Once the files
+    exceed max_bytes, the least recently used ones are deleted.
+    """
+
+    def __init__(
+        self,
+        directory: Path = AUDIO_CACHE_DIR,
+        max_bytes: int = AUDIO_CACHE_MAX_BYTES,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.downloaded_bytes = 0
+        self.resumed = 0
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    def path_for(self, url: str, container: Optional[str] = None) -> Path:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        suffix = f".{container.lower()}" if container else ""
+        return self.directory / f"{key}{suffix}"
+
+    async def fetch(
+        self,
+        url: str,
+        container: Optional[str] = None,
+        session: Optional[ClientSession] = None,
+    ) -> Path:
+        """
+        Return the local copy of url, downloading it unless it is cached.
+
+        Args:
+            url: The absolute URL of the audio, such as the url of AudioTaskDetails
+            container: The audio container, used as the file extension
+            session: A session from `create_download_session`, or None for a one-shot session
+
+        Raises:
+            aiohttp.ClientResponseError: If the response status is not successful
+        """
+        path = self.path_for(url, container)
+        if path.exists():
+            self.hits += 1
+            os.utime(path)
+            return path
+        task = self._in_flight.get(url)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._download(url, path, session))
+            self._in_flight[url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _download(
+        self, url: str, path: Path, session: Optional[ClientSession]
+    ) -> Path:
+        if session is None:
+            async with ClientSession() as one_shot:
+                return await self._download(url, path, one_shot)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        part = path.with_name(path.name + ".part")
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else None
+        async with session.get(url, headers=headers) as response:
+            if response.status == 416:
+                # The part file already holds the whole body
+                response.release()
+            else:
+                response.raise_for_status()
+                if response.status == 206:
+                    self.resumed += 1
+                else:
+                    offset = 0
+                with open(part, "r+b" if offset else "wb") as file:
+                    file.seek(offset)
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        await asyncio.to_thread(file.write, chunk)
+                        self.downloaded_bytes += len(chunk)
+        part.replace(path)
+        await asyncio.to_thread(self._evict, path)
+        return path
+
+    def _evict(self, keep: Path) -> None:
+        files = [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and not entry.name.endswith(".part")
+        ]
+        total = sum(entry.stat().st_size for entry in files)
+        for entry in sorted(files, key=lambda entry: entry.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            if entry.path == str(keep):
+                continue
+            total -= entry.stat().st_size
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                logging.debug("Audio cache file already removed: %s", entry.path)
+
+    def stats(self) -> dict:
+        files = (
+            [entry for entry in os.scandir(self.directory) if entry.is_file()]
+            if self.directory.exists()
+            else []
+        )
+        return {
+            "files": len(files),
+            "size": sum(entry.stat().st_size for entry in files),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "resumed": self.resumed,
+            "downloaded_bytes": self.downloaded_bytes,
+        }
@@ -0,0 +1,81 @@
+import asyncio
+import base64
+import os
+from pathlib import Path
+import tempfile
+from typing import AsyncIterator, Optional
+import uuid
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+# Raw bytes read per chunk, a multiple of 3 so chunks encode without padding
+CHUNK_SIZE = 3 * 64 * 1024
+
+OUTPUT_DIR = Path(
+    os.getenv("VOISPARK_OUTPUT_DIR") or Path(tempfile.gettempdir()) / "voispark"
+)
+
+# Directory that local audio files given as audio_path must be in, unset to
+# allow any file. Set it when remote clients connect over sse or streamable-http
+AUDIO_ROOT: Optional[Path] = (
+    Path(os.environ["VOISPARK_AUDIO_ROOT"]).expanduser().resolve()
+    if os.getenv("VOISPARK_AUDIO_ROOT")
+    else None
+)
+
+
+def output_path(container: str) -> Path:
+    """A new unique file path in OUTPUT_DIR for audio of the given container."""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    return OUTPUT_DIR / f"{uuid.uuid4().hex}.{container.lower()}"
+
+
+def resolve_audio_path(path_or_uri: str) -> Path:
+    """
+    Resolve a local file path or a `file://` URI to an existing file in
+    AUDIO_ROOT, if it is set.
+
+    Args:
+        path_or_uri: A filesystem path, or a URI such as 'file:///tmp/clip.wav'
+
+    Returns:
+        The resolved path
+
+    Raises:
+        PermissionError: If the file is outside AUDIO_ROOT
+        FileNotFoundError: If the path does not point to a regular file
+    """
+    if path_or_uri.startswith("file:"):
+        parsed = urlparse(path_or_uri)
+        path = Path(url2pathname(unquote(parsed.path)))
+    else:
+        path = Path(path_or_uri).expanduser()
+    # Symbolic links are followed, so that they cannot lead out of the root
+    path = path.resolve()
+    if AUDIO_ROOT is not None and not path.is_relative_to(AUDIO_ROOT):
+        raise PermissionError(
+            f"Audio file outside the allowed directory: {path_or_uri}"
+        )
+    if not path.is_file():
+        raise FileNotFoundError(f"Audio file not found: {path_or_uri}")
+    return path
+
+
+def base64_length(size: int) -> int:
+    """Length of the padded base64 encoding of size raw bytes."""
+    return (size + 2) // 3 * 4
+
+
+async def iter_base64(path: Path, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Read a file chunk by chunk and yield its base64 encoding.
+
+    Only one chunk is held in memory at a time, so the concatenation of the
+    yielded chunks equals the base64 encoding of the whole file without ever
+    materializing it.
+    """
+    if chunk_size % 3:
+        raise ValueError("chunk_size must be a multiple of 3")
+    with open(path, "rb") as file:
+        while chunk := await asyncio.to_thread(file.read, chunk_size):
+            yield base64.b64encode(chunk)
@@ -0,0 +1,390 @@
+import asyncio
+import base64
+import binascii
+from contextlib import asynccontextmanager
+from functools import cache
+import io
+import logging
+import os
+from pathlib import Path
+from types import ModuleType
+from typing import AsyncIterator, Callable, Optional
+import wave
+
+from voispark_mcp.core.audio_file import output_path
+
+# Sample rate uploads are downsampled to, 0 (the default) to upload them as given
+UPLOAD_SAMPLE_RATE = int(os.getenv("VOISPARK_UPLOAD_SAMPLE_RATE") or 0)
+# Frames read from a WAV file at a time while it is prepared
+_READ_FRAMES = 64 * 1024
+
+# Zero crossings of the anti-aliasing filter on each side of its center, and
+# its cutoff as a fraction of the new Nyquist frequency
+_FILTER_ZEROS = 16
+_ROLLOFF = 0.9
+
+# Frames of the voice activity detector, and the speech kept around them
+_VAD_FRAME = 0.02
+_VAD_HANGOVER = 0.1
+# Energy in dBFS below which a frame is never speech
+_VAD_FLOOR = -60
+
+# A transform of mono float samples at a sample rate, see `select_speech`
+Transform = Callable[["np.ndarray", int], "np.ndarray"]
+
+
+@cache
+def numpy() -> Optional[ModuleType]:
+    """
+    NumPy, imported on first use so that starting the server does not load
+    it, or None when it is not installed. The first call takes tens of
+    milliseconds, so make it in a worker thread.
+    """
+    try:
+        import numpy
+    except ImportError:  # Installed with the `audio` extra
+        return None
+    return numpy
+
+
+def upload_rate_for(provider: str) -> int:
+    """
+    The sample rate of audio uploaded to a provider, read from
+    `VOISPARK_UPLOAD_SAMPLE_RATE_<PROVIDER>` with UPLOAD_SAMPLE_RATE as default.
+    """
+    value = os.getenv(f"VOISPARK_UPLOAD_SAMPLE_RATE_{provider.upper()}")
+    return int(value) if value else UPLOAD_SAMPLE_RATE
+
+
+def _is_wav(header: bytes) -> bool:
+    return header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+def _samples(frames: bytes, width: int, channels: int) -> "np.ndarray":
+    """Decode interleaved PCM frames to float samples in [-1, 1), one column per channel."""
+    np = numpy()
+    if width == 1:
+        samples = (np.frombuffer(frames, np.uint8).astype(np.float32) - 128) / 128
+    elif width == 3:
+        raw = np.frombuffer(frames, np.uint8).reshape(-1, 3).astype(np.int32)
+        # Shift the sign bit of the 24-bit sample into place and back
+        ints = ((raw[:, 0] | raw[:, 1] << 8 | raw[:, 2] << 16) << 8) >> 8
+        samples = ints.astype(np.float32) / 2**23
+    else:
+        dtype = {2: "<i2", 4: "<i4"}[width]
+        samples = np.frombuffer(frames, dtype).astype(np.float32) / 2 ** (8 * width - 1)
+    return samples.reshape(-1, channels)
+
+
+class Resampler:
+    """
+    Downsample consecutive blocks of mono samples from rate to target_rate.
+
+    The samples are low-pass filtered below the new Nyquist frequency with a
+    Blackman-windowed sinc, then interpolated linearly at the new sample times.
+    Only the samples that the filter and the interpolation still need are
+    kept between blocks, so audio of any length is resampled in bounded memory.
+    """
+
+    def __init__(self, rate: int, target_rate: int, dtype="float32"):
+        np = numpy()
+        self.rate, self.target_rate = rate, target_rate
+        self.step = rate / target_rate
+        cutoff = _ROLLOFF * 0.5 * target_rate / rate
+        self.half = half = int(np.ceil(_FILTER_ZEROS / (2 * cutoff)))
+        taps = np.arange(-half, half + 1)
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.blackman(2 * half + 1)
+        self.kernel = (kernel / kernel.sum()).astype(dtype)
+        # Input samples the filter still needs, preceded by its zero padding
+        self.pending = np.zeros(half, dtype)
+        # Filtered samples still to interpolate, and the index of the first one
+        self.filtered = np.zeros(0, dtype)
+        self.first = 0
+        self.count = 0  # Input samples processed
+        self.emitted = 0  # Output samples returned
+
+    def process(self, samples: "np.ndarray") -> "np.ndarray":
+        """Resample the next block, returning the output samples it completes."""
+        self.count += len(samples)
+        self._filter(samples)
+        # Output samples whose two neighbours are both filtered already
+        ready = int((self.first + len(self.filtered) - 2) // self.step) + 1
+        return self._interpolate(max(self.emitted, ready))
+
+    def flush(self) -> "np.ndarray":
+        """The output samples left after the last block."""
+        np = numpy()
+        self._filter(np.zeros(self.half, self.kernel.dtype))
+        return self._interpolate(int(self.count * self.target_rate / self.rate))
+
+    def _filter(self, samples: "np.ndarray") -> None:
+        np = numpy()
+        pending = np.concatenate([self.pending, samples])
+        if len(pending) <= 2 * self.half:
+            self.pending = pending
+            return
+        # The kernel is symmetric, so convolving equals filtering
+        filtered = np.convolve(pending, self.kernel, mode="valid")
+        self.filtered = np.concatenate([self.filtered, filtered])
+        self.pending = pending[len(filtered) :]
+
+    def _interpolate(self, end: int) -> "np.ndarray":
+        np = numpy()
+        # Interpolate by hand rather than with np.interp, which searches for
+        # every new sample time although they are evenly spaced
+        times = np.arange(self.emitted, end) * self.step
+        index = times.astype(np.intp)
+        weight = (times - index).astype(self.filtered.dtype)
+        index -= self.first
+        last = len(self.filtered) - 1
+        before = self.filtered[np.minimum(index, last)]
+        after = self.filtered[np.minimum(index + 1, last)]
+        self.emitted = max(self.emitted, end)
+        # Drop the filtered samples before the next output sample
+        drop = min(int(self.emitted * self.step) - self.first, len(self.filtered))
+        self.filtered = self.filtered[drop:]
+        self.first += drop
+        return before + (after - before) * weight
+
+
+def resample(samples: "np.ndarray", rate: int, target_rate: int) -> "np.ndarray":
+    """Downsample mono samples from rate to target_rate, see `Resampler`."""
+    if target_rate >= rate or len(samples) == 0:
+        return samples
+    resampler = Resampler(rate, target_rate, samples.dtype)
+    return numpy().concatenate([resampler.process(samples), resampler.flush()])
+
+
+def speech_frames(samples: "np.ndarray", rate: int) -> "np.ndarray":
+    """
+    Detect speech by its energy in frames of _VAD_FRAME seconds.
+
+    A frame is speech when its energy is above _VAD_FLOOR and a threshold
+    set between the noise floor (the 10th percentile of the frame energies)
+    and the loudest frame, and it is not clipped. Frames within
+    _VAD_HANGOVER seconds of speech count as speech too, so that soft word
+    endings are kept.
+
+    Returns:
+        One boolean per whole frame
+    """
+    np = numpy()
+    size = int(rate * _VAD_FRAME)
+    frames = samples[: len(samples) // size * size].reshape(-1, size)
+    if len(frames) == 0:
+        return np.zeros(0, bool)
+    energy = 10 * np.log10(np.einsum("ij,ij->i", frames, frames) / size + 1e-10)
+    peak = energy.max()
+    threshold = np.clip(np.percentile(energy, 10) + 10, peak - 40, peak - 10)
+    clipped = np.abs(frames).max(axis=1) >= 0.999
+    speech = (energy > max(threshold, _VAD_FLOOR)) & ~clipped
+    spread = int(_VAD_HANGOVER / _VAD_FRAME)
+    return np.convolve(speech, np.ones(2 * spread + 1), mode="same") > 0
+
+
+def select_speech(
+    samples: "np.ndarray",
+    rate: int,
+    min_seconds: float,
+    max_seconds: float,
+    max_pause: float,
+) -> "np.ndarray":
+    """
+    Keep the speech of a recording for a voice clone sample.
+
+    Leading and trailing silence is removed and pauses are shortened to
+    max_pause seconds. When more than max_seconds of audio is left, the
+    window of at most max_seconds starting at an utterance with the most
+    speech is kept, ending at the last pause after min_seconds if there is one.
+    A recording without any detected speech is kept as it is.
+    """
+    np = numpy()
+    speech = speech_frames(samples, rate)
+    if not speech.any():
+        return samples
+    count = len(speech)
+    index = np.arange(count)
+    previous = np.maximum.accumulate(np.where(speech, index, -1))
+    following = np.minimum.accumulate(np.where(speech, index, count)[::-1])[::-1]
+    # Half of the pause is kept after the speech before it, half before the next
+    half = int(max_pause / _VAD_FRAME / 2)
+    keep = speech | (
+        (previous >= 0)
+        & (following < count)
+        & ((index - previous <= half) | (following - index <= half))
+    )
+    size = int(rate * _VAD_FRAME)
+    frames = samples[: count * size].reshape(count, size)[keep]
+    speech = speech[keep]
+
+    window = int(max_seconds / _VAD_FRAME)
+    if len(frames) > window:
+        starts = np.flatnonzero(speech & ~np.r_[False, speech[:-1]])
+        totals = np.r_[0, np.cumsum(speech)]
+        ends = np.minimum(starts + window, len(speech))
+        start = starts[np.argmax(totals[ends] - totals[starts])]
+        end = min(start + window, len(speech))
+        shortest = start + int(min_seconds / _VAD_FRAME)
+        pauses = np.flatnonzero(~speech[shortest:end])
+        if len(pauses) and end < len(speech):
+            end = shortest + pauses[-1] + 1
+        frames = frames[start:end]
+    return frames.reshape(-1)
+
+
+def _prepare(
+    source: wave.Wave_read,
+    destination: str | io.BytesIO,
+    target_rate: int,
+    transform: Optional[Transform],
+) -> bool:
+    """
+    Write the WAV of source prepared as in `prepare_wav` to destination,
+    reading it _READ_FRAMES frames at a time.
+
+    Returns:
+        False, writing nothing, when source should be uploaded as it is
+    """
+    np = numpy()
+    channels, width, rate = source.getparams()[:3]
+    if width not in (1, 2, 3, 4) or (
+        transform is None and channels == 1 and width == 2 and rate <= target_rate
+    ):
+        return False
+    new_rate = min(rate, target_rate) if target_rate > 0 else rate
+    resampler = Resampler(rate, new_rate) if new_rate < rate else None
+    # A product with the channel weights is much faster than mean(axis=1)
+    weights = np.full(channels, 1 / channels, np.float32)
+
+    def blocks():
+        while frames := source.readframes(_READ_FRAMES):
+            # A truncated file may end in a partial frame
+            frames = frames[: len(frames) // (channels * width) * channels * width]
+            mono = _samples(frames, width, channels) @ weights
+            yield mono if resampler is None else resampler.process(mono)
+        if resampler is not None:
+            yield resampler.flush()
+
+    with wave.open(destination, "wb") as output:
+        output.setnchannels(1)
+        output.setsampwidth(2)
+        output.setframerate(new_rate)
+        if transform is None:
+            for block in blocks():
+                output.writeframes(_pcm(block))
+        else:
+            # A transform sees the whole recording, after it is downsampled
+            mono = np.concatenate([np.zeros(0, np.float32), *blocks()])
+            output.writeframes(_pcm(transform(mono, new_rate)))
+    return True
+
+
+def _pcm(samples: "np.ndarray") -> bytes:
+    np = numpy()
+    return np.clip(np.round(samples * 32768), -32768, 32767).astype("<i2").tobytes()
+
+
+def prepare_wav(
+    data: bytes, target_rate: int, transform: Optional[Transform] = None
+) -> Optional[bytes]:
+    """
+    Downmix PCM WAV audio to mono, downsample it to target_rate (unless it
+    is 0), apply transform and encode it again as 16-bit PCM WAV.
+
+    Returns:
+        The new WAV, or None to upload data as it is: when it is not PCM WAV,
+        is already mono 16-bit at or below target_rate without a transform,
+        or NumPy is missing
+    """
+    if numpy() is None or not _is_wav(data) or (target_rate <= 0 and transform is None):
+        return None
+    buffer = io.BytesIO()
+    try:
+        with wave.open(io.BytesIO(data), "rb") as source:
+            if not _prepare(source, buffer, target_rate, transform):
+                return None
+    except (wave.Error, EOFError) as e:
+        logging.debug("Uploading audio as it is, cannot decode it: %s", e)
+        return None
+    return buffer.getvalue()
+
+
+def _prepare_file(
+    path: Path, target_rate: int, transform: Optional[Transform]
+) -> Optional[Path]:
+    """Like `prepare_wav` for a file, streamed into a new file in OUTPUT_DIR."""
+    if numpy() is None or (target_rate <= 0 and transform is None):
+        return None
+    with open(path, "rb") as file:
+        if not _is_wav(file.read(12)):
+            return None
+    prepared_path = output_path("wav")
+    try:
+        with wave.open(str(path), "rb") as source:
+            if _prepare(source, str(prepared_path), target_rate, transform):
+                return prepared_path
+    except (wave.Error, EOFError) as e:
+        logging.debug("Uploading audio as it is, cannot decode it: %s", e)
+    except BaseException:
+        prepared_path.unlink(missing_ok=True)
+        raise
+    prepared_path.unlink(missing_ok=True)
+    return None
+
+
+@asynccontextmanager
+async def prepared_upload(
+    path: Optional[Path], provider: str, transform: Optional[Transform] = None
+) -> AsyncIterator[Optional[Path]]:
+    """
+    The audio file to upload to provider in place of path: a downmixed,
+    downsampled and transformed copy for PCM WAV files (see `prepare_wav`),
+    else path itself. The copy is deleted on exit.
+    """
+    if path is None:
+        yield path
+        return
+    prepared = await asyncio.to_thread(
+        _prepare_file, path, upload_rate_for(provider), transform
+    )
+    if prepared is None:
+        yield path
+        return
+    try:
+        yield prepared
+    finally:
+        prepared.unlink(missing_ok=True)
+
+
+def _prepare_base64(
+    audio: str, target_rate: int, transform: Optional[Transform]
+) -> str:
+    if (target_rate <= 0 and transform is None) or numpy() is None:
+        return audio
+    try:
+        data = base64.b64decode(audio, validate=True)
+    except (binascii.Error, ValueError):
+        return audio
+    prepared = prepare_wav(data, target_rate, transform)
+    return audio if prepared is None else base64.b64encode(prepared).decode()
+
+
+async def prepare_base64(
+    audio: str, provider: str, transform: Optional[Transform] = None
+) -> str:
+    """Like `prepared_upload`, for base64 encoded audio."""
+    target_rate = upload_rate_for(provider)
+    if not audio or (target_rate <= 0 and transform is None):
+        return audio
+    return await asyncio.to_thread(_prepare_base64, audio, target_rate, transform)
+
+
+def wav_seconds(source: bytes | Path) -> Optional[float]:
+    """The duration of WAV audio, read from its header, or None if it is not WAV."""
+    try:
+        with wave.open(
+            io.BytesIO(source) if isinstance(source, bytes) else str(source)
+        ) as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError, ZeroDivisionError):
+        return None
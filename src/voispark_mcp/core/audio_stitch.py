@@ -0,0 +1,70 @@
+import io
+from pathlib import Path
+import wave
+
+from voispark_mcp.msg.audio_msg import AudioFormat
+
+
+def _strip_id3(data: bytes, keep_header: bool, keep_trailer: bool) -> bytes:
+    """Remove the ID3v2 header and the ID3v1 trailer of an MP3 chunk."""
+    if not keep_header and data[:3] == b"ID3" and len(data) >= 10:
+        # The tag size is a 28-bit syncsafe integer after the 6-byte prefix
+        size = 0
+        for byte in data[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        data = data[10 + size + footer :]
+    if not keep_trailer and len(data) >= 128 and data[-128:-125] == b"TAG":
+        data = data[:-128]
+    return data
+
+
+def _stitch_wav(parts: list[bytes], path: Path) -> None:
+    with wave.open(str(path), "wb") as output:
+        for index, part in enumerate(parts):
+            with wave.open(io.BytesIO(part), "rb") as chunk:
+                params = chunk.getparams()
+                if index == 0:
+                    output.setparams(params)
+                elif params[:3] != output.getparams()[:3]:
+                    raise ValueError(f"WAV chunk {index} has different parameters")
+                output.writeframes(chunk.readframes(params.nframes))
+
+
+def stitch_audio(parts: list[bytes], formats: list[AudioFormat], path: Path) -> None:
+    """
+    Concatenate audio chunks of one format, in order, into a single file.
+
+    WAV chunks are joined by their sample frames under one header, MP3
+    chunks frame by frame with the ID3 tags between chunks removed, and raw
+    PCM chunks byte by byte.
+
+    Args:
+        parts: The encoded audio of every chunk
+        formats: The format reported for every chunk
+        path: The file to write
+
+    Raises:
+        ValueError: If the chunks differ in format or the container is not supported
+    """
+    if not parts or len(parts) != len(formats):
+        raise ValueError("Every audio chunk needs exactly one format")
+    if any(audio_format != formats[0] for audio_format in formats[1:]):
+        raise ValueError("Audio chunks have different formats")
+    container = formats[0].container.lower()
+
+    if container == "wav":
+        _stitch_wav(parts, path)
+    elif container == "mp3":
+        with open(path, "wb") as output:
+            last = len(parts) - 1
+            for index, part in enumerate(parts):
+                output.write(
+                    _strip_id3(part, keep_header=index == 0, keep_trailer=index == last)
+                )
+    elif container in ("pcm", "raw"):
+        with open(path, "wb") as output:
+            for part in parts:
+                output.write(part)
+    else:
+        raise ValueError(f"Cannot stitch {formats[0].container} audio")
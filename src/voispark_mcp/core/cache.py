@@ -0,0 +1,187 @@
+import asyncio
+from dataclasses import dataclass, field
+import functools
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+DEFAULT_TTL = float(os.getenv("VOISPARK_CACHE_TTL") or 3600)
+
+
+def ttl_from_env(name: str, default: float = DEFAULT_TTL) -> float:
+    """
+    Read the TTL of a named cache from `VOISPARK_CACHE_TTL_<NAME>`.
+
+    Args:
+        name: The cache name, e.g. 'tts_models'
+        default: TTL in seconds used when the variable is not set
+
+    Returns:
+        The TTL in seconds, 0 disables the cache
+    """
+    value = os.getenv(f"VOISPARK_CACHE_TTL_{name.upper()}")
+    return float(value) if value else default
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    refresh: Optional[asyncio.Task] = None
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+
+
+@dataclass
+class TTLCache:
+    """
+    An in-memory TTL cache with stale-while-revalidate semantics.
+
+    A fresh entry is returned as is. Once an entry is stale it keeps being
+    served while a single background task reloads it. Values are shared
+    between callers and must not be mutated.
+    """
+
+    name: str
+    ttl: float
+    stats: CacheStats = field(default_factory=CacheStats)
+    _entries: dict[Hashable, _Entry] = field(default_factory=dict)
+
+    async def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda value: True,
+    ) -> Any:
+        """
+        Return the cached value for key, loading it on a miss.
+
+        Args:
+            key: The cache key
+            loader: Coroutine factory producing a fresh value
+            cacheable: Predicate deciding whether a loaded value is stored
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        if self.ttl <= 0:
+            return await loader()
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            value = await loader()
+            if cacheable(value):
+                self._entries[key] = _Entry(value, time.monotonic() + self.ttl)
+            return value
+
+        if time.monotonic() < entry.expires_at:
+            self.stats.hits += 1
+        else:
+            self.stats.stale_hits += 1
+            if entry.refresh is None:
+                entry.refresh = asyncio.create_task(
+                    self._refresh(key, entry, loader, cacheable)
+                )
+        return entry.value
+
+    async def _refresh(
+        self,
+        key: Hashable,
+        entry: _Entry,
+        loader: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool],
+    ) -> None:
+        self.stats.refreshes += 1
+        try:
+            value = await loader()
+        except Exception:
+            self.stats.refresh_errors += 1
+            logging.exception("Failed to refresh cache %s", self.name)
+            return
+        finally:
+            entry.refresh = None
+        if not cacheable(value):
+            self.stats.refresh_errors += 1
+            logging.warning("Refresh of cache %s returned %r", self.name, value)
+            return
+        # Skip the update if the entry was invalidated while refreshing
+        if self._entries.get(key) is entry:
+            self._entries[key] = _Entry(value, time.monotonic() + self.ttl)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one entry, or every entry when key is None."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+_caches: dict[str, TTLCache] = {}
+
+
+def cached(name: str, ttl: Optional[float] = None):
+    """
+    Cache the dict results of an api getter in a named TTLCache.
+
+    The `session` keyword argument is not part of the cache key, and string
+    results (the getters' error messages) are never cached.
+
+    Args:
+        name: The cache name, also used to read its TTL from the environment
+        ttl: TTL in seconds, defaults to `ttl_from_env(name)`
+    """
+    cache = TTLCache(name, ttl_from_env(name) if ttl is None else ttl)
+    _caches[name] = cache
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, session=None, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return await cache.get(
+                key,
+                lambda: fn(*args, session=session, **kwargs),
+                cacheable=lambda value: isinstance(value, dict),
+            )
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def invalidate(name: Optional[str] = None) -> list[str]:
+    """
+    Invalidate one named cache, or all caches when name is None.
+
+    Returns:
+        The names of the invalidated caches
+    """
+    names = list(_caches) if name is None else [name] if name in _caches else []
+    for cache_name in names:
+        _caches[cache_name].invalidate()
+    return names
+
+
+def cache_stats() -> dict[str, dict]:
+    """Hit/miss counters, TTL and size of every named cache."""
+    return {
+        name: {
+            "ttl": cache.ttl,
+            "size": len(cache._entries),
+            "hits": cache.stats.hits,
+            "stale_hits": cache.stats.stale_hits,
+            "misses": cache.stats.misses,
+            "refreshes": cache.stats.refreshes,
+            "refresh_errors": cache.stats.refresh_errors,
+        }
+        for name, cache in _caches.items()
+    }
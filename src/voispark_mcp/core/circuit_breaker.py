@@ -0,0 +1,112 @@
+import logging
+import os
+import time
+from typing import Literal, Optional
+
+BREAKER_FAILURES = int(os.getenv("VOISPARK_BREAKER_FAILURES") or 5)
+BREAKER_RESET_TIMEOUT = float(os.getenv("VOISPARK_BREAKER_RESET_TIMEOUT") or 30)
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a provider whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Fail fast on requests to a provider that keeps failing.
+
+    The circuit opens after `failures` consecutive transient failures. While
+    it is open every request fails immediately with CircuitOpenError. After
+    reset_timeout seconds one trial request is let through (half open): its
+    success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failures: int = BREAKER_FAILURES,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.name = name
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.state: BreakerState = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        # Start of the trial request in flight while half open; a trial that was
+        # cancelled without an outcome is superseded after reset_timeout
+        self._trial_started: Optional[float] = None
+
+    def before_call(self) -> None:
+        """
+        Raises:
+            CircuitOpenError: If the circuit is open, or half open with a trial in flight
+        """
+        if self.state == "open":
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    f"Provider {self.name} is unavailable, retry in {remaining:.0f}s"
+                )
+            self._transition("half_open")
+        if self.state == "half_open":
+            now = time.monotonic()
+            if (
+                self._trial_started is not None
+                and now - self._trial_started < self.reset_timeout
+            ):
+                self.rejected += 1
+                raise CircuitOpenError(f"Provider {self.name} is being probed")
+            self._trial_started = now
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self._trial_started = None
+        if self.state != "closed":
+            self._transition("closed")
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_started = None
+        if self.state == "half_open" or (
+            self.state == "closed" and self.consecutive_failures >= self.failures
+        ):
+            self.opened_at = time.monotonic()
+            self._transition("open")
+
+    def status(self) -> dict:
+        retry_in = None
+        if self.state == "open":
+            retry_in = max(self.opened_at + self.reset_timeout - time.monotonic(), 0)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+            "retry_in": retry_in,
+        }
+
+    def _transition(self, state: BreakerState) -> None:
+        logging.warning(
+            "Circuit of provider %s: %s -> %s", self.name, self.state, state
+        )
+        self.state = state
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def circuit_breaker(provider: str) -> CircuitBreaker:
+    """The circuit breaker of a provider, created on first use."""
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        breaker = _breakers[provider] = CircuitBreaker(provider)
+    return breaker
+
+
+def breaker_states() -> dict[str, dict]:
+    """The state and counters of every provider's circuit breaker."""
+    return {name: breaker.status() for name, breaker in _breakers.items()}
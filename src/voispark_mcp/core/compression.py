@@ -0,0 +1,143 @@
+import asyncio
+import zlib
+from typing import Optional, Protocol
+
+try:
+    import brotli
+except ImportError:  # Installed with the `compression` extra
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # Installed with the `compression` extra
+    zstandard = None
+
+# Bodies larger than this are compressed or decompressed in a worker thread
+MAX_SYNC_SIZE = 256 * 1024
+
+# Levels favouring speed: the bodies are sent once, right after compression
+_GZIP_LEVEL = 6
+_BROTLI_QUALITY = 4
+_ZSTD_LEVEL = 3
+
+
+class Codec(Protocol):
+    """An incremental compressor or decompressor."""
+
+    def process(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+class _Zlib:
+    def __init__(self, compress: bool):
+        if compress:
+            codec = zlib.compressobj(_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self.process = codec.compress
+        else:
+            # wbits 47 accepts both gzip and zlib (HTTP deflate) streams
+            codec = zlib.decompressobj(47)
+            self.process = codec.decompress
+        self.flush = codec.flush
+
+
+class _Brotli:
+    def __init__(self, compress: bool):
+        if compress:
+            codec = brotli.Compressor(quality=_BROTLI_QUALITY)
+            self.process, self.flush = codec.process, codec.finish
+        else:
+            codec = brotli.Decompressor()
+            self.process, self.flush = codec.process, bytes
+
+
+class _Zstd:
+    def __init__(self, compress: bool):
+        if compress:
+            codec = zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compressobj()
+            self.process, self.flush = codec.compress, codec.flush
+        else:
+            codec = zstandard.ZstdDecompressor().decompressobj()
+            self.process, self.flush = codec.decompress, bytes
+
+
+_CODECS = {
+    name: codec
+    for name, codec, available in (
+        ("zstd", _Zstd, zstandard is not None),
+        ("br", _Brotli, brotli is not None),
+        ("gzip", _Zlib, True),
+        ("deflate", _Zlib, True),
+    )
+    if available
+}
+
+# Content encodings that can be decoded, by preference
+ENCODINGS = tuple(_CODECS)
+
+
+def accept_encoding() -> str:
+    """The Accept-Encoding header value listing every supported encoding."""
+    return ", ".join(ENCODINGS)
+
+
+def _codec(encoding: str, compress: bool) -> Codec:
+    encoding = encoding.strip().lower()
+    codec = _CODECS.get(encoding)
+    if codec is None or (compress and encoding == "deflate"):
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+    return codec(compress)
+
+
+def compressor(encoding: str) -> Codec:
+    """
+    An incremental compressor for a content encoding: gzip, br or zstd.
+
+    Raises:
+        ValueError: If the encoding is not supported or its package is missing
+    """
+    return _codec(encoding, compress=True)
+
+
+def decompressor(encoding: str) -> Codec:
+    """
+    An incremental decompressor for a content encoding, see ENCODINGS.
+
+    Raises:
+        ValueError: If the encoding is not supported or its package is missing
+    """
+    return _codec(encoding, compress=False)
+
+
+def _apply(codec: Codec, data: bytes) -> bytes:
+    return codec.process(data) + codec.flush()
+
+
+async def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a whole body, in a worker thread when it is large."""
+    codec = compressor(encoding)
+    if len(data) > MAX_SYNC_SIZE:
+        return await asyncio.to_thread(_apply, codec, data)
+    return _apply(codec, data)
+
+
+async def decompress(data: bytes, encoding: Optional[str]) -> bytes:
+    """
+    Decode a whole body by its Content-Encoding, which may list several
+    encodings in the order they were applied.
+
+    Raises:
+        ValueError: If an encoding is not supported or the body is corrupt
+    """
+    for name in reversed((encoding or "").split(",")):
+        name = name.strip().lower()
+        if name in ("", "identity"):
+            continue
+        codec = decompressor(name)
+        try:
+            if len(data) > MAX_SYNC_SIZE:
+                data = await asyncio.to_thread(_apply, codec, data)
+            else:
+                data = _apply(codec, data)
+        except Exception as e:
+            raise ValueError(f"Corrupt {name} body: {e}") from e
+    return data
@@ -0,0 +1,104 @@
+from typing import Any, Callable, Type
+
+from pydantic import BaseModel
+from pydantic_core import CoreSchema, SchemaValidator
+
+# Schemas of functions that may expect model instances rather than dicts
+_FUNCTION_SCHEMAS = ("function-after", "function-wrap", "function-plain")
+
+
+class UnsupportedSchema(Exception):
+    """Raised when a model cannot be validated into plain dicts, see `dict_schema`."""
+
+
+def _convert(schema: Any) -> Any:
+    if isinstance(schema, list):
+        return [_convert(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    kind = schema.get("type")
+    if kind in _FUNCTION_SCHEMAS:
+        raise UnsupportedSchema(f"{kind} validator")
+    if kind == "model":
+        return _typed_dict(schema)
+    return {key: _convert(value) for key, value in schema.items()}
+
+
+def _typed_dict(model: dict) -> dict:
+    fields = model["schema"]
+    if (
+        fields.get("type") != "model-fields"
+        or fields.get("computed_fields")
+        or model.get("root_model")
+        or model.get("post_init")
+        or "allow" in (fields.get("extra_behavior"), model.get("extra_behavior"))
+    ):
+        raise UnsupportedSchema(f"model {model['cls'].__name__}")
+    typed_dict = {
+        "type": "typed-dict",
+        "fields": {
+            name: {
+                "type": "typed-dict-field",
+                "schema": _convert(field["schema"]),
+                # Fields with a default are filled in when missing, as in models
+                "required": field["schema"].get("type") != "default",
+                **{
+                    key: field[key]
+                    for key in ("validation_alias", "serialization_alias")
+                    if key in field
+                },
+            }
+            for name, field in fields["fields"].items()
+        },
+    }
+    for key in ("ref", "config"):
+        if key in model:
+            typed_dict[key] = model[key]
+    return typed_dict
+
+
+def dict_schema(model: Type[BaseModel]) -> CoreSchema:
+    """
+    The core schema of a model with every nested model replaced by a typed dict.
+
+    Validating with it checks and coerces the same fields as the model and
+    fills in defaults, but produces the plain dicts that `model_dump()` would
+    return without building model instances first.
+
+    Raises:
+        UnsupportedSchema: If a model has computed fields, allows extra fields,
+            or has validators that may expect model instances
+    """
+    return _convert(model.__pydantic_core_schema__)
+
+
+# One validator per (response model, as_dict)
+_decoders: dict[tuple[type, bool], Callable[[bytes], Any]] = {}
+
+
+def decoder(model: Type[BaseModel], as_dict: bool = False) -> Callable[[bytes], Any]:
+    """
+    A cached function parsing a JSON response body into model.
+
+    With as_dict the body is validated straight into plain dicts, see
+    `dict_schema`, falling back to `model_validate_json(...).model_dump()`
+    for models that do not support it. The result is JSON-ready either way.
+
+    Raises:
+        pydantic.ValidationError: From the returned function, if the body is invalid
+    """
+    key = (model, as_dict)
+    decode = _decoders.get(key)
+    if decode is None:
+        if not as_dict:
+            decode = model.model_validate_json
+        else:
+            try:
+                decode = SchemaValidator(dict_schema(model)).validate_json
+            except UnsupportedSchema:
+
+                def decode(body: bytes) -> dict:
+                    return model.model_validate_json(body).model_dump()
+
+        _decoders[key] = decode
+    return decode
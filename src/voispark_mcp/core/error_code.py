@@ -42,5 +42,21 @@ class ErrorCode(Enum):
                 return member
         return None
 
+    @classmethod
+    def is_retryable(cls, code_value: int) -> bool:
+        """
+        Whether a failed request with this response code may succeed when retried.
+
+        The known codes are client errors that a retry cannot fix. Unknown codes
+        from 50000 up mirror HTTP 5xx server errors and are considered transient.
+
+        Args:
+            code_value: The numeric code of a response.
+
+        Returns:
+            True if the request should be retried.
+        """
+        return cls.get_by_code(code_value) is None and code_value >= 50000
+
     def __str__(self) -> str:
         return f"{self.name}(code={self.code}, message='{self.message}')"
@@ -0,0 +1,263 @@
+import asyncio
+from collections import defaultdict
+from contextlib import aclosing
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+from pathlib import Path
+import sqlite3
+import time
+from typing import AsyncGenerator, Callable, Optional
+
+HISTORY_INDEX_DIR = Path(
+    os.getenv("VOISPARK_HISTORY_INDEX_DIR")
+    or Path.home() / ".cache" / "voispark" / "history"
+)
+# Seconds a source is searched without checking the server for new entries
+HISTORY_SYNC_INTERVAL = float(os.getenv("VOISPARK_HISTORY_SYNC_INTERVAL") or 60)
+
+HISTORY_SOURCES = ("tts", "voice_changer", "conversation")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    history_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    voice_id TEXT,
+    model_id TEXT,
+    created_at INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_source ON history (source, created_at);
+CREATE INDEX IF NOT EXISTS history_provider ON history (provider, created_at);
+CREATE INDEX IF NOT EXISTS history_voice_id ON history (voice_id, created_at);
+CREATE INDEX IF NOT EXISTS history_model_id ON history (model_id, created_at);
+CREATE INDEX IF NOT EXISTS history_created_at ON history (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS history_text USING fts5(
+    text, content='history', content_rowid='rowid', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS history_insert AFTER INSERT ON history BEGIN
+    INSERT INTO history_text (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS history_delete AFTER DELETE ON history BEGIN
+    INSERT INTO history_text (history_text, rowid, text)
+    VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS history_update AFTER UPDATE ON history BEGIN
+    INSERT INTO history_text (history_text, rowid, text)
+    VALUES ('delete', old.rowid, old.text);
+    INSERT INTO history_text (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TABLE IF NOT EXISTS syncs (
+    source TEXT PRIMARY KEY,
+    watermark INTEGER NOT NULL,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+def timestamp(value: str) -> int:
+    """
+    Parse an ISO 8601 date or datetime, e.g. '2025-06-01' or
+    '2025-06-01T12:00:00+02:00', into Unix seconds. Times without an offset
+    are taken as UTC.
+
+    Raises:
+        ValueError: If value is not an ISO 8601 date or datetime
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _text(entry: dict) -> str:
+    """The searchable text of a History or ConversationHistory entry."""
+    if "conversation" in entry:
+        return "\n".join(turn["text"] for turn in entry["conversation"])
+    return entry.get("ref_text", "")
+
+
+def _match(query: str) -> str:
+    """An FTS5 query matching every word of query, free of FTS5 syntax."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+class HistoryIndex:
+    """
+    A local SQLite index of the generation history of one API key, with
+    indexed filters and a full-text index of the generated text.
+
+    Each source is synced incrementally: entries are read newest first and
+    the sync stops at the first entry older than the newest one stored (the
+    watermark), so only pages with new entries are fetched. Entries deleted
+    on the server stay in the index until it is cleared.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        directory: Path = HISTORY_INDEX_DIR,
+        sync_interval: float = HISTORY_SYNC_INTERVAL,
+    ):
+        directory.mkdir(parents=True, exist_ok=True)
+        # One index per API key, named by a short hash so that the key never shows
+        key_id = hashlib.sha256((api_key or "").encode()).hexdigest()[:8]
+        self.path = directory / f"history-{key_id}.sqlite3"
+        self.sync_interval = sync_interval
+        self._locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._db = sqlite3.connect(self.path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def needs_sync(self, source: str) -> bool:
+        """Whether source was not synced within the sync interval."""
+        row = self._db.execute(
+            "SELECT synced_at FROM syncs WHERE source = ?", (source,)
+        ).fetchone()
+        return row is None or time.time() - row[0] > self.sync_interval
+
+    async def sync(
+        self,
+        source: str,
+        fetch: Callable[[], AsyncGenerator[dict, None]],
+        force: bool = False,
+    ) -> Optional[int]:
+        """
+        Add the entries of source newer than the watermark, unless source was
+        synced within the sync interval. Concurrent syncs of a source wait for
+        the first one instead of fetching again.
+
+        Args:
+            source: 'tts', 'voice_changer' or 'conversation'
+            fetch: Returns the history of source, newest first, e.g. `iter_history`
+            force: Sync even if source was synced within the sync interval
+
+        Returns:
+            The number of entries added or updated, or None if the sync was skipped
+        """
+        async with self._locks[source]:
+            if not force and not self.needs_sync(source):
+                return None
+            row = self._db.execute(
+                "SELECT watermark FROM syncs WHERE source = ?", (source,)
+            ).fetchone()
+            watermark = row[0] if row is not None else None
+            newest = watermark or 0
+            rows = []
+            async with aclosing(fetch()) as entries:
+                async for entry in entries:
+                    # Entries created in the same second as the watermark may be new
+                    if watermark is not None and entry["created_at"] < watermark:
+                        break
+                    newest = max(newest, entry["created_at"])
+                    rows.append(
+                        (
+                            entry["history_id"],
+                            source,
+                            entry["provider"],
+                            entry.get("voice_id"),
+                            entry.get("model_id"),
+                            entry["created_at"],
+                            _text(entry),
+                            json.dumps(entry),
+                        )
+                    )
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT INTO history VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (history_id) DO UPDATE SET entry = excluded.entry, "
+                    "text = excluded.text",
+                    rows,
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?)",
+                    (source, newest, time.time()),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return len(rows)
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        source: Optional[str] = None,
+        provider: Optional[str] = None,
+        voice_id: Optional[str] = None,
+        model_id: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        limit: int = 20,
+    ) -> list[dict]:
+        """
+        Find indexed entries, newest first.
+
+        Args:
+            query: Words that must all occur in the generated text
+            since: Earliest created_at in Unix seconds, inclusive
+            until: Latest created_at in Unix seconds, exclusive
+
+        Returns:
+            The entries, each with its source
+        """
+        conditions, params = [], []
+        for column, value in (
+            ("source", source),
+            ("provider", provider),
+            ("voice_id", voice_id),
+            ("model_id", model_id),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("created_at < ?")
+            params.append(until)
+        if query and query.strip():
+            conditions.append(
+                "rowid IN (SELECT rowid FROM history_text WHERE history_text MATCH ?)"
+            )
+            params.append(_match(query))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._db.execute(
+            f"SELECT source, entry FROM history {where} "
+            "ORDER BY created_at DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [{"source": source, **json.loads(entry)} for source, entry in rows]
+
+    def clear(self) -> None:
+        self._db.execute("DELETE FROM history")
+        self._db.execute("DELETE FROM syncs")
+
+    def stats(self) -> dict:
+        counts = dict(
+            self._db.execute(
+                "SELECT source, COUNT(*) FROM history GROUP BY source"
+            ).fetchall()
+        )
+        return {
+            "entries": sum(counts.values()),
+            "sources": {
+                source: {
+                    "entries": counts.get(source, 0),
+                    "watermark": watermark,
+                    "synced_at": synced_at,
+                }
+                for source, watermark, synced_at in self._db.execute(
+                    "SELECT source, watermark, synced_at FROM syncs"
+                ).fetchall()
+            },
+        }
@@ -0,0 +1,277 @@
+from bisect import bisect_left
+import contextvars
+import functools
+import inspect
+import time
+from typing import Callable, Optional
+
+# Upper bounds of the latency buckets in seconds and of the size buckets in bytes
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+SIZE_BUCKETS = tuple(256 * 4**exponent for exponent in range(11))
+
+
+class Histogram:
+    """Counts of observations in fixed buckets, as in Prometheus histograms."""
+
+    __slots__ = ("bounds", "counts", "sum", "count", "min", "max")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        # One count per bound, then one for the observations above every bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile by linear interpolation within its bucket, clamped
+        to the smallest and largest observation.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        estimate = self.max
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index < len(self.bounds):
+                    lower = self.bounds[index - 1] if index else 0.0
+                    upper = self.bounds[index]
+                    estimate = lower + (upper - lower) * (rank - seen) / count
+                break
+            seen += count
+        return round(min(max(estimate, self.min), self.max), 6)
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "max": round(self.max, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+# Latency by (kind, name, provider), kind being "api", "tool" or "resource"
+_latency: dict[tuple[str, str, str], Histogram] = {}
+# Calls in progress by (kind, name)
+_in_flight: dict[tuple[str, str], int] = {}
+# Errors by (endpoint, code): ErrorCode names, HTTP statuses or exception types
+_errors: dict[tuple[str, str], int] = {}
+# Payload sizes by (endpoint, direction), direction being "request" or "response"
+_payload: dict[tuple[str, str], Histogram] = {}
+
+# The api function being executed, used to label the requests it sends
+current_endpoint: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_endpoint", default=None
+)
+
+
+def record_error(endpoint: str, code: str) -> None:
+    _errors[endpoint, code] = _errors.get((endpoint, code), 0) + 1
+
+
+def observe_payload(endpoint: str, direction: str, size: int) -> None:
+    histogram = _payload.get((endpoint, direction))
+    if histogram is None:
+        histogram = _payload[endpoint, direction] = Histogram(SIZE_BUCKETS)
+    histogram.observe(size)
+
+
+def _provider_of(fn) -> Callable[[tuple, dict], Optional[str]]:
+    """Build a getter of the provider a call of fn is for, from its arguments."""
+    names = list(inspect.signature(fn).parameters)
+    for name in ("provider", "provider_id", "request"):
+        if name in names:
+            index = names.index(name)
+            break
+    else:
+        return lambda args, kwargs: None
+
+    def provider(args: tuple, kwargs: dict) -> Optional[str]:
+        value = args[index] if index < len(args) else kwargs.get(name)
+        if name == "request":
+            value = getattr(value, "provider", None)
+        return value if isinstance(value, str) else None
+
+    return provider
+
+
+def timed(kind: str):
+    """
+    Record the latency, in-flight count and failures of an async function.
+
+    A call fails when it raises or, as api functions and MCP handlers report
+    errors as messages, when it returns a string. Calls of "api" functions
+    also label the HTTP requests they send, see `current_endpoint`.
+
+    Args:
+        kind: "api" for api functions, "tool" or "resource" for MCP handlers
+    """
+
+    def decorator(fn):
+        name = fn.__name__
+        provider_of = _provider_of(fn)
+        gauge = (kind, name)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key = (kind, name, provider_of(args, kwargs) or "")
+            token = current_endpoint.set(name) if kind == "api" else None
+            _in_flight[gauge] = _in_flight.get(gauge, 0) + 1
+            start = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                record_error(name, type(e).__name__)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                _in_flight[gauge] -= 1
+                if token is not None:
+                    current_endpoint.reset(token)
+                histogram = _latency.get(key)
+                if histogram is None:
+                    histogram = _latency[key] = Histogram(LATENCY_BUCKETS)
+                histogram.observe(elapsed)
+            if isinstance(result, str):
+                record_error(name, "error_message")
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _hit_ratio(stats: dict) -> Optional[float]:
+    hits = stats.get("hits", 0) + stats.get("stale_hits", 0)
+    total = hits + stats.get("misses", 0)
+    return round(hits / total, 4) if total else None
+
+
+def snapshot(caches: Optional[dict[str, dict]] = None) -> dict:
+    """
+    All metrics as a JSON-serializable dict.
+
+    Args:
+        caches: Stats of the caches by name, each with hits and misses counters
+    """
+    latency: dict = {}
+    for (kind, name, provider), histogram in sorted(_latency.items()):
+        entry = latency.setdefault(kind, {}).setdefault(name, {})
+        entry[provider or "all"] = histogram.summary()
+    errors: dict = {}
+    for (endpoint, code), count in sorted(_errors.items()):
+        errors.setdefault(endpoint, {})[code] = count
+    payload: dict = {}
+    for (endpoint, direction), histogram in sorted(_payload.items()):
+        payload.setdefault(endpoint, {})[direction] = histogram.summary()
+    return {
+        "latency": latency,
+        "in_flight": {
+            f"{kind}:{name}": count for (kind, name), count in _in_flight.items()
+        },
+        "errors": errors,
+        "payload_bytes": payload,
+        "cache_hit_ratio": {
+            name: _hit_ratio(stats) for name, stats in (caches or {}).items()
+        },
+    }
+
+
+def _labels(**labels: str) -> str:
+    escaped = (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in labels.values()
+    )
+    return (
+        "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+    )
+
+
+def _histogram_lines(metric: str, histogram: Histogram, **labels: str) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        lines.append(f"{metric}_bucket{_labels(**labels, le=str(bound))} {cumulative}")
+    lines.append(f"{metric}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+    lines.append(f"{metric}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{metric}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def prometheus_text(caches: Optional[dict[str, dict]] = None) -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = ["# TYPE voispark_latency_seconds histogram"]
+    for (kind, name, provider), histogram in sorted(_latency.items()):
+        lines += _histogram_lines(
+            "voispark_latency_seconds",
+            histogram,
+            kind=kind,
+            name=name,
+            provider=provider,
+        )
+    lines.append("# TYPE voispark_in_flight gauge")
+    for (kind, name), count in sorted(_in_flight.items()):
+        lines.append(f"voispark_in_flight{_labels(kind=kind, name=name)} {count}")
+    lines.append("# TYPE voispark_errors_total counter")
+    for (endpoint, code), count in sorted(_errors.items()):
+        lines.append(
+            f"voispark_errors_total{_labels(endpoint=endpoint, code=code)} {count}"
+        )
+    lines.append("# TYPE voispark_payload_bytes histogram")
+    for (endpoint, direction), histogram in sorted(_payload.items()):
+        lines += _histogram_lines(
+            "voispark_payload_bytes",
+            histogram,
+            endpoint=endpoint,
+            direction=direction,
+        )
+    lines.append("# TYPE voispark_cache_hits_total counter")
+    lines.append("# TYPE voispark_cache_misses_total counter")
+    for name, stats in sorted((caches or {}).items()):
+        hits = stats.get("hits", 0) + stats.get("stale_hits", 0)
+        lines.append(f"voispark_cache_hits_total{_labels(cache=name)} {hits}")
+        lines.append(
+            f"voispark_cache_misses_total{_labels(cache=name)} {stats.get('misses', 0)}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Clear every metric."""
+    _latency.clear()
+    _in_flight.clear()
+    _errors.clear()
+    _payload.clear()
@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import os
+import time
+from typing import Optional
+
+
+def _limit(name: str, default: float = 0.0) -> float:
+    return float(os.getenv(name) or default)
+
+
+# Credits per second allowed for each provider, 0 disables the limit
+RATE_LIMIT = _limit("VOISPARK_RATE_LIMIT")
+RATE_LIMIT_BURST = _limit("VOISPARK_RATE_LIMIT_BURST")
+# Credits per second allowed for the API key across all providers
+RATE_LIMIT_KEY = _limit("VOISPARK_RATE_LIMIT_KEY")
+RATE_LIMIT_KEY_BURST = _limit("VOISPARK_RATE_LIMIT_KEY_BURST")
+# Longest a request may queue for credits before it is rejected
+RATE_LIMIT_MAX_WAIT = _limit("VOISPARK_RATE_LIMIT_MAX_WAIT", 30.0)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than RATE_LIMIT_MAX_WAIT."""
+
+
+class TokenBucket:
+    """
+    A token bucket refilled with `rate` tokens per second up to `burst`.
+
+    Requests reserve their cost up front and the balance may go negative: the
+    deficit is the queue of admitted requests, so each one sleeps until the
+    bucket has refilled its share and requests are served in arrival order.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float = 0.0):
+        self.name = name
+        self.rate = rate
+        # Without an explicit burst, allow one second worth of credits at once
+        self.burst = burst or rate
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.admitted = 0
+        self.rejected = 0
+        self.waited = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost: float) -> float:
+        """Seconds a request of the given cost would wait if reserved now."""
+        self._refill()
+        return max(cost - self.tokens, 0.0) / self.rate
+
+    def reserve(self, cost: float) -> None:
+        self._refill()
+        self.tokens -= cost
+        self.admitted += 1
+
+    def refund(self, cost: float) -> None:
+        self._refill()
+        self.tokens = min(self.burst, self.tokens + cost)
+
+    def status(self) -> dict:
+        self._refill()
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 3),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "waited": round(self.waited, 3),
+        }
+
+
+_buckets: dict[str, TokenBucket] = {}
+
+
+def _provider_limit(provider: str) -> tuple[float, float]:
+    """Rate and burst of a provider, overridable with VOISPARK_RATE_LIMIT_<PROVIDER>."""
+    name = provider.upper()
+    return (
+        _limit(f"VOISPARK_RATE_LIMIT_{name}", RATE_LIMIT),
+        _limit(f"VOISPARK_RATE_LIMIT_BURST_{name}", RATE_LIMIT_BURST),
+    )
+
+
+def _bucket(name: str, rate: float, burst: float) -> Optional[TokenBucket]:
+    if rate <= 0:
+        return None
+    bucket = _buckets.get(name)
+    if bucket is None:
+        bucket = _buckets[name] = TokenBucket(name, rate, burst)
+    return bucket
+
+
+def _buckets_for(provider: str, api_key: Optional[str]) -> list[TokenBucket]:
+    buckets = [_bucket(f"provider:{provider}", *_provider_limit(provider))]
+    if api_key:
+        # Identify the key by a short hash so that it never shows up in stats
+        key_id = hashlib.sha256(api_key.encode()).hexdigest()[:8]
+        buckets.append(_bucket(f"key:{key_id}", RATE_LIMIT_KEY, RATE_LIMIT_KEY_BURST))
+    return [bucket for bucket in buckets if bucket is not None]
+
+
+def rate_limited(provider: str) -> bool:
+    """Whether requests for the provider are rate limited at all."""
+    return RATE_LIMIT_KEY > 0 or _provider_limit(provider)[0] > 0
+
+
+async def admit(
+    provider: str,
+    cost: float = 1.0,
+    api_key: Optional[str] = None,
+    max_wait: Optional[float] = None,
+) -> float:
+    """
+    Wait until a request of the given credit cost may be sent.
+
+    The request is charged to the provider's bucket and the API key's bucket,
+    and waits for whichever of them has the longer queue.
+
+    Args:
+        provider: The provider the request is sent to
+        cost: The estimated credit cost of the request, see `credit_of`
+        api_key: The API key the request is sent with
+        max_wait: The longest acceptable wait, RATE_LIMIT_MAX_WAIT by default
+
+    Returns:
+        The number of seconds waited
+
+    Raises:
+        RateLimitExceeded: If the request would wait longer than max_wait
+    """
+    buckets = _buckets_for(provider, api_key)
+    if not buckets:
+        return 0.0
+    max_wait = RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+    wait = max(bucket.wait_time(cost) for bucket in buckets)
+    if wait > max_wait:
+        for bucket in buckets:
+            bucket.rejected += 1
+        raise RateLimitExceeded(
+            f"Rate limit of provider {provider} exceeded, "
+            f"the request would wait {wait:.1f}s"
+        )
+    for bucket in buckets:
+        bucket.reserve(cost)
+        bucket.waited += wait
+    if wait > 0:
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            for bucket in buckets:
+                bucket.refund(cost)
+            raise
+    return wait
+
+
+def credit_of(catalog: dict | str, provider: str, model_id: str) -> int:
+    """
+    The credit multiplier of a model in a TTS, voice changer or voice clone
+    model catalog, or 1 when the catalog could not be loaded or lacks the model.
+    """
+    if isinstance(catalog, dict):
+        for item in catalog.get("models", []):
+            if item.get("provider") != provider:
+                continue
+            for model in item.get("model_list", []):
+                if model.get("model_name") == model_id:
+                    return model.get("credit") or 1
+    return 1
+
+
+def rate_limits() -> dict[str, dict]:
+    """The tokens and counters of every bucket in use."""
+    return {name: bucket.status() for name, bucket in _buckets.items()}
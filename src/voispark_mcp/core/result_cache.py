@@ -0,0 +1,246 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import time
+import unicodedata
+from typing import Optional
+
+from aiohttp import ClientSession
+from pydantic import BaseModel
+
+from voispark_mcp.core.api_request import download
+from voispark_mcp.core.audio_file import CHUNK_SIZE
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+
+RESULT_CACHE = _env_flag("VOISPARK_RESULT_CACHE")
+RESULT_CACHE_DIR = Path(
+    os.getenv("VOISPARK_RESULT_CACHE_DIR")
+    or Path.home() / ".cache" / "voispark" / "results"
+)
+RESULT_CACHE_MAX_BYTES = int(
+    os.getenv("VOISPARK_RESULT_CACHE_MAX_BYTES") or 1024 * 1024 * 1024
+)
+# Result URLs are usually presigned and expire, so entries do as well
+RESULT_CACHE_MAX_AGE = float(os.getenv("VOISPARK_RESULT_CACHE_MAX_AGE") or 86400)
+RESULT_CACHE_AUDIO = _env_flag("VOISPARK_RESULT_CACHE_AUDIO")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    response TEXT NOT NULL,
+    audio_path TEXT,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys: NFC, collapsed whitespace, stripped."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _configs(configs: Optional[BaseModel]) -> Optional[dict]:
+    if configs is None:
+        return None
+    return {"type": type(configs).__name__, **configs.model_dump(mode="json")}
+
+
+def _digest(fields: dict) -> str:
+    canonical = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def tts_key(request: BaseModel) -> str:
+    """Cache key of a GenerateTTSRequest."""
+    return _digest(
+        {
+            "kind": "tts",
+            "provider": request.provider,
+            "model_id": request.model_id,
+            "voice_id": request.voice_id,
+            "text": normalize_text(request.text),
+            "configs": _configs(request.configs),
+        }
+    )
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _voice_changer_key(
+    request: BaseModel, audio_path: Optional[Path], upload_rate: int
+) -> str:
+    if audio_path is not None:
+        audio_hash = _hash_file(audio_path)
+    else:
+        audio_hash = hashlib.sha256(base64.b64decode(request.audio_data)).hexdigest()
+    return _digest(
+        {
+            "kind": "voice_changer",
+            "provider": request.provider,
+            "model_id": request.model_id,
+            "voice_id": request.voice_id,
+            "audio": audio_hash,
+            "upload_rate": upload_rate,
+            "configs": _configs(request.configs),
+        }
+    )
+
+
+async def voice_changer_key(
+    request: BaseModel, audio_path: Optional[Path] = None, upload_rate: int = 0
+) -> str:
+    """
+    Cache key of a ChangeVoiceRequest, using the hash of the audio content
+    (read from audio_path when given, else decoded from request.audio_data)
+    and the sample rate it is uploaded at, since the audio is hashed before
+    it is prepared for upload. The audio is hashed in a worker thread.
+    """
+    return await asyncio.to_thread(_voice_changer_key, request, audio_path, upload_rate)
+
+
+class ResultCache:
+    """
+    A persistent, content-addressed cache of generation results in SQLite.
+
+    Entries map a key (see `tts_key` and `voice_changer_key`) to the
+    returned task details and, when store_audio is set, to a local copy of
+    the result audio. Entries older than max_age are dropped on read, and
+    the least recently used entries are evicted once the total size of
+    responses and audio exceeds max_bytes.
+    """
+
+    def __init__(
+        self,
+        directory: Path = RESULT_CACHE_DIR,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+        max_age: float = RESULT_CACHE_MAX_AGE,
+        store_audio: bool = RESULT_CACHE_AUDIO,
+    ):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.store_audio = store_audio
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(directory / "results.sqlite3", isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a result.
+
+        Returns:
+            The cached response with `cached` set, and `local_path` when the
+            audio is stored locally, or None on a miss
+        """
+        row = self._db.execute(
+            "SELECT response, audio_path, created_at FROM results WHERE key = ?",
+            (key,),
+        ).fetchone()
+        now = time.time()
+        if row is not None and now - row[2] > self.max_age:
+            self._delete([(key, row[1])])
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+        response = json.loads(row[0])
+        response["cached"] = True
+        if row[1] is not None and os.path.exists(row[1]):
+            response["local_path"] = row[1]
+        return response
+
+    async def put(
+        self,
+        key: str,
+        kind: str,
+        response: dict,
+        download_session: Optional[ClientSession] = None,
+    ) -> None:
+        """Store a successful result, downloading its audio if store_audio is set."""
+        encoded = json.dumps(response)
+        size = len(encoded)
+        audio_path = None
+        details = response.get("details")
+        if self.store_audio and details:
+            try:
+                audio = await download(details["url"], session=download_session)
+            except Exception:
+                logging.exception("Failed to download audio for result cache")
+            else:
+                container = details["format"]["container"].lower()
+                audio_path = str(self.directory / f"{key}.{container}")
+                await asyncio.to_thread(Path(audio_path).write_bytes, audio)
+                size += len(audio)
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, kind, encoded, audio_path, size, now, now),
+        )
+        self._evict()
+
+    def clear(self) -> None:
+        self._delete(self._db.execute("SELECT key, audio_path FROM results").fetchall())
+
+    def stats(self) -> dict:
+        entries, size = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        return {
+            "entries": entries,
+            "size": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _evict(self) -> None:
+        (total,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, audio_path, size in self._db.execute(
+            "SELECT key, audio_path, size FROM results ORDER BY accessed_at"
+        ).fetchall():
+            evicted.append((key, audio_path))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self._delete(evicted)
+
+    def _delete(self, rows: list[tuple[str, Optional[str]]]) -> None:
+        self._db.executemany(
+            "DELETE FROM results WHERE key = ?", [(k,) for k, _ in rows]
+        )
+        for _, audio_path in rows:
+            if audio_path is not None:
+                Path(audio_path).unlink(missing_ok=True)
@@ -0,0 +1,39 @@
+import asyncio
+import os
+import random
+from typing import Optional
+
+from aiohttp import ClientConnectionError, ClientPayloadError
+
+# Total number of attempts of a request, including the first one
+RETRY_ATTEMPTS = int(os.getenv("VOISPARK_RETRY_ATTEMPTS") or 3)
+RETRY_BASE_DELAY = float(os.getenv("VOISPARK_RETRY_BASE_DELAY") or 0.5)
+RETRY_MAX_DELAY = float(os.getenv("VOISPARK_RETRY_MAX_DELAY") or 8.0)
+
+# HTTP statuses of transient failures: timeouts, rate limiting and server errors
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# Network errors: refused or reset connections, disconnects and timeouts
+RETRYABLE_EXCEPTIONS = (ClientConnectionError, ClientPayloadError, asyncio.TimeoutError)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Seconds to wait before retrying after the given (0-based) failed attempt.
+
+    The delay grows exponentially from RETRY_BASE_DELAY up to RETRY_MAX_DELAY
+    with full jitter, so that clients failing together do not retry together.
+    A Retry-After sent by the server takes precedence, capped at RETRY_MAX_DELAY.
+    """
+    if retry_after is not None:
+        return min(retry_after, RETRY_MAX_DELAY)
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
+
+
+def retry_after(headers) -> Optional[float]:
+    """The Retry-After header in seconds, if it is given as a number."""
+    value = headers.get("Retry-After")
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except ValueError:
+        return None
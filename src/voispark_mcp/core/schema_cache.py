@@ -0,0 +1,132 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+import sys
+from typing import Any, Callable, Optional, get_origin
+
+import pydantic
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.fastmcp.tools import Tool
+from mcp.server.fastmcp.utilities.func_metadata import FuncMetadata, func_metadata
+from mcp.types import ToolAnnotations
+
+SCHEMA_CACHE_PATH = Path(
+    os.getenv("VOISPARK_SCHEMA_CACHE_PATH")
+    or Path.home() / ".cache" / "voispark" / "schemas.json"
+)
+
+
+def schema_key() -> str:
+    """
+    Identify the code that tool schemas are generated from: the sources of this
+    package and the versions of pydantic and of the MCP SDK's schema generation.
+    Any change to them invalidates the cached schemas.
+    """
+    digest = hashlib.sha256(pydantic.VERSION.encode())
+    sdk = Path(sys.modules[func_metadata.__module__].__file__).stat()
+    digest.update(f"{sdk.st_size}:{sdk.st_mtime_ns}".encode())
+    package = Path(__file__).parent.parent
+    for path in sorted(package.rglob("*.py")):
+        digest.update(path.relative_to(package).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _context_kwarg(fn: Callable[..., Any]) -> Optional[str]:
+    """The parameter of fn that receives the MCP context, as in Tool.from_function."""
+    for name, param in inspect.signature(fn).parameters.items():
+        if get_origin(param.annotation) is None and issubclass(
+            param.annotation, Context
+        ):
+            return name
+    return None
+
+
+class CachedSchemaTool(Tool):
+    """
+    A tool registered with a cached JSON schema. Its argument model, which is
+    only needed to validate arguments, is built on the first call.
+    """
+
+    fn_metadata: Optional[FuncMetadata] = None
+
+    async def run(self, arguments: dict[str, Any], *args, **kwargs) -> Any:
+        if self.fn_metadata is None:
+            skip_names = [self.context_kwarg] if self.context_kwarg else []
+            self.fn_metadata = func_metadata(self.fn, skip_names=skip_names)
+        return await super().run(arguments, *args, **kwargs)
+
+
+class CachedSchemaFastMCP(FastMCP):
+    """
+    A FastMCP server that persists the JSON schemas of its tools between runs.
+
+    Generating the schema of a tool builds a pydantic model of its parameters,
+    which for large unions of config models is a noticeable part of startup.
+    With a valid cache, tools are registered with the stored schemas instead.
+    Call `save_schema_cache` once every tool is registered.
+    """
+
+    def __init__(self, *args, schema_cache_path: Path = SCHEMA_CACHE_PATH, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.schema_cache_path = schema_cache_path
+        self.schema_key = schema_key()
+        self._schemas: dict[str, dict] = {}
+        self._cached_schemas: dict[str, dict] = {}
+        try:
+            stored = json.loads(schema_cache_path.read_text())
+            if stored.get("key") == self.schema_key:
+                self._cached_schemas = stored["tools"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def add_tool(
+        self,
+        fn: Callable[..., Any],
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        annotations: Optional[ToolAnnotations] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Register a tool with its cached schema if there is one. Tools with
+        arguments of newer MCP SDKs, e.g. title, or that cannot be built as
+        CachedSchemaTool are registered by FastMCP as usual.
+        """
+        tool_name = name or fn.__name__
+        parameters = self._cached_schemas.get(tool_name)
+        if parameters is not None and not kwargs:
+            try:
+                tool = CachedSchemaTool(
+                    fn=fn,
+                    name=tool_name,
+                    description=description or fn.__doc__ or "",
+                    parameters=parameters,
+                    is_async=inspect.iscoroutinefunction(fn),
+                    context_kwarg=_context_kwarg(fn),
+                    annotations=annotations,
+                )
+                # ToolManager only registers tools built by Tool.from_function
+                self._tool_manager._tools[tool_name] = tool
+            except Exception as e:
+                logging.debug(f"Not using the cached schema of {tool_name}: {e!r}")
+                parameters = None
+        if parameters is None or kwargs:
+            super().add_tool(fn, name, description, annotations, **kwargs)
+            parameters = self._tool_manager.get_tool(tool_name).parameters
+        self._schemas[tool_name] = parameters
+
+    def save_schema_cache(self) -> None:
+        """Store the schemas of the registered tools unless they are cached already."""
+        if self._schemas == self._cached_schemas:
+            return
+        try:
+            self.schema_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.schema_cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"key": self.schema_key, "tools": self._schemas}))
+            tmp.replace(self.schema_cache_path)
+        except OSError as e:
+            logging.warning(f"Failed to save the tool schema cache: {e!r}")
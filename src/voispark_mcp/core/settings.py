@@ -0,0 +1,14 @@
+"""
+Settings used as tool argument defaults by main.
+
+They live apart from the api modules that apply them, so that the server can
+declare its tools without importing those modules.
+"""
+
+import os
+
+TTS_BATCH_CONCURRENCY = int(os.getenv("VOISPARK_TTS_BATCH_CONCURRENCY") or 8)
+TTS_LONG_CONCURRENCY = int(os.getenv("VOISPARK_TTS_LONG_CONCURRENCY") or 4)
+CONVERSATION_LONG_CONCURRENCY = int(
+    os.getenv("VOISPARK_CONVERSATION_LONG_CONCURRENCY") or 4
+)
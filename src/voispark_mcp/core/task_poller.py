@@ -0,0 +1,184 @@
+import asyncio
+import contextlib
+from dataclasses import dataclass
+import logging
+import math
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+from pydantic import ValidationError
+
+from voispark_mcp.msg.task_msg import TaskKind, TaskResponse, TaskState
+
+TASK_POLL_INITIAL = float(os.getenv("VOISPARK_TASK_POLL_INITIAL") or 1.0)
+TASK_POLL_MAX = float(os.getenv("VOISPARK_TASK_POLL_MAX") or 15.0)
+TASK_POLL_BACKOFF = 1.5
+TASK_POLL_CONCURRENCY = int(os.getenv("VOISPARK_TASK_POLL_CONCURRENCY") or 16)
+TASK_TIMEOUT = float(os.getenv("VOISPARK_TASK_TIMEOUT") or 1800)
+TASK_RETENTION = float(os.getenv("VOISPARK_TASK_RETENTION") or 3600)
+
+
+@dataclass
+class _Job:
+    state: TaskState
+    next_poll: float
+    interval: float
+    finished: asyncio.Event
+
+
+class TaskPoller:
+    """
+    Track tasks submitted with sync=False and poll their status in the background.
+
+    A single loop starts a poll for every job that is due, each in its own
+    asyncio task so that a slow status request does not hold back the other
+    jobs. Each job backs off exponentially from TASK_POLL_INITIAL to
+    TASK_POLL_MAX, and its first poll is scheduled from the average
+    completion time of recent jobs of the same kind, so quick tasks are picked
+    up quickly without hammering the API for slow ones. Finished jobs are kept
+    for TASK_RETENTION seconds.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[dict | str]],
+        concurrency: int = TASK_POLL_CONCURRENCY,
+    ):
+        """
+        Args:
+            fetch: Returns the task as a TaskResponse dict, or an error message
+            concurrency: Maximum number of status requests in flight
+        """
+        self._fetch = fetch
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._jobs: dict[str, _Job] = {}
+        self._expected: dict[Optional[TaskKind], float] = {}
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._polls: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        self._runner = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._runner
+        for poll in self._polls:
+            poll.cancel()
+        await asyncio.gather(*self._polls, return_exceptions=True)
+
+    def track(self, task: TaskResponse, kind: Optional[TaskKind] = None) -> TaskState:
+        """Start tracking a task, returning its state."""
+        job = self._jobs.get(task.task_id)
+        if job is not None:
+            return job.state
+        now = time.time()
+        state = TaskState(task=task, kind=kind, submitted_at=now, updated_at=now)
+        first_poll = max(TASK_POLL_INITIAL, 0.8 * self._expected.get(kind, 0.0))
+        job = _Job(
+            state, time.monotonic() + first_poll, TASK_POLL_INITIAL, asyncio.Event()
+        )
+        if state.done:
+            job.finished.set()
+        self._jobs[task.task_id] = job
+        self._wakeup.set()
+        return state
+
+    def get(self, task_id: str) -> Optional[TaskState]:
+        job = self._jobs.get(task_id)
+        return job.state if job is not None else None
+
+    async def wait(self, task_id: str, timeout: float) -> Optional[TaskState]:
+        """
+        Wait until a tracked task has finished or timeout seconds have passed.
+
+        Returns:
+            The latest state of the task, or None if it is not tracked
+        """
+        job = self._jobs.get(task_id)
+        if job is None:
+            return None
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(job.finished.wait(), timeout)
+        return job.state
+
+    @property
+    def pending(self) -> int:
+        return sum(not job.finished.is_set() for job in self._jobs.values())
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            for job in self._jobs.values():
+                if not job.finished.is_set() and job.next_poll <= now:
+                    # Not due again until its poll has finished
+                    job.next_poll = math.inf
+                    poll = asyncio.create_task(self._poll(job))
+                    self._polls.add(poll)
+                    poll.add_done_callback(self._polls.discard)
+            self._evict()
+            scheduled = [
+                job.next_poll
+                for job in self._jobs.values()
+                if not job.finished.is_set() and job.next_poll < math.inf
+            ]
+            delay = min(scheduled) - now if scheduled else None
+            self._wakeup.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+
+    async def _poll(self, job: _Job) -> None:
+        try:
+            await self._update(job)
+        except Exception:
+            logging.exception("Failed to update task %s", job.state.task.task_id)
+            job.next_poll = time.monotonic() + job.interval
+        finally:
+            # Reschedule the loop, which waits for the next poll that is due
+            self._wakeup.set()
+
+    async def _update(self, job: _Job) -> None:
+        state = job.state
+        try:
+            async with self._semaphore:
+                resp = await self._fetch(state.task.task_id)
+        except Exception as e:
+            resp = repr(e)
+        state.polls += 1
+        state.updated_at = time.time()
+        if isinstance(resp, dict):
+            try:
+                state.task = TaskResponse.model_validate(resp)
+            except ValidationError as e:
+                # Only this job fails, the others are still polled
+                logging.warning("Malformed task %s: %s", state.task.task_id, e)
+                state.task = state.task.model_copy(
+                    update={"status": "failed", "error": "Malformed task response"}
+                )
+        else:
+            logging.warning("Failed to poll task %s: %s", state.task.task_id, resp)
+
+        elapsed = state.updated_at - state.submitted_at
+        if not state.done and elapsed > TASK_TIMEOUT:
+            state.task = state.task.model_copy(
+                update={"status": "failed", "error": "Timed out waiting for task"}
+            )
+        if state.done:
+            if state.task.status == "success":
+                expected = self._expected.get(state.kind)
+                self._expected[state.kind] = (
+                    elapsed if expected is None else 0.7 * expected + 0.3 * elapsed
+                )
+            job.finished.set()
+            return
+        job.interval = min(job.interval * TASK_POLL_BACKOFF, TASK_POLL_MAX)
+        job.next_poll = time.monotonic() + job.interval
+
+    def _evict(self) -> None:
+        cutoff = time.time() - TASK_RETENTION
+        for task_id, job in list(self._jobs.items()):
+            if job.finished.is_set() and job.state.updated_at < cutoff:
+                del self._jobs[task_id]
@@ -0,0 +1,64 @@
+import re
+
+_PARAGRAPH = re.compile(r"\n\s*\n")
+# A sentence ends with terminal punctuation, optionally followed by a closing
+# quote or bracket, then whitespace; CJK punctuation needs no whitespace.
+_SENTENCE = re.compile(
+    r"(?:(?<=[.!?…])|(?<=[.!?…][\"'”’)\]]))\s+"
+    r"|(?<=[。！？；])(?![”’」』）])|(?<=[。！？；][”’」』）])"
+)
+_CLAUSE = re.compile(r"(?<=[,;:，、；：])\s*")
+_CJK_END = "。！？；，、："
+
+
+def _pieces(text: str, max_chars: int) -> list[str]:
+    """Split text into sentences, breaking sentences over max_chars further."""
+    pieces = []
+    for sentence in _SENTENCE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        for clause in _CLAUSE.split(sentence):
+            while len(clause) > max_chars:
+                cut = clause.rfind(" ", 0, max_chars + 1)
+                cut = cut if cut > 0 else max_chars
+                pieces.append(clause[:cut].strip())
+                clause = clause[cut:].strip()
+            if clause:
+                pieces.append(clause)
+    return pieces
+
+
+def split_text(text: str, max_chars: int) -> list[str]:
+    """
+    Split text into chunks of at most max_chars characters.
+
+    Chunks break at paragraph boundaries first, then between sentences, and
+    only split a sentence (at clause boundaries or whitespace) when it is
+    longer than max_chars on its own. Consecutive sentences of the same
+    paragraph are packed into one chunk as long as they fit.
+
+    Args:
+        text: The text to split
+        max_chars: Maximum chunk length in characters
+
+    Returns:
+        The chunks in order, without leading or trailing whitespace
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+    chunks = []
+    for paragraph in _PARAGRAPH.split(text):
+        current = ""
+        for piece in _pieces(paragraph, max_chars):
+            separator = "" if not current or current[-1] in _CJK_END else " "
+            if current and len(current) + len(separator) + len(piece) > max_chars:
+                chunks.append(current)
+                current, separator = "", ""
+            current = f"{current}{separator}{piece}"
+        if current:
+            chunks.append(current)
+    return chunks
@@ -0,0 +1,335 @@
+import asyncio
+from bisect import bisect_left
+from collections import defaultdict
+from difflib import SequenceMatcher
+import heapq
+from itertools import islice
+import logging
+import re
+import time
+from typing import Awaitable, Callable, Optional
+
+from voispark_mcp.core.cache import ttl_from_env
+
+# Seconds before the voice lists are fetched again, in the background
+VOICE_INDEX_TTL = ttl_from_env("voice_index")
+
+# Weight of a word by the voice field it occurs in
+_FIELD_WEIGHTS = {"name": 3.0, "provider": 2.0, "description": 1.0}
+# Score of a query word matching a whole word, the start of a word, or a
+# similar word (scaled by the similarity)
+_EXACT, _PREFIX, _FUZZY = 1.0, 0.8, 0.6
+_FUZZY_CUTOFF = 0.75
+_COLLECTIONS = {"default_voices": "default", "user_voices": "user", "ip_voices": "ip"}
+
+_WORD = re.compile(r"\w+")
+
+# A voice is identified by its provider and id, since providers may share ids
+VoiceKey = tuple[str, str]
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def _trigrams(word: str) -> set[str]:
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class VoiceIndex:
+    """
+    An in-memory inverted index of the voices of every provider, by the words
+    of their name, description and provider.
+
+    Voices are indexed by their provider and id. Each voice list (a provider
+    and voice type) is updated on its own: only the voices that were added,
+    removed or changed since the last update of that list are re-indexed. A
+    voice's abilities are the voice types of the lists it is in.
+    """
+
+    def __init__(self, ttl: float = VOICE_INDEX_TTL):
+        self.ttl = ttl
+        self.refreshed_at: Optional[float] = None
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._refresh: Optional[asyncio.Task] = None
+        # (provider, voice_type) -> voice id -> voice
+        self._lists: dict[tuple[str, str], dict[str, dict]] = {}
+        # (provider, voice id) -> the lists it is in
+        self._memberships: dict[VoiceKey, set[tuple[str, str]]] = defaultdict(set)
+        # (provider, voice id) -> the voice with its provider, collection and abilities
+        self._voices: dict[VoiceKey, dict] = {}
+        # voice id -> the providers with a voice of that id
+        self._providers: dict[str, set[str]] = defaultdict(set)
+        self._voice_words: dict[VoiceKey, list[str]] = {}
+        self._postings: dict[str, dict[VoiceKey, float]] = defaultdict(dict)
+        self._trigram_words: dict[str, set[str]] = defaultdict(set)
+        self._vocabulary: Optional[list[str]] = None
+        self._by_name: Optional[list[VoiceKey]] = None
+
+    async def ensure(self, refresh: Callable[[], Awaitable[None]]) -> None:
+        """
+        Build the index with refresh on first use, then run refresh in the
+        background once the index is older than the TTL. A failed first
+        build is retried by the next call.
+        """
+        if self._refresh is None and (
+            self.refreshed_at is None or time.monotonic() - self.refreshed_at > self.ttl
+        ):
+            self._refresh = asyncio.create_task(self._run(refresh))
+        if self.refreshed_at is None and self._refresh is not None:
+            await asyncio.shield(self._refresh)
+
+    async def _run(self, refresh: Callable[[], Awaitable[None]]) -> None:
+        self.refreshes += 1
+        try:
+            await refresh()
+            self.refreshed_at = time.monotonic()
+        except Exception:
+            self.refresh_errors += 1
+            logging.exception("Failed to refresh the voice index")
+        finally:
+            self._refresh = None
+
+    async def close(self) -> None:
+        """Cancel a running background refresh."""
+        if self._refresh is not None:
+            self._refresh.cancel()
+            await asyncio.gather(self._refresh, return_exceptions=True)
+
+    def update(self, provider: str, voice_type: str, voices: dict) -> int:
+        """
+        Replace the voices of one list with a VoicesListResponse dict.
+
+        Returns:
+            The number of voices added, removed or changed
+        """
+        new = {}
+        for collection, name in _COLLECTIONS.items():
+            for voice in voices.get(collection) or ():
+                new[voice["id"]] = {**voice, "collection": name}
+        key = (provider, voice_type)
+        old = self._lists.get(key, {})
+        self._lists[key] = new
+        changed = 0
+        for voice_id in old.keys() | new.keys():
+            if old.get(voice_id) != new.get(voice_id):
+                if voice_id in new:
+                    self._memberships[provider, voice_id].add(key)
+                else:
+                    self._memberships[provider, voice_id].discard(key)
+                self._reindex((provider, voice_id), key)
+                changed += 1
+        return changed
+
+    def retain(self, lists: set[tuple[str, str]]) -> None:
+        """Drop the lists that are not in lists, e.g. of removed providers."""
+        for key in self._lists.keys() - lists:
+            voices = self._lists.pop(key)
+            for voice_id in voices:
+                self._memberships[key[0], voice_id].discard(key)
+                self._reindex((key[0], voice_id))
+
+    def _reindex(self, doc: VoiceKey, key: Optional[tuple[str, str]] = None) -> None:
+        """
+        Index a voice again from the lists it is in, taking its fields from the
+        list key if it is in it, i.e. from the list updated last.
+        """
+        self._by_name = None
+        provider, voice_id = doc
+        keys = self._memberships.get(doc)
+        if not keys:
+            self._memberships.pop(doc, None)
+            self._providers[voice_id].discard(provider)
+            if not self._providers[voice_id]:
+                del self._providers[voice_id]
+            voice = None
+        else:
+            voice = self._lists[key if key in keys else max(keys)][voice_id]
+            self._providers[voice_id].add(provider)
+        previous = self._voices.get(doc)
+        if (
+            voice is not None
+            and previous is not None
+            and all(voice.get(field) == previous.get(field) for field in _FIELD_WEIGHTS)
+        ):
+            # Same words, e.g. a voice added to another list: keep its postings
+            self._voices[doc] = self._entry(voice, keys)
+            return
+        self._voices.pop(doc, None)
+        for word in self._voice_words.pop(doc, ()):
+            postings = self._postings[word]
+            postings.pop(doc, None)
+            if not postings:
+                del self._postings[word]
+                for trigram in _trigrams(word):
+                    self._trigram_words[trigram].discard(word)
+                self._vocabulary = None
+        if voice is None:
+            return
+        weights: dict[str, float] = {}
+        for field, weight in _FIELD_WEIGHTS.items():
+            for word in _words(voice.get(field, "")):
+                weights[word] = max(weights.get(word, 0.0), weight)
+        for word, weight in weights.items():
+            if word not in self._postings:
+                for trigram in _trigrams(word):
+                    self._trigram_words[trigram].add(word)
+                self._vocabulary = None
+            self._postings[word][doc] = weight
+        self._voices[doc] = self._entry(voice, keys)
+        self._voice_words[doc] = list(weights)
+
+    @staticmethod
+    def _entry(voice: dict, keys: set[tuple[str, str]]) -> dict:
+        return {**voice, "abilities": sorted({voice_type for _, voice_type in keys})}
+
+    def _matches(self, word: str) -> dict[str, float]:
+        """The indexed words matching a query word, with their match score."""
+        matches = {}
+        if word in self._postings:
+            matches[word] = _EXACT
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        position = bisect_left(self._vocabulary, word)
+        while position < len(self._vocabulary):
+            candidate = self._vocabulary[position]
+            if not candidate.startswith(word):
+                break
+            matches.setdefault(candidate, _PREFIX)
+            position += 1
+        if matches or len(word) < 3 or word.isdigit():
+            return matches
+        # Typos: words sharing enough trigrams, ranked by their similarity
+        trigrams = _trigrams(word)
+        shared: dict[str, int] = defaultdict(int)
+        for trigram in trigrams:
+            for candidate in self._trigram_words.get(trigram, ()):
+                shared[candidate] += 1
+        for candidate, count in shared.items():
+            if count * 2 < len(trigrams):
+                continue
+            ratio = SequenceMatcher(None, word, candidate).ratio()
+            if ratio >= _FUZZY_CUTOFF:
+                matches[candidate] = _FUZZY * ratio
+        return matches
+
+    def lookup(self, voice_id: str, provider: Optional[str] = None) -> list[dict]:
+        """
+        The voices with this id, of provider or of every provider that has
+        one, with their provider, collection and abilities.
+        """
+        providers = self._providers.get(voice_id, ())
+        return [
+            self._voices[name, voice_id]
+            for name in sorted(providers)
+            if provider in (None, name)
+        ]
+
+    def get(self, voice_id: str, provider: Optional[str] = None) -> Optional[dict]:
+        """The voice with this id of provider, or of the first provider with one."""
+        voices = self.lookup(voice_id, provider)
+        return voices[0] if voices else None
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        ability: Optional[str] = None,
+        provider: Optional[str] = None,
+        limit: int = 20,
+    ) -> list[dict]:
+        """
+        Find voices by the words of query, best match first. Every query word
+        adds the score of its best match in the voice, so voices matching more
+        words rank higher; equal scores are ordered by voice id and provider. Without a
+        query, voices are listed by name.
+
+        Args:
+            query: Words of the name, description or provider of the voice; words
+                may be prefixes or contain typos
+            ability: Only voices listed for this voice type, e.g. 'tts'
+            provider: Only voices of this provider
+
+        Returns:
+            The voices, each with its score when a query is given
+        """
+
+        allowed = None
+        if ability is not None or provider is not None:
+            allowed = set()
+            for (list_provider, voice_type), voices in self._lists.items():
+                if provider in (None, list_provider) and ability in (None, voice_type):
+                    allowed.update((list_provider, voice_id) for voice_id in voices)
+
+        words = _words(query or "")
+        if not words:
+            if self._by_name is None:
+                self._by_name = sorted(
+                    self._voices,
+                    key=lambda doc: (self._voices[doc]["name"].lower(), doc[1], doc[0]),
+                )
+            voices = (
+                self._voices[doc]
+                for doc in self._by_name
+                if allowed is None or doc in allowed
+            )
+            return list(islice(voices, limit))
+
+        scores: dict[VoiceKey, float] = {}
+        for word in words:
+            best: dict[VoiceKey, float] = {}
+            for match, score in self._matches(word).items():
+                postings = self._postings[match]
+                if not best:
+                    best = {doc: score * w for doc, w in postings.items()}
+                    continue
+                for doc, weight in postings.items():
+                    if score * weight > best.get(doc, 0.0):
+                        best[doc] = score * weight
+            if not scores:
+                scores = best
+                continue
+            for doc, score in best.items():
+                scores[doc] = scores.get(doc, 0.0) + score
+        # Ties are broken by voice id and provider, comparing plain tuples
+        ranked = heapq.nsmallest(
+            limit,
+            (
+                (-score, voice_id, provider)
+                for (provider, voice_id), score in scores.items()
+                if allowed is None or (provider, voice_id) in allowed
+            ),
+        )
+        return [
+            {**self._voices[provider, voice_id], "score": round(-score, 3)}
+            for score, voice_id, provider in ranked
+        ]
+
+    def clear(self) -> None:
+        """Drop every voice, so that the next search builds the index again."""
+        self._lists.clear()
+        self._memberships.clear()
+        self._voices.clear()
+        self._providers.clear()
+        self._voice_words.clear()
+        self._postings.clear()
+        self._trigram_words.clear()
+        self._vocabulary = None
+        self._by_name = None
+        self.refreshed_at = None
+
+    def stats(self) -> dict:
+        return {
+            "ttl": self.ttl,
+            "voices": len(self._voices),
+            "lists": len(self._lists),
+            "words": len(self._postings),
+            "age": (
+                None
+                if self.refreshed_at is None
+                else time.monotonic() - self.refreshed_at
+            ),
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
@@ -1,38 +1,55 @@
+import asyncio
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import importlib
 import logging
-from typing import AsyncIterator, Literal, Union
-from mcp.server.fastmcp import FastMCP
-
-from voispark_mcp.api.conversation import (
-    get_conversation_models as _get_conversation_models,
-    generate_conversation as _generate_conversation,
-    get_speaker_details as _get_speaker_details,
-    get_speakers as _get_speakers,
+import os
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal, Optional, Union
+from aiohttp import ClientSession
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.types import BlobResourceContents, EmbeddedResource
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+from voispark_mcp.core.api_request import (
+    API_KEY,
+    create_download_session,
+    create_session,
 )
-from voispark_mcp.api.tts import get_tts_models as _get_tts_models
-from voispark_mcp.api.tts import generate_tts as _generate_tts
-from voispark_mcp.api.voice_clone import (
-    get_voice_clone_models as _get_voice_clone_models,
-    clone_voice as _clone_voice,
+from voispark_mcp.core.audio_fetch import (
+    AudioDelivery,
+    AudioFetchCache,
+    mime_type,
+    read_base64,
 )
-from voispark_mcp.api.voice_changer import (
-    get_voice_changer_models as _get_voice_changer_models,
-    change_voice as _change_voice,
-)
-from voispark_mcp.api.voices import list_all_voices as _list_all_voices
-from voispark_mcp.api.voices import get_providers as _get_providers
-from voispark_mcp.api.history import (
-    get_history_list as _get_history_list,
-    get_history as _get_history,
+from voispark_mcp.core.audio_file import AUDIO_ROOT
+from voispark_mcp.core.cache import cache_stats, invalidate
+from voispark_mcp.core.circuit_breaker import breaker_states
+from voispark_mcp.core.history_index import HistoryIndex
+from voispark_mcp.core.metrics import prometheus_text, snapshot, timed
+from voispark_mcp.core.rate_limit import rate_limits
+from voispark_mcp.core.result_cache import RESULT_CACHE, ResultCache
+from voispark_mcp.core.schema_cache import CachedSchemaFastMCP
+from voispark_mcp.core.settings import (
+    CONVERSATION_LONG_CONCURRENCY,
+    TTS_BATCH_CONCURRENCY,
+    TTS_LONG_CONCURRENCY,
 )
+from voispark_mcp.core.task_poller import TaskPoller
+from voispark_mcp.core.voice_index import VoiceIndex
 from voispark_mcp.msg.conversation_msg import (
     GenerateConversationRequest,
+    GenerateConversationResponse,
     ConversationTurn,
     SpeakerConfigItem,
 )
-from voispark_mcp.msg.tts_msg import GenerateTTSRequest
-from voispark_mcp.msg.voice_changer_msg import ChangeVoiceRequest
+from voispark_mcp.msg.tts_msg import (
+    GenerateTTSRequest,
+    GenerateTTSResponse,
+    TTSBatchItem,
+)
+from voispark_mcp.msg.task_msg import TaskKind, TaskResponse
 from voispark_mcp.msg.voice_clone_msg import (
     CartesiaVoiceCloneConfig,
     CloneVoiceRequest,
@@ -40,46 +57,296 @@ from voispark_mcp.msg.voice_clone_msg import (
 )
 
 
+def _deferred(path: str) -> Callable[..., Awaitable[Any]]:
+    """
+    An api coroutine function, e.g. 'tts.generate_tts', that is imported on its
+    first call so that starting the server does not import every api module.
+    """
+    module, name = path.rsplit(".", 1)
+    fn = None
+
+    async def call(*args, **kwargs):
+        nonlocal fn
+        if fn is None:
+            fn = getattr(importlib.import_module(f"voispark_mcp.api.{module}"), name)
+        return await fn(*args, **kwargs)
+
+    return call
+
+
+_get_conversation_models = _deferred("conversation.get_conversation_models")
+_generate_conversation = _deferred("conversation.generate_conversation")
+_generate_conversation_long = _deferred("conversation.generate_conversation_long")
+_get_speaker_details = _deferred("conversation.get_speaker_details")
+_get_speakers = _deferred("conversation.get_speakers")
+_get_tts_models = _deferred("tts.get_tts_models")
+_generate_tts = _deferred("tts.generate_tts")
+_generate_tts_batch = _deferred("tts.generate_tts_batch")
+_generate_tts_long = _deferred("tts.generate_tts_long")
+_get_voice_clone_models = _deferred("voice_clone.get_voice_clone_models")
+_clone_voice = _deferred("voice_clone.clone_voice")
+_get_voice_changer_models = _deferred("voice_changer.get_voice_changer_models")
+_change_voice = _deferred("voice_changer.change_voice")
+_list_all_voices = _deferred("voices.list_all_voices")
+_get_providers = _deferred("voices.get_providers")
+_search_voices = _deferred("voices.search_voices")
+_list_voices_of_all_providers = _deferred("voices.list_voices_of_all_providers")
+_get_history_list = _deferred("history.get_history_list")
+_get_history = _deferred("history.get_history")
+_search_history = _deferred("history.search_history")
+_get_task = _deferred("task.get_task")
+
+
+# Read the catalogs concurrently at startup so that the first requests find them cached
+WARMUP = os.getenv("VOISPARK_WARMUP", "1").lower() in ("1", "true", "yes")
+# Seconds startup waits for the warm-up, 0 (the default) to answer the first
+# messages right away; catalogs still loading then finish in the background
+WARMUP_TIMEOUT = float(os.getenv("VOISPARK_WARMUP_TIMEOUT") or 0)
+
+_CATALOGS = {
+    "tts_models": _get_tts_models,
+    "voice_changer_models": _get_voice_changer_models,
+    "voice_clone_models": _get_voice_clone_models,
+    "conversation_models": _get_conversation_models,
+    "conversation_speakers": _get_speakers,
+    "voice_providers": _get_providers,
+}
+
+
+async def _warm_up(
+    session: ClientSession, timeout: float = WARMUP_TIMEOUT
+) -> set[asyncio.Task]:
+    """
+    Read every catalog concurrently, which also opens the pooled connections
+    to the API. Failures are logged and left to the first request to retry.
+
+    Returns:
+        The reads still running after timeout
+    """
+
+    async def read(name: str, load: Callable[..., Awaitable[Any]]) -> None:
+        try:
+            resp = await load(session=session)
+        except Exception as e:
+            logging.warning("Failed to warm up %s: %r", name, e)
+            return
+        if isinstance(resp, str):
+            logging.warning("Failed to warm up %s: %s", name, resp)
+
+    tasks = {asyncio.create_task(read(name, load)) for name, load in _CATALOGS.items()}
+    if timeout <= 0:
+        return tasks
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    if pending:
+        logging.info(
+            "%d catalogs are still warming up after %.1fs", len(pending), timeout
+        )
+    return pending
+
+
 @dataclass
 class AppContext:
-    pass
+    session: ClientSession
+    download_session: ClientSession
+    poller: TaskPoller
+    result_cache: Optional[ResultCache] = None
+    audio_cache: AudioFetchCache = field(default_factory=AudioFetchCache)
+    history_index: Optional[HistoryIndex] = None
+    voice_index: VoiceIndex = field(default_factory=VoiceIndex)
+
+
+# The context of the process, shared by every client session
+_context: Optional[AppContext] = None
+_warming: set[asyncio.Task] = set()
+
+
+async def _open_context() -> AppContext:
+    """
+    The context of the process, created and warmed up for the first client
+    session. Over the sse and streamable-http transports the lifespan runs
+    once per client session, which all share its pooled sessions and caches.
+    """
+    global _context, _warming
+    if _context is not None:
+        return _context
+    # Opened first, so that failing to open it leaves no session open
+    result_cache = ResultCache() if RESULT_CACHE else None
+    session = create_session()
+    poller = TaskPoller(lambda task_id: _get_task(task_id, session=session))
+    poller.start()
+    _context = AppContext(
+        session=session,
+        download_session=create_download_session(),
+        poller=poller,
+        result_cache=result_cache,
+    )
+    if WARMUP:
+        _warming = await _warm_up(session)
+    return _context
+
+
+async def _close_context() -> None:
+    """Close the context of the process, once the server has stopped."""
+    global _context
+    context, _context = _context, None
+    if context is None:
+        return
+    for task in _warming:
+        task.cancel()
+    await asyncio.gather(*_warming, return_exceptions=True)
+    _warming.clear()
+    await context.poller.close()
+    await context.voice_index.close()
+    if context.result_cache is not None:
+        context.result_cache.close()
+    if context.history_index is not None:
+        context.history_index.close()
+    await context.session.close()
+    await context.download_session.close()
 
 
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
     """Manage application lifecycle with type-safe context"""
-    # Initialize on startup
-    logging.info("Starting MCP server")
-    try:
-        yield AppContext()
-    finally:
-        # Cleanup on shutdown
-        logging.info("Shutting down MCP server")
+    logging.info("Starting MCP session")
+    # The context outlives the session, it is closed by `main` on exit
+    yield await _open_context()
 
 
 # Create an MCP server
-mcp = FastMCP("Voispark MCP", lifespan=app_lifespan)
+mcp = CachedSchemaFastMCP("Voispark MCP", lifespan=app_lifespan)
+
+TRANSPORT = os.getenv("VOISPARK_TRANSPORT") or "stdio"
+# Serve /metrics in Prometheus format on the sse and streamable-http transports
+PROMETHEUS = os.getenv("VOISPARK_PROMETHEUS", "").lower() in ("1", "true", "yes")
+
+
+def _app_context() -> AppContext:
+    return mcp.get_context().request_context.lifespan_context
+
+
+def _session() -> ClientSession:
+    """The pooled session of the running server, shared by every handler."""
+    return _app_context().session
+
+
+def _download_session() -> ClientSession:
+    """The pooled session of the running server used to download result audio."""
+    return _app_context().download_session
+
+
+def _result_cache() -> Optional[ResultCache]:
+    """The persistent result cache, or None when VOISPARK_RESULT_CACHE is off."""
+    return _app_context().result_cache
+
+
+def _history_index() -> HistoryIndex:
+    """The local history index, opened on first use."""
+    context = _app_context()
+    if context.history_index is None:
+        context.history_index = HistoryIndex(API_KEY)
+    return context.history_index
+
+
+async def _deliver(
+    resp: str | dict, deliver: AudioDelivery, task: Optional[dict] = None
+) -> str | dict | list:
+    """
+    Hand over the result audio of a finished task as requested by deliver.
+
+    For 'path' and 'embedded' the audio is fetched into the local audio cache
+    (or taken from the result cache) and its path is added to the task as
+    `local_path`; 'embedded' also returns the audio as an embedded resource.
+
+    Args:
+        resp: The tool result
+        deliver: 'url', 'path' or 'embedded'
+        task: The task dict within resp, when resp is not the task itself
+    """
+    task = resp if task is None else task
+    if deliver == "url" or not isinstance(task, dict):
+        return resp
+    details = task.get("details")
+    if task.get("status") != "success" or not details:
+        return resp
+    if "local_path" in task:
+        path = Path(task["local_path"])
+    else:
+        try:
+            path = await _app_context().audio_cache.fetch(
+                details["url"],
+                details["format"]["container"],
+                session=_download_session(),
+            )
+        except Exception as e:
+            return f"Failed to fetch audio: {e!r}"
+        task["local_path"] = str(path)
+    if deliver == "path":
+        return resp
+    blob = await asyncio.to_thread(read_base64, path)
+    resource = BlobResourceContents(
+        uri=path.as_uri(), mimeType=mime_type(path), blob=blob
+    )
+    return [resp, EmbeddedResource(type="resource", resource=resource)]
+
+
+def _all_cache_stats() -> dict[str, dict]:
+    """
+    Stats of the catalog caches, the audio cache, the voice index, the result
+    cache if enabled and the history index once opened.
+    """
+    context = _app_context()
+    stats = cache_stats()
+    stats["audio"] = context.audio_cache.stats()
+    result_cache = _result_cache()
+    if result_cache is not None:
+        stats["results"] = result_cache.stats()
+    if context.history_index is not None:
+        stats["history"] = context.history_index.stats()
+    stats["voice_index"] = context.voice_index.stats()
+    return stats
+
+
+def _async_deliver_error(async_mode: bool, deliver: AudioDelivery) -> Optional[str]:
+    """The error for a deliver option that a task submitted with async_mode cannot apply."""
+    if async_mode and deliver != "url":
+        return (
+            f"deliver={deliver!r} cannot be used with async_mode, "
+            "pass it to wait_for_task instead"
+        )
+    return None
+
+
+def _track(resp: str | dict, kind: TaskKind) -> str | dict:
+    """Hand a task submitted with sync=False to the background poller."""
+    if isinstance(resp, dict):
+        _app_context().poller.track(TaskResponse.model_validate(resp), kind)
+    return resp
 
 
 # -*- conversation -*-
 
 
 @mcp.resource(uri="conversation://models")
+@timed("resource")
 async def get_conversation_models() -> str | dict:
     """
     Get all available conversation models and their parameters.
     This resource should be called first to retrieve model specifications
     before generating any conversations.
     """
-    return await _get_conversation_models()
+    return await _get_conversation_models(session=_session())
 
 
 @mcp.tool()
+@timed("tool")
 async def generate_conversation(
     provider: str,
     conversation: list[ConversationTurn],
     speaker: list[SpeakerConfigItem],
-) -> str | dict:
+    async_mode: bool = False,
+    deliver: AudioDelivery = "url",
+) -> str | dict | list:
     """
     Generate AI conversation with specified parameters.
 
@@ -91,17 +358,86 @@ async def generate_conversation(
         provider: The conversation provider obtained from 'conversation://models'
         conversation: List of conversation turns defining the dialogue structure
         speaker: List of speaker configurations obtained from 'conversation://speakers'
+        async_mode: Return the task ID right away instead of waiting for the audio;
+            read 'task://{task_id}' or call wait_for_task to get the result
+        deliver: How to return the audio: 'url' for the remote URL only, 'path' to also
+            download it to a local cache file (local_path), 'embedded' to also return
+            it as an embedded audio resource; with async_mode, pass it to wait_for_task
 
     Returns:
         Task details with conversation generation status and task ID
     """
+    if error := _async_deliver_error(async_mode, deliver):
+        return error
+    request = GenerateConversationRequest(
+        provider=provider,
+        conversation=conversation,
+        speaker=speaker,
+        sync=not async_mode,
+    )
+    resp = await _generate_conversation(request, session=_session())
+    if async_mode:
+        return _track(resp, "conversation")
+    return await _deliver(resp, deliver)
+
+
+@mcp.tool()
+@timed("tool")
+async def generate_conversation_long(
+    provider: str,
+    conversation: list[ConversationTurn],
+    speaker: list[SpeakerConfigItem],
+    ctx: Context,
+    max_turns: Optional[int] = None,
+    concurrency: int = CONVERSATION_LONG_CONCURRENCY,
+) -> str | dict:
+    """
+    Generate a long AI conversation such as a podcast script.
+    The script is split into segments of consecutive turns, the segments are generated
+    concurrently with the same speakers and their audio is stitched in turn order into one
+    local file. A failed segment is retried on its own. The URL of every segment is reported
+    as a log message as soon as it is ready.
+
+    Prerequisites:
+    1. First call 'conversation://models' resource to get available providers and model parameters
+    2. Call 'conversation://speakers' resource to get available speakers for configuration
+
+    Args:
+        provider: The conversation provider obtained from 'conversation://models'
+        conversation: List of conversation turns defining the dialogue structure
+        speaker: List of speaker configurations obtained from 'conversation://speakers'
+        max_turns: Maximum turns per segment
+        concurrency: Maximum number of segments generated at the same time
+
+    Returns:
+        Local path and format of the stitched audio file, and the first turn, number of
+        turns, attempts and task details of every segment
+    """
     request = GenerateConversationRequest(
         provider=provider, conversation=conversation, speaker=speaker
     )
-    return await _generate_conversation(request)
+    done = 0
+
+    async def on_segment(
+        index: int, total: int, task: GenerateConversationResponse
+    ) -> None:
+        nonlocal done
+        done += 1
+        await ctx.info(f"Segment {index + 1}/{total} ready: {task.details.url}")
+        await ctx.report_progress(done, total)
+
+    return await _generate_conversation_long(
+        request,
+        max_turns,
+        concurrency,
+        on_segment=on_segment,
+        session=_session(),
+        download_session=_download_session(),
+    )
 
 
 @mcp.tool()
+@timed("tool")
 async def get_speaker_details(speaker_id: str) -> str | dict:
     """
     Get detailed information about a specific speaker.
@@ -115,39 +451,44 @@ async def get_speaker_details(speaker_id: str) -> str | dict:
     Returns:
         Detailed speaker information including voice characteristics and capabilities
     """
-    return await _get_speaker_details(speaker_id)
+    return await _get_speaker_details(speaker_id, session=_session())
 
 
 @mcp.resource(uri="conversation://speakers")
+@timed("resource")
 async def get_speakers() -> str | dict:
     """
     Get all available speakers for conversation generation.
     This resource provides speaker configurations needed for conversation generation.
     Call this before using the generate_conversation tool to obtain valid speaker parameters.
     """
-    return await _get_speakers()
+    return await _get_speakers(session=_session())
 
 
 # -*- text_to_speech -*-
 
 
 @mcp.resource(uri="textToSpeech://models")
+@timed("resource")
 async def get_tts_models() -> str | dict:
     """
     Get all available TTS (Text-to-Speech) models and their configurations.
     This resource should be called first to retrieve provider information, model specifications,
     and voice parameters before generating any TTS audio.
     """
-    return await _get_tts_models()
+    return await _get_tts_models(session=_session())
 
 
 @mcp.tool()
+@timed("tool")
 async def generate_tts(
     provider: str,
     text: str,
     model_id: str,
     voice_id: str,
-) -> str | dict:
+    async_mode: bool = False,
+    deliver: AudioDelivery = "url",
+) -> str | dict | list:
     """
     Generate TTS (Text-to-Speech) audio from text input.
 
@@ -161,39 +502,141 @@ async def generate_tts(
         text: The text content to convert to speech
         model_id: The TTS model identifier from the provider's model list
         voice_id: The voice identifier compatible with the selected provider and model
+        async_mode: Return the task ID right away instead of waiting for the audio;
+            read 'task://{task_id}' or call wait_for_task to get the result
+        deliver: How to return the audio: 'url' for the remote URL only, 'path' to also
+            download it to a local cache file (local_path), 'embedded' to also return
+            it as an embedded audio resource; with async_mode, pass it to wait_for_task
 
     Returns:
         Task details with TTS generation status and audio file information
     """
+    if error := _async_deliver_error(async_mode, deliver):
+        return error
     request = GenerateTTSRequest(
         provider=provider,
         text=text,
         model_id=model_id,
         voice_id=voice_id,
+        sync=not async_mode,
+    )
+    resp = await _generate_tts(
+        request,
+        session=_session(),
+        result_cache=_result_cache(),
+        download_session=_download_session(),
+    )
+    return _track(resp, "tts") if async_mode else await _deliver(resp, deliver)
+
+
+@mcp.tool()
+@timed("tool")
+async def generate_tts_batch(
+    items: list[TTSBatchItem],
+    concurrency: int = TTS_BATCH_CONCURRENCY,
+) -> str | dict:
+    """
+    Generate TTS (Text-to-Speech) audio for many texts in one call.
+    Prefer this over repeated generate_tts calls when synthesizing several prompts.
+
+    Prerequisites:
+    1. Call 'textToSpeech://models' resource to get available providers, models, and voices
+
+    Args:
+        items: The texts to synthesize, each with provider, text, model_id, voice_id and
+            optional configs, as for generate_tts
+        concurrency: Maximum number of items generated at the same time
+
+    Returns:
+        One result per item in input order, with its status, task details or error.
+        Identical items are generated once and marked with duplicate_of.
+    """
+    return await _generate_tts_batch(
+        items, concurrency, session=_session(), result_cache=_result_cache()
+    )
+
+
+@mcp.tool()
+@timed("tool")
+async def generate_tts_long(
+    provider: str,
+    text: str,
+    model_id: str,
+    voice_id: str,
+    ctx: Context,
+    max_chars: Optional[int] = None,
+    concurrency: int = TTS_LONG_CONCURRENCY,
+) -> str | dict:
+    """
+    Generate TTS (Text-to-Speech) audio for long text such as a chapter.
+    The text is split at paragraph and sentence boundaries, the chunks are synthesized
+    concurrently and their audio is stitched in order into one local file. The URL of
+    every chunk is reported as a log message as soon as it is ready.
+
+    Prerequisites:
+    1. Call 'textToSpeech://models' resource to get available providers, models, and voices
+
+    Args:
+        provider: TTS provider name obtained from 'textToSpeech://models'
+        text: The text content to convert to speech
+        model_id: The TTS model identifier from the provider's model list
+        voice_id: The voice identifier compatible with the selected provider and model
+        max_chars: Maximum characters per chunk, defaults to the provider's limit
+        concurrency: Maximum number of chunks synthesized at the same time
+
+    Returns:
+        Local path and format of the stitched audio file, and the task details of every chunk
+    """
+    request = GenerateTTSRequest(
+        provider=provider,
+        text=text,
+        model_id=model_id,
+        voice_id=voice_id,
+    )
+    done = 0
+
+    async def on_chunk(index: int, total: int, task: GenerateTTSResponse) -> None:
+        nonlocal done
+        done += 1
+        await ctx.info(f"Chunk {index + 1}/{total} ready: {task.details.url}")
+        await ctx.report_progress(done, total)
+
+    return await _generate_tts_long(
+        request,
+        max_chars,
+        concurrency,
+        on_chunk=on_chunk,
+        session=_session(),
+        download_session=_download_session(),
+        result_cache=_result_cache(),
     )
-    return await _generate_tts(request)
 
 
 # -*- voice_changer -*-
 
 
 @mcp.resource(uri="voiceChanger://models")
+@timed("resource")
 async def get_voice_changer_models() -> str | dict:
     """
     Get all available voice changer models and their configurations.
     This resource should be called first to retrieve provider information and model specifications
     before performing any voice transformation operations.
     """
-    return await _get_voice_changer_models()
+    return await _get_voice_changer_models(session=_session())
 
 
 @mcp.tool()
+@timed("tool")
 async def change_voice(
     provider: str,
     model_id: str,
     voice_id: str,
-    audio_data: str,
-) -> str | dict:
+    audio_data: str = "",
+    audio_path: Optional[str] = None,
+    async_mode: bool = False,
+    deliver: AudioDelivery = "url",
+) -> str | dict | list:
     """
     Transform an existing audio file to use a different voice.
 
@@ -207,41 +650,71 @@ async def change_voice(
         model_id: The voice changer model identifier from the provider's model list
         voice_id: The target voice identifier to transform the audio into
         audio_data: Base64 encoded audio file to be transformed
+        audio_path: Local file path or file:// URI of the audio file, used instead of
+            audio_data and streamed to the server (preferred for large files); it must
+            be in the directory of VOISPARK_AUDIO_ROOT when that is set
+        async_mode: Return the task ID right away instead of waiting for the audio;
+            read 'task://{task_id}' or call wait_for_task to get the result
+        deliver: How to return the audio: 'url' for the remote URL only, 'path' to also
+            download it to a local cache file (local_path), 'embedded' to also return
+            it as an embedded audio resource; with async_mode, pass it to wait_for_task
 
     Returns:
         Task details with voice transformation status and processed audio information
     """
+    if not audio_data and not audio_path:
+        return "Either audio_data or audio_path must be provided"
+    if error := _async_deliver_error(async_mode, deliver):
+        return error
+    from voispark_mcp.msg.voice_changer_msg import ChangeVoiceRequest
+
     request = ChangeVoiceRequest(
         provider=provider,
         model_id=model_id,
         voice_id=voice_id,
         audio_data=audio_data,
+        sync=not async_mode,
+    )
+    resp = await _change_voice(
+        request,
+        audio_path=audio_path,
+        session=_session(),
+        result_cache=_result_cache(),
+        download_session=_download_session(),
     )
-    return await _change_voice(request)
+    if async_mode:
+        return _track(resp, "voice_changer")
+    return await _deliver(resp, deliver)
 
 
 # -*- voice_clone -*-
 
 
 @mcp.resource(uri="voiceClone://models")
+@timed("resource")
 async def get_voice_clone_models() -> str | dict:
     """
     Get all available voice clone models and their configurations.
     This resource should be called first to retrieve provider information and model specifications
     before performing any voice cloning operations.
     """
-    return await _get_voice_clone_models()
+    return await _get_voice_clone_models(session=_session())
 
 
 @mcp.tool()
+@timed("tool")
 async def clone_voice(
     provider: str,
     model_id: str,
-    audio_data: str,
     configs: Union[CartesiaVoiceCloneConfig, MiniMaxVoiceCloneConfig],
+    audio_data: str = "",
+    audio_path: Optional[str] = None,
 ) -> str | dict:
     """
     Clone a voice from an audio sample to create a new synthetic voice.
+    Leading and trailing silence and long pauses are trimmed from WAV samples, and of
+    a long recording only the 10-30 seconds with the most speech are uploaded. Samples
+    with a transcript in configs are uploaded untrimmed, so that they match it.
 
     Prerequisites:
     1. Call 'voiceClone://models' resource to get available providers and models
@@ -251,32 +724,40 @@ async def clone_voice(
     Args:
         provider: Voice clone provider name obtained from 'voiceClone://models'
         model_id: The voice clone model identifier from the provider's model list
-        audio_data: Base64 encoded audio sample for voice cloning
         configs: Provider-specific configuration (CartesiaVoiceCloneConfig or MiniMaxVoiceCloneConfig)
+        audio_data: Base64 encoded audio sample for voice cloning
+        audio_path: Local file path or file:// URI of the audio sample, used instead of
+            audio_data and streamed to the server (preferred for large files); it must
+            be in the directory of VOISPARK_AUDIO_ROOT when that is set
 
     Returns:
-        Voice clone task details with processing status and cloned voice information
+        Voice clone task details with processing status and cloned voice information,
+        and the seconds and bytes trimmed from the audio sample
     """
+    if not audio_data and not audio_path:
+        return "Either audio_data or audio_path must be provided"
     request = CloneVoiceRequest(
         provider=provider, model_id=model_id, audio_data=audio_data, configs=configs
     )
-    return await _clone_voice(request)
+    return await _clone_voice(request, audio_path=audio_path, session=_session())
 
 
 # -*- voices -*-
 
 
 @mcp.resource(uri="voices://providers")
+@timed("resource")
 async def get_providers() -> str | dict:
     """
     Get all available voice providers and their supported capabilities.
     This resource provides information about different voice service providers
     and their supported features (TTS, voice changing, voice cloning, etc.).
     """
-    return await _get_providers()
+    return await _get_providers(session=_session())
 
 
 @mcp.resource(uri="voices://{provider_id}/{voice_type}/list")
+@timed("resource")
 async def list_all_voices(provider_id: str, voice_type: str) -> str | dict:
     """
     List all available voices from a specific provider for a given voice type.
@@ -291,36 +772,124 @@ async def list_all_voices(provider_id: str, voice_type: str) -> str | dict:
     Returns:
         List of voices with their IDs, names, descriptions, and preview URLs
     """
-    return await _list_all_voices(provider_id, voice_type)
+    resp = await _list_all_voices(provider_id, voice_type, session=_session())
+    if isinstance(resp, dict):
+        # Keep the voice index in step with the lists read by the client
+        _app_context().voice_index.update(provider_id, voice_type, resp)
+    return resp
+
+
+@mcp.resource(uri="voices://all/{voice_type}")
+@timed("resource")
+async def list_voices_of_all_providers(voice_type: str) -> str | dict:
+    """
+    List the voices of every provider that supports a voice type in one read, instead of
+    reading 'voices://{provider_id}/{voice_type}/list' for each provider.
+    The providers are listed concurrently; a provider that fails or does not answer in
+    time is reported in failed_providers and the voices of the others are returned.
+
+    Args:
+        voice_type: The type of voices to list ('tts', 'voice_changer', 'voice_clone')
+
+    Returns:
+        The voices of all providers, each with its provider, the providers that were
+        listed and the failed providers with the reason
+    """
+    return await _list_voices_of_all_providers(voice_type, session=_session())
+
+
+@mcp.tool()
+@timed("tool")
+async def search_voices(
+    query: Optional[str] = None,
+    ability: Optional[Literal["tts", "voice_changer", "voice_clone"]] = None,
+    provider: Optional[str] = None,
+    voice_id: Optional[str] = None,
+    limit: int = 20,
+) -> str | dict:
+    """
+    Search the voices of every provider by name, description and provider, instead of
+    reading 'voices://{provider_id}/{voice_type}/list' for each provider.
+    Query words may be prefixes or contain typos; voices matching more of them rank higher.
+
+    Args:
+        query: Words describing the voice, e.g. 'calm british narrator'; all voices are
+            listed by name when omitted
+        ability: Only voices usable for this voice type
+        provider: Only voices of this provider (an id from 'voices://providers')
+        voice_id: Look up a voice by its id instead of searching; voices of different
+            providers may share an id, pass provider to get only one of them
+        limit: Maximum number of voices returned
+
+    Returns:
+        The matching voices best first, each with its provider, collection (default,
+        user or ip), abilities and match score
+    """
+    return await _search_voices(
+        _app_context().voice_index,
+        query,
+        ability=ability,
+        provider=provider,
+        voice_id=voice_id,
+        limit=limit,
+        session=_session(),
+    )
 
 
 # -*- history -*-
 
 
-@mcp.resource(uri="history://list")
+@mcp.resource(uri="history://{source}/list")
+@timed("resource")
 async def get_history_list(
     source: Literal["tts", "voice_changer", "conversation"] = "tts",
 ) -> str | dict:
     """
-    Get a list of historical tasks for a specific service type.
+    Get the first page of historical tasks for a specific service type, newest first.
     This resource allows tracking and reviewing previously executed tasks.
 
     Args:
         source: The service type to get history for ('tts', 'voice_changer', 'conversation')
 
     Returns:
-        List of historical tasks with their IDs, status, and basic information
+        A page of historical tasks with their IDs and basic information, the total
+        count, and next_cursor: read 'history://{source}/list/{cursor}' with it to get
+        the next page, it is null on the last page
+    """
+    return await _get_history_list(source, session=_session())
+
+
+@mcp.resource(uri="history://{source}/list/{cursor}")
+@timed("resource")
+async def get_history_page(
+    source: Literal["tts", "voice_changer", "conversation"], cursor: str
+) -> str | dict:
+    """
+    Get a further page of historical tasks for a specific service type. The page
+    starts after the last task of the previous page, even if tasks were added or
+    deleted since.
+
+    Prerequisites:
+    1. Call 'history://{source}/list' resource first to get the first page and its next_cursor
+
+    Args:
+        source: The service type to get history for ('tts', 'voice_changer', 'conversation')
+        cursor: The next_cursor of the previous page
+
+    Returns:
+        The page of historical tasks, with the next_cursor of the page after it
     """
-    return await _get_history_list(source)
+    return await _get_history_list(source, session=_session(), cursor=cursor)
 
 
 @mcp.resource(uri="history://{history_id}")
+@timed("resource")
 async def get_history(history_id: str) -> str | dict:
     """
     Get detailed information about a specific historical task.
 
     Prerequisites:
-    1. Call 'history://list' resource first to get available history_id values
+    1. Call 'history://{source}/list' resource first to get available history_id values
 
     Args:
         history_id: The unique identifier of the historical task
@@ -328,9 +897,229 @@ async def get_history(history_id: str) -> str | dict:
     Returns:
         Detailed task information including parameters, status, results, and timestamps
     """
-    return await _get_history(history_id)
+    return await _get_history(history_id, session=_session())
+
+
+@mcp.tool()
+@timed("tool")
+async def search_history(
+    query: Optional[str] = None,
+    source: Optional[Literal["tts", "voice_changer", "conversation"]] = None,
+    provider: Optional[str] = None,
+    voice_id: Optional[str] = None,
+    model_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 20,
+    refresh: bool = False,
+) -> str | dict:
+    """
+    Search the history of generated audio without paging through 'history://{source}/list'.
+    The history is kept in a local index; only entries newer than the indexed ones are
+    fetched, at most once a minute by default, so searches answer without waiting for the API.
+
+    Args:
+        query: Words that must all occur in the text of the entry (the TTS text or the
+            conversation lines)
+        source: Only search this service type ('tts', 'voice_changer', 'conversation')
+        provider: Only entries of this provider
+        voice_id: Only entries generated with this voice
+        model_id: Only entries generated with this model
+        since: ISO 8601 date or datetime (UTC unless it has an offset) of the earliest entry
+        until: ISO 8601 date or datetime before which the entries were created
+        limit: Maximum number of entries returned
+        refresh: Fetch new entries even if the index was updated within the last minute
+
+    Returns:
+        The matching entries newest first, each with its source, and stale_sources:
+        the sources that could not be updated and may miss recent entries
+    """
+    return await _search_history(
+        _history_index(),
+        query,
+        source=source,
+        provider=provider,
+        voice_id=voice_id,
+        model_id=model_id,
+        since=since,
+        until=until,
+        limit=limit,
+        refresh=refresh,
+        session=_session(),
+    )
+
+
+# -*- task -*-
+
+
+@mcp.resource(uri="task://{task_id}")
+@timed("resource")
+async def get_task(task_id: str) -> str | dict:
+    """
+    Get the status of a task submitted with async_mode.
+    Tasks submitted through this server are polled in the background, so reading
+    this resource does not hit the API for them.
+
+    Args:
+        task_id: The task ID returned by generate_tts, change_voice or generate_conversation
+
+    Returns:
+        Task status, audio details once it has succeeded, and polling information
+    """
+    state = _app_context().poller.get(task_id)
+    if state is not None:
+        return state.model_dump()
+    return await _get_task(task_id, session=_session())
+
+
+@mcp.tool()
+@timed("tool")
+async def wait_for_task(
+    task_id: str, timeout: float = 60, deliver: AudioDelivery = "url"
+) -> str | dict | list:
+    """
+    Wait for a task submitted with async_mode to finish.
+
+    Args:
+        task_id: The task ID returned by generate_tts, change_voice or generate_conversation
+        timeout: Maximum number of seconds to wait
+        deliver: How to return the audio of a successful task: 'url' for the remote URL
+            only, 'path' to also download it to a local cache file (local_path),
+            'embedded' to also return it as an embedded audio resource
+
+    Returns:
+        Task status and audio details; the status is still pending or processing
+        if the task did not finish within the timeout
+    """
+    poller = _app_context().poller
+    if poller.get(task_id) is None:
+        resp = await _get_task(task_id, session=_session())
+        if isinstance(resp, str):
+            return resp
+        poller.track(TaskResponse.model_validate(resp))
+    state = (await poller.wait(task_id, timeout)).model_dump()
+    return await _deliver(state, deliver, state["task"])
+
+
+# -*- health -*-
+
+
+@mcp.resource(uri="health://providers")
+@timed("resource")
+async def get_provider_health() -> dict:
+    """
+    Get the circuit breaker state and rate limiter buckets of every provider used so far.
+    A provider's circuit opens after repeated transient failures (network errors,
+    timeouts, 5xx responses); while it is open, requests for that provider fail
+    immediately instead of waiting for the API, until a trial request succeeds.
+    When rate limits are configured, requests are charged their estimated credit
+    cost and queue until their provider's and API key's buckets have the credits.
+
+    Returns:
+        circuits: For every provider its state (closed, open or half_open), the
+            number of consecutive failures, rejected requests and seconds until
+            the next trial
+        rate_limits: For every provider and API key bucket its rate, burst,
+            available credits, admitted and rejected requests and seconds waited
+    """
+    return {"circuits": breaker_states(), "rate_limits": rate_limits()}
+
+
+# -*- metrics -*-
+
+
+@mcp.resource(uri="metrics://summary")
+async def get_metrics() -> dict:
+    """
+    Get latency histograms (count, mean, p50, p95, p99 in seconds) of every api call,
+    tool and resource by provider, calls in flight, errors by endpoint and ErrorCode,
+    HTTP status or exception, payload sizes in bytes and the hit ratio of every cache.
+    """
+    return snapshot(_all_cache_stats())
+
+
+if PROMETHEUS:
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def prometheus_metrics(request: Request) -> Response:
+        """The metrics in Prometheus text format, served on the HTTP transports."""
+        # Routes run outside of MCP sessions, so only the catalog caches are known
+        return PlainTextResponse(
+            prometheus_text(cache_stats()), media_type="text/plain; version=0.0.4"
+        )
+
+
+# -*- cache -*-
+
+
+@mcp.resource(uri="cache://stats")
+@timed("resource")
+async def get_cache_stats() -> dict:
+    """
+    Get hit/miss counters, TTL and size of the catalog caches.
+    The catalog resources (models, speakers and providers) are cached in memory
+    and refreshed in the background once their TTL has expired.
+    The local cache of audio fetched with deliver='path' or 'embedded' is listed
+    as 'audio'. When VOISPARK_RESULT_CACHE is enabled, the persistent cache of TTS and voice
+    changer results is listed as 'results'. The index searched by search_voices is listed
+    as 'voice_index', and once search_history has been used, the local history index is
+    listed as 'history'.
+    """
+    return _all_cache_stats()
+
+
+@mcp.tool()
+@timed("tool")
+async def invalidate_cache(name: Optional[str] = None) -> list[str]:
+    """
+    Invalidate cached catalog data so that the next read fetches it again.
+    Invalidating 'results' clears the persistent cache of generated audio and
+    invalidating 'history' clears the local history index. Invalidating 'voice_index'
+    makes the next search_voices call fetch every voice list again.
+
+    Args:
+        name: The cache to invalidate (as listed by 'cache://stats'), or all caches when omitted
+
+    Returns:
+        The names of the invalidated caches
+    """
+    names = invalidate(name)
+    result_cache = _result_cache()
+    if result_cache is not None and name in (None, "results"):
+        result_cache.clear()
+        names.append("results")
+    context = _app_context()
+    if context.history_index is not None and name in (None, "history"):
+        context.history_index.clear()
+        names.append("history")
+    if name in (None, "voice_index"):
+        context.voice_index.clear()
+        names.append("voice_index")
+    return names
 
 
 def main():
     """Entry point for the voispark_mcp command."""
-    mcp.run()
+    mcp.save_schema_cache()
+    asyncio.run(_serve())
+
+
+async def _serve() -> None:
+    runners = {
+        "stdio": mcp.run_stdio_async,
+        "sse": mcp.run_sse_async,
+        "streamable-http": mcp.run_streamable_http_async,
+    }
+    if TRANSPORT not in runners:
+        raise ValueError(f"Unknown transport: {TRANSPORT}")
+    if TRANSPORT != "stdio" and AUDIO_ROOT is None:
+        logging.warning(
+            "Remote clients may upload any local file as audio_path, "
+            "set VOISPARK_AUDIO_ROOT to the directory they may read from"
+        )
+    logging.info("Starting MCP server")
+    try:
+        await runners[TRANSPORT]()
+    finally:
+        logging.info("Shutting down MCP server")
+        await _close_context()
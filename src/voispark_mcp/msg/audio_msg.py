@@ -1,5 +1,10 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
+# Tasks submitted with sync=False are pending or processing until they finish
+TaskStatus = Literal["pending", "processing", "success", "failed"]
+
 
 class AudioFormat(BaseModel):
     """音频格式"""
@@ -1,7 +1,7 @@
 from typing import Union, Literal, Optional
 from pydantic import BaseModel, Field
 
-from voispark_mcp.msg.audio_msg import AudioTaskDetails
+from voispark_mcp.msg.audio_msg import AudioFormat, AudioTaskDetails, TaskStatus
 
 
 class NariLabsConversationConfig(BaseModel):
@@ -103,11 +103,30 @@ class GenerateConversationRequest(BaseModel):
 
 class GenerateConversationResponse(BaseModel):
     task_id: str
-    status: Literal["success", "failed"]
+    status: TaskStatus
     details: Optional[AudioTaskDetails] = None
     error: Optional[str] = None
 
 
+class ConversationSegment(BaseModel):
+    first_turn: int
+    """
+    Index of the first turn of the segment in the conversation
+    """
+    turns: int
+    attempts: int
+    task: GenerateConversationResponse
+
+
+class GenerateLongConversationResponse(BaseModel):
+    path: str
+    """
+    Path of the local file the audio of the segments was stitched into
+    """
+    format: AudioFormat
+    segments: list[ConversationSegment]
+
+
 class GetSpeakersResponse(BaseModel):
     speakers: list[ConversationSpeaker]
 
@@ -1,4 +1,4 @@
-from typing import Literal, Any
+from typing import Literal, Any, Optional
 from pydantic import BaseModel
 
 from voispark_mcp.msg.conversation_msg import ConversationSpeaker, ConversationText
@@ -19,7 +19,7 @@ class History(BaseModel):
     configs: dict[str, Any]
 
 
-class ConversationHistory:
+class ConversationHistory(BaseModel):
     history_id: str
     user_id: str
     provider: str
@@ -33,6 +33,14 @@ class ConversationHistory:
 class HistoryListResponse(BaseModel):
     history_list: list[History] | list[ConversationHistory]
     total: int
+    offset: int = 0
+    """
+    Position of the first entry of this page in the whole history
+    """
+    next_cursor: Optional[str] = None
+    """
+    Cursor of the next page, None on the last page
+    """
 
 
 class HistoryResponse(BaseModel):
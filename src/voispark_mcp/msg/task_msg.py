@@ -0,0 +1,27 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, computed_field
+
+from voispark_mcp.msg.audio_msg import AudioTaskDetails, TaskStatus
+
+TaskKind = Literal["tts", "voice_changer", "conversation"]
+
+
+class TaskResponse(BaseModel):
+    task_id: str
+    status: TaskStatus
+    details: Optional[AudioTaskDetails] = None
+    error: Optional[str] = None
+
+
+class TaskState(BaseModel):
+    task: TaskResponse
+    kind: Optional[TaskKind] = None
+    submitted_at: float
+    updated_at: float
+    polls: int = 0
+
+    @computed_field
+    @property
+    def done(self) -> bool:
+        return self.task.status in ("success", "failed")
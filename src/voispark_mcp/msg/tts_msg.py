@@ -2,7 +2,7 @@ from typing import Union, Literal, Optional
 
 from pydantic import BaseModel, Field
 
-from voispark_mcp.msg.audio_msg import AudioTaskDetails
+from voispark_mcp.msg.audio_msg import AudioFormat, AudioTaskDetails, TaskStatus
 
 
 class TTSModelConfig(BaseModel):
@@ -176,20 +176,23 @@ class TTSProviderListResponse(BaseModel):
     models: list[ProviderItem]
 
 
+TTSConfig = Union[
+    CartesiaTTSConfig,
+    ElevenLabsTTSConfig,
+    OpenAIConfig,
+    FishAudioConfig,
+    OrpheusConfig,
+    MinimaxConfig,
+    None,
+]
+
+
 class GenerateTTSRequest(BaseModel):
     text: str
     provider: str
     model_id: str
     voice_id: str
-    configs: Union[
-        CartesiaTTSConfig,
-        ElevenLabsTTSConfig,
-        OpenAIConfig,
-        FishAudioConfig,
-        OrpheusConfig,
-        MinimaxConfig,
-        None,
-    ] = None
+    configs: TTSConfig = None
     sync: bool = Field(
         default=True, description="sync should be true when using the API"
     )
@@ -197,6 +200,40 @@ class GenerateTTSRequest(BaseModel):
 
 class GenerateTTSResponse(BaseModel):
     task_id: str
-    status: Literal["success", "failed"]
+    status: TaskStatus
     details: Optional[AudioTaskDetails] = None
     error: Optional[str] = None
+
+
+class TTSBatchItem(BaseModel):
+    text: str
+    provider: str
+    model_id: str
+    voice_id: str
+    configs: TTSConfig = None
+
+
+class TTSBatchResult(BaseModel):
+    index: int
+    status: Literal["success", "failed"]
+    task: Optional[GenerateTTSResponse] = None
+    error: Optional[str] = None
+    duplicate_of: Optional[int] = Field(
+        default=None,
+        description="Index of the identical earlier item whose result is reused",
+    )
+
+
+class GenerateTTSBatchResponse(BaseModel):
+    results: list[TTSBatchResult]
+    succeeded: int
+    failed: int
+
+
+class GenerateLongTTSResponse(BaseModel):
+    path: str
+    """
+    本地拼接后的音频文件路径
+    """
+    format: AudioFormat
+    chunks: list[GenerateTTSResponse]
@@ -1,7 +1,7 @@
 from typing import Union, Literal, Optional
 from pydantic import BaseModel, Field
 
-from voispark_mcp.msg.audio_msg import AudioTaskDetails
+from voispark_mcp.msg.audio_msg import AudioTaskDetails, TaskStatus
 
 
 class VoiceChangerModelConfig(BaseModel):
@@ -83,7 +83,7 @@ class ChangeVoiceRequest(BaseModel):
 
 class ChangeVoiceResponse(BaseModel):
     task_id: str
-    status: Literal["success", "failed"]
+    status: TaskStatus
     details: Optional[AudioTaskDetails] = None
     error: Optional[str] = None
 
@@ -105,5 +105,25 @@ class CloneVoiceResponse(BaseModel):
     preview_url: str = ""
 
 
+class CloneSample(BaseModel):
+    """
+    The audio sample uploaded for a clone, after silence was trimmed and the
+    best window of speech was kept
+    """
+
+    original_seconds: float
+    seconds: float
+    removed_seconds: float
+    original_bytes: int
+    removed_bytes: int
+
+
+class CloneVoiceResult(CloneVoiceResponse):
+    sample: Optional[CloneSample] = None
+    """
+    Set when the uploaded sample was prepared from the given audio
+    """
+
+
 class VoiceCloneModelsResponse(BaseModel):
     models: list[VoiceCloneModel]
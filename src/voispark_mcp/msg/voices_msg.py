@@ -19,6 +19,22 @@ class VoicesListResponse(BaseModel):
     ip_voices: list[Voice]
 
 
+class ProviderFailure(BaseModel):
+    provider: str
+    error: str
+
+
+class AllVoicesListResponse(VoicesListResponse):
+    providers: list[str]
+    """
+    The providers whose voices are listed
+    """
+    failed_providers: list[ProviderFailure]
+    """
+    The providers whose voices could not be listed, with the reason
+    """
+
+
 class VoiceProvider(BaseModel):
     id: str
     name: str
@@ -0,0 +1,423 @@
+"""
+A local stand-in for the VoiSpark API, used by the benchmarks and offline tests.
+
+It serves every /api/* route used by the `voispark_mcp.api` modules with
+BaseResponse payloads shaped like the real ones. Latency, error rate and
+payload size are configurable. Responses are compressed as negotiated with
+Accept-Encoding and compressed request bodies are decoded, in every encoding
+of `voispark_mcp.core.compression`. Run it directly to serve on http://127.0.0.1:8765:
+
+    python tests/stand_in.py --latency 0.05 --error-rate 0.01 --payload-size 200
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import random
+import time
+from typing import Optional
+import uuid
+import wave
+
+from aiohttp import web
+
+from voispark_mcp.core.compression import ENCODINGS, compress, decompress, decompressor
+
+SAMPLE_RATE = 16000
+# Frames of synthesized audio per character of text
+FRAMES_PER_CHAR = SAMPLE_RATE // 15
+# Frames of audio returned by the voice changer
+CHANGED_FRAMES = SAMPLE_RATE
+
+# Responses smaller than this are sent uncompressed, as by most servers
+COMPRESS_MIN_SIZE = 1024
+
+PROVIDER_IDS = ("cartesia", "elevenlabs", "minimax", "fishaudio")
+
+PROVIDERS = [
+    {
+        "id": provider,
+        "name": provider.title(),
+        "description": f"{provider.title()} voices",
+        "abilities": ["tts", "voice_changer", "voice_clone"],
+    }
+    for provider in PROVIDER_IDS
+]
+
+_FLOAT_CONFIG = {
+    "param_name": "temperature",
+    "param_type": "float",
+    "default_value": 0.7,
+    "description": "Sampling temperature",
+    "min_value": 0.0,
+    "max_value": 2.0,
+    "step": 0.1,
+}
+
+
+def _models(payload_size: int, languages: bool) -> list[dict]:
+    models = []
+    for index in range(max(1, payload_size // 10)):
+        model = {"model_name": f"model-{index}", "credit": 1 + index % 3}
+        if languages:
+            model["supported_languages"] = ["en", "zh", "ja"]
+        models.append(model)
+    return models
+
+
+def make_catalog(payload_size: int, languages: bool = False, **config) -> dict:
+    return {
+        "models": [
+            {
+                "provider": provider,
+                "name": provider.title(),
+                "description": f"{provider.title()} models",
+                "model_list": _models(payload_size, languages),
+                "configs": [{**_FLOAT_CONFIG, **config}],
+            }
+            for provider in PROVIDER_IDS
+        ]
+    }
+
+
+def make_voices(provider: str, count: int) -> list[dict]:
+    return [
+        {
+            "id": f"{provider}-voice-{index}",
+            "name": f"Voice {index}",
+            "description": f"A stand-in {provider} voice",
+            "provider": provider,
+            "avatar_url": f"https://cdn.example.com/avatars/{index}.png",
+            "preview_url": f"https://cdn.example.com/previews/{index}.mp3",
+        }
+        for index in range(count)
+    ]
+
+
+def _speakers(count: int) -> list[dict]:
+    return [
+        {
+            "speaker_id": f"speaker-{index}",
+            "speaker_name": f"Speaker {index}",
+            "audio_text": "Hello, this is a reference recording.",
+            "s3_key": f"speakers/{index}.wav",
+        }
+        for index in range(count)
+    ]
+
+
+def make_history(source: str, count: int) -> list[dict]:
+    now = int(time.time())
+    if source == "conversation":
+        return [
+            {
+                "history_id": f"conversation-{index}",
+                "user_id": "user",
+                "provider": "sesame",
+                "configs": {},
+                "conversation": [
+                    {"speaker_index": turn % 2, "text": f"Line {turn} of {index}."}
+                    for turn in range(4)
+                ],
+                "speakers": _speakers(2),
+                "s3_key": f"conversation/{index}.wav",
+                "created_at": now - index * 60,
+            }
+            for index in range(count)
+        ]
+    return [
+        {
+            "history_id": f"{source}-{index}",
+            "user_id": "user",
+            "source": "vc" if source == "voice_changer" else "tts",
+            "object_key": f"{source}/{index}.wav",
+            "voice_id": "cartesia-voice-0",
+            "voice_name": "Voice 0",
+            "provider": "cartesia",
+            "model_id": "model-0",
+            "model_name": "Model 0",
+            "created_at": now - index * 60,
+            "ref_text": f"Generated sentence number {index}.",
+            "configs": {},
+        }
+        for index in range(count)
+    ]
+
+
+def _success(data: dict) -> web.Response:
+    return web.json_response({"code": 0, "message": "Success", "data": data})
+
+
+def _error(code: int = 40000, message: str = "Common Error") -> web.Response:
+    return web.json_response({"code": code, "message": message})
+
+
+def _audio_task(request: web.Request, frames: int) -> dict:
+    url = request.url.with_path(f"/audio/{frames}.wav").with_query(None)
+    return {
+        "task_id": uuid.uuid4().hex,
+        "status": "success",
+        "details": {
+            "url": str(url),
+            "format": {
+                "container": "wav",
+                "encoding": "pcm_s16le",
+                "sample_rate": SAMPLE_RATE,
+                "channel": 1,
+            },
+        },
+    }
+
+
+def _negotiate(accept: str) -> Optional[str]:
+    """The encoding of an Accept-Encoding header with the highest weight."""
+    best, best_weight = None, 0.0
+    for item in accept.split(","):
+        name, _, params = item.partition(";")
+        name, params = name.strip().lower(), params.strip()
+        try:
+            weight = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            continue
+        if name in ENCODINGS and name != "deflate" and weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+async def _json(request: web.Request):
+    body = await request.read()
+    return json.loads(await decompress(body, request.headers.get("Content-Encoding")))
+
+
+def make_app(
+    latency: float = 0.0,
+    char_latency: float = 0.0,
+    error_rate: float = 0.0,
+    payload_size: int = 20,
+    seed: Optional[int] = None,
+) -> web.Application:
+    """
+    Build the stand-in application.
+
+    Args:
+        latency: Fixed latency of every API request in seconds
+        char_latency: Additional generation time per character of text in seconds
+        error_rate: Probability that an API request fails with HTTP 503
+        payload_size: Number of voices, history entries and speakers per list,
+            and a tenth of it models per provider
+        seed: Seed of the error sampling, for reproducible runs
+    """
+    rng = random.Random(seed)
+    # Tasks submitted with sync=False: task_id -> (time ready, finished task)
+    tasks: dict[str, tuple[float, dict]] = {}
+    tts_models = make_catalog(payload_size, languages=True)
+    voice_changer_models = make_catalog(payload_size)
+    voice_clone_models = make_catalog(
+        payload_size, param_name="name", param_type="string", default_value=""
+    )
+    conversation_models = {
+        "models": [
+            {
+                "provider": provider,
+                "name": provider.title(),
+                "description": f"{provider.title()} conversations",
+                "configs": [{**_FLOAT_CONFIG, "param_display_name": "Temperature"}],
+            }
+            for provider in ("sesame", "narilabs")
+        ]
+    }
+    speakers = _speakers(payload_size)
+    history = {
+        source: make_history(source, payload_size)
+        for source in ("tts", "voice_changer", "conversation")
+    }
+
+    @web.middleware
+    async def api_conditions(request: web.Request, handler) -> web.StreamResponse:
+        if not request.path.startswith("/api/"):
+            return await handler(request)
+        if latency:
+            await asyncio.sleep(latency)
+        if error_rate and rng.random() < error_rate:
+            return web.Response(status=503, text="Service Unavailable")
+        return await handler(request)
+
+    @web.middleware
+    async def encodings(request: web.Request, handler) -> web.StreamResponse:
+        if not request.path.startswith("/api/"):
+            return await handler(request)
+        encoding = request.headers.get("Content-Encoding", "identity")
+        if encoding.lower() != "identity":
+            try:
+                decompressor(encoding)
+            except ValueError:
+                return web.Response(status=415, text="Unsupported Content-Encoding")
+        response = await handler(request)
+        encoding = _negotiate(request.headers.get("Accept-Encoding", ""))
+        if (
+            encoding is not None
+            and isinstance(response, web.Response)
+            and isinstance(response.body, bytes)
+            and len(response.body) >= COMPRESS_MIN_SIZE
+        ):
+            response.body = await compress(response.body, encoding)
+            response.headers["Content-Encoding"] = encoding
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    def submit(request: web.Request, frames: int, sync: bool, delay: float):
+        task = _audio_task(request, frames)
+        if sync:
+            return _success(task)
+        tasks[task["task_id"]] = (time.monotonic() + delay, task)
+        return _success({"task_id": task["task_id"], "status": "pending"})
+
+    async def drain(request: web.Request) -> bytes:
+        """Read a possibly huge JSON body without buffering it, keeping its tail."""
+        encoding = request.headers.get("Content-Encoding", "identity").lower()
+        codec = None if encoding == "identity" else decompressor(encoding)
+        tail = b""
+        async for chunk in request.content.iter_chunked(64 * 1024):
+            tail = (tail + (codec.process(chunk) if codec else chunk))[-1024:]
+        return tail + codec.flush() if codec else tail
+
+    async def generate_tts(request: web.Request) -> web.Response:
+        body = await _json(request)
+        delay = char_latency * len(body["text"])
+        if body.get("sync", True) and delay:
+            await asyncio.sleep(delay)
+        frames = len(body["text"]) * FRAMES_PER_CHAR
+        return submit(request, frames, body.get("sync", True), delay)
+
+    async def change_voice(request: web.Request) -> web.Response:
+        # The uploaded audio comes first, the other fields such as sync at the end
+        sync = b'"sync":false' not in (await drain(request)).replace(b" ", b"")
+        return submit(request, CHANGED_FRAMES, sync, latency)
+
+    async def clone_voice(request: web.Request) -> web.Response:
+        await drain(request)
+        return _success(
+            {
+                "id": uuid.uuid4().hex,
+                "name": "Cloned voice",
+                "description": "A stand-in cloned voice",
+                "provider": "cartesia",
+            }
+        )
+
+    async def generate_conversation(request: web.Request) -> web.Response:
+        body = await _json(request)
+        chars = sum(len(turn["text"]) for turn in body["conversation"])
+        delay = char_latency * chars
+        if body.get("sync", True) and delay:
+            await asyncio.sleep(delay)
+        return submit(request, chars * FRAMES_PER_CHAR, body.get("sync", True), delay)
+
+    async def speaker_details(request: web.Request) -> web.Response:
+        speaker_id = request.match_info["speaker_id"]
+        for speaker in speakers:
+            if speaker["speaker_id"] == speaker_id:
+                url = request.url.with_path(f"/audio/{SAMPLE_RATE}.wav")
+                return _success({"speaker": speaker, "presigned_url": str(url)})
+        return _error()
+
+    async def history_list(request: web.Request) -> web.Response:
+        entries = history.get(request.query.get("source", "tts"))
+        if entries is None:
+            return _error()
+        offset = int(request.query.get("offset", 0))
+        limit = int(request.query.get("limit", len(entries)))
+        return _success(
+            {"history_list": entries[offset : offset + limit], "total": len(entries)}
+        )
+
+    async def history_details(request: web.Request) -> web.Response:
+        history_id = request.match_info["history_id"]
+        for entries in history.values():
+            for entry in entries:
+                if entry["history_id"] == history_id:
+                    url = request.url.with_path(f"/audio/{SAMPLE_RATE}.wav")
+                    return _success({"history": entry, "presigned_url": str(url)})
+        return _error()
+
+    async def task(request: web.Request) -> web.Response:
+        entry = tasks.get(request.match_info["task_id"])
+        if entry is None:
+            return _error()
+        ready_at, finished = entry
+        if time.monotonic() < ready_at:
+            return _success({"task_id": finished["task_id"], "status": "processing"})
+        return _success(finished)
+
+    async def audio(request: web.Request) -> web.Response:
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as output:
+            output.setnchannels(1)
+            output.setsampwidth(2)
+            output.setframerate(SAMPLE_RATE)
+            output.writeframes(bytes(2 * int(request.match_info["frames"])))
+        return web.Response(body=buffer.getvalue(), content_type="audio/wav")
+
+    def static(data: dict):
+        async def handler(request: web.Request) -> web.Response:
+            return _success(data)
+
+        return handler
+
+    async def voices(request: web.Request) -> web.Response:
+        provider = request.match_info["provider_id"]
+        return _success(
+            {
+                "default_voices": make_voices(provider, payload_size),
+                "user_voices": [],
+                "ip_voices": [],
+            }
+        )
+
+    app = web.Application(
+        client_max_size=1024**3,
+        middlewares=[api_conditions, encodings],
+        # Request bodies are decoded by the handlers, in every encoding
+        handler_args={"auto_decompress": False},
+    )
+    app.router.add_get("/api/tts/models", static(tts_models))
+    app.router.add_post("/api/tts/generate", generate_tts)
+    app.router.add_get("/api/voice_changer/models", static(voice_changer_models))
+    app.router.add_post("/api/voice_changer/change", change_voice)
+    app.router.add_get("/api/voice_clone/models", static(voice_clone_models))
+    app.router.add_post("/api/voice_clone/clone", clone_voice)
+    app.router.add_get("/api/conversation/models", static(conversation_models))
+    app.router.add_post("/api/conversation/generate", generate_conversation)
+    app.router.add_get("/api/conversation/speakers", static({"speakers": speakers}))
+    app.router.add_get("/api/conversation/speakers/{speaker_id}", speaker_details)
+    app.router.add_get("/api/voices/providers", static({"providers": PROVIDERS}))
+    app.router.add_get("/api/voices/{provider_id}/list", voices)
+    app.router.add_get("/api/history/list", history_list)
+    app.router.add_get("/api/history/{history_id}", history_details)
+    app.router.add_get("/api/task/{task_id}", task)
+    app.router.add_get("/audio/{frames}.wav", audio)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--char-latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-size", type=int, default=20)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    web.run_app(
+        make_app(
+            args.latency,
+            args.char_latency,
+            args.error_rate,
+            args.payload_size,
+            args.seed,
+        ),
+        host=args.host,
+        port=args.port,
+    )
@@ -0,0 +1,135 @@
+import asyncio
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from voispark_mcp.api.voices import list_all_voices
+from voispark_mcp.core.api_request import create_session, get, post
+from voispark_mcp.msg.base_resp import BaseResponse
+from voispark_mcp.msg.tts_msg import GenerateTTSRequest
+from voispark_mcp.msg.voices_msg import VoicesListResponse
+
+VOICES = {
+    "code": 0,
+    "message": "Success",
+    "data": {
+        "default_voices": [
+            {
+                "id": "voice-1",
+                "name": "Voice 1",
+                "description": "A default voice",
+                "provider": "cartesia",
+            }
+        ],
+        "user_voices": [],
+        "ip_voices": [],
+    },
+}
+
+
+class TestPooledSession(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.peers = []
+        self.delay = 0.0
+
+        async def voices(request: web.Request) -> web.Response:
+            self.peers.append(request.transport.get_extra_info("peername"))
+            await asyncio.sleep(self.delay)
+            return web.json_response(VOICES)
+
+        app = web.Application()
+        app.router.add_get("/api/voices/{provider_id}/list", voices)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_reuses_connection(self):
+        for _ in range(3):
+            resp = await list_all_voices("cartesia", "tts", session=self.session)
+            self.assertIsInstance(resp, dict)
+            VoicesListResponse.model_validate(resp)
+        self.assertEqual(len(self.peers), 3)
+        self.assertEqual(len(set(self.peers)), 1)
+        self.assertFalse(self.session.closed)
+
+    async def test_coalesces_identical_gets(self):
+        self.delay = 0.05
+        results = await asyncio.gather(
+            *(
+                get(
+                    "/api/voices/cartesia/list",
+                    query={"type": "tts"},
+                    response_model=BaseResponse[VoicesListResponse],
+                    session=self.session,
+                )
+                for _ in range(5)
+            )
+        )
+        self.assertEqual(len(self.peers), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+        await list_all_voices("cartesia", "voice_changer", session=self.session)
+        self.assertEqual(len(self.peers), 2)
+
+    async def test_cancelled_waiter_does_not_cancel_shared_request(self):
+        self.delay = 0.05
+        waiters = [
+            asyncio.create_task(
+                list_all_voices("cartesia", "tts", session=self.session)
+            )
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        waiters[0].cancel()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertIsInstance(results[1], dict)
+        self.assertEqual(results[1], results[2])
+        self.assertEqual(len(self.peers), 1)
+
+
+class TestPostBody(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.bodies = []
+
+        async def generate(request: web.Request) -> web.Response:
+            self.bodies.append((request.content_type, await request.read()))
+            return web.json_response({"code": 0, "message": "Success"})
+
+        app = web.Application()
+        app.router.add_post("/api/tts/generate", generate)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_body_is_compact_json(self):
+        request = GenerateTTSRequest(
+            text="hi", provider="p", model_id="m", voice_id="v"
+        )
+        for options in ({}, {"exclude_none": True}, {"exclude_defaults": True}):
+            await post(
+                "/api/tts/generate",
+                data=request,
+                response_model=BaseResponse[dict],
+                session=self.session,
+                **options,
+            )
+        self.assertEqual(
+            [body for _, body in self.bodies],
+            [
+                b'{"text":"hi","provider":"p","model_id":"m","voice_id":"v",'
+                b'"configs":null,"sync":true}',
+                b'{"text":"hi","provider":"p","model_id":"m","voice_id":"v","sync":true}',
+                b'{"text":"hi","provider":"p","model_id":"m","voice_id":"v"}',
+            ],
+        )
+        self.assertEqual(self.bodies[0][0], "application/json")
@@ -0,0 +1,75 @@
+import asyncio
+import base64
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from voispark_mcp.core.api_request import create_download_session
+from voispark_mcp.core.audio_fetch import AudioFetchCache, mime_type, read_base64
+
+
+class TestAudioFetchCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.audio = os.urandom(100_000)
+        self.ranges = []
+
+        async def audio(request: web.Request) -> web.Response:
+            self.ranges.append(request.headers.get("Range"))
+            await asyncio.sleep(0.01)
+            if request.headers.get("Range"):
+                start = int(request.headers["Range"][6:-1])
+                return web.Response(status=206, body=self.audio[start:])
+            return web.Response(body=self.audio)
+
+        app = web.Application()
+        app.router.add_get("/audio/{name}", audio)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_download_session()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = AudioFetchCache(Path(self.directory.name))
+
+    async def asyncTearDown(self):
+        self.directory.cleanup()
+        await self.session.close()
+        await self.server.close()
+
+    def url(self, name: str) -> str:
+        return str(self.server.make_url(f"/audio/{name}"))
+
+    async def test_repeated_fetches_download_once(self):
+        paths = await asyncio.gather(
+            *(self.cache.fetch(self.url("a"), "wav", self.session) for _ in range(5))
+        )
+        path = await self.cache.fetch(self.url("a"), "wav", self.session)
+        self.assertEqual(set(paths), {path})
+        self.assertEqual(path.suffix, ".wav")
+        self.assertEqual(path.read_bytes(), self.audio)
+        self.assertEqual(self.ranges, [None])
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 1))
+
+    async def test_partial_download_is_resumed(self):
+        path = self.cache.path_for(self.url("a"), "wav")
+        Path(f"{path}.part").write_bytes(self.audio[:40_000])
+        await self.cache.fetch(self.url("a"), "wav", self.session)
+        self.assertEqual(self.ranges, ["bytes=40000-"])
+        self.assertEqual(path.read_bytes(), self.audio)
+        self.assertEqual(self.cache.downloaded_bytes, 60_000)
+
+    async def test_least_recently_used_files_are_evicted(self):
+        self.cache.max_bytes = 250_000
+        first = await self.cache.fetch(self.url("a"), "wav", self.session)
+        await self.cache.fetch(self.url("b"), "wav", self.session)
+        os.utime(first, (0, 0))
+        await self.cache.fetch(self.url("c"), "wav", self.session)
+        self.assertFalse(first.exists())
+        self.assertEqual(self.cache.stats()["files"], 2)
+
+    async def test_read_base64(self):
+        path = await self.cache.fetch(self.url("a"), "mp3", self.session)
+        self.assertEqual(base64.b64decode(read_base64(path)), self.audio)
+        self.assertEqual(mime_type(path), "audio/mpeg")
@@ -0,0 +1,308 @@
+import asyncio
+import base64
+import io
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+import wave
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from voispark_mcp.api.conversation import generate_conversation
+from voispark_mcp.api.voice_clone import clone_voice
+from voispark_mcp.core import audio_prep
+from voispark_mcp.core.api_request import create_session
+from voispark_mcp.core.audio_file import OUTPUT_DIR
+from voispark_mcp.core.audio_prep import (
+    Resampler,
+    numpy,
+    prepare_wav,
+    resample,
+    select_speech,
+    speech_frames,
+    upload_rate_for,
+)
+from voispark_mcp.msg.conversation_msg import (
+    ConversationTurn,
+    GenerateConversationRequest,
+    SpeakerConfigItem,
+    SpeakerRawItem,
+)
+from voispark_mcp.msg.voice_clone_msg import (
+    CartesiaVoiceCloneConfig,
+    CloneVoiceRequest,
+    MiniMaxVoiceCloneConfig,
+)
+
+np = numpy()
+
+
+def _wav(channels: list, rate: int, width: int = 2) -> bytes:
+    """Encode float channels in [-1, 1] as PCM WAV of the given sample width."""
+    samples = np.stack(channels, axis=1).reshape(-1)
+    if width == 1:
+        raw = np.round(samples * 127 + 128).astype(np.uint8).tobytes()
+    else:
+        ints = np.round(samples * (2 ** (8 * width - 1) - 1)).astype("<i4")
+        raw = ints.view(np.uint8).reshape(-1, 4)[:, :width].tobytes()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as output:
+        output.setnchannels(len(channels))
+        output.setsampwidth(width)
+        output.setframerate(rate)
+        output.writeframes(raw)
+    return buffer.getvalue()
+
+
+def _tone(frequency: float, rate: int, seconds: float = 1.0, amplitude: float = 0.5):
+    return amplitude * np.sin(
+        2 * np.pi * frequency * np.arange(int(rate * seconds)) / rate
+    )
+
+
+def _read(data: bytes):
+    with wave.open(io.BytesIO(data), "rb") as source:
+        params = source.getparams()
+        frames = source.readframes(params.nframes)
+    return params, np.frombuffer(frames, "<i2") / 32768
+
+
+def _amplitude(samples, frequency: float, rate: int) -> float:
+    times = np.arange(len(samples)) / rate
+    return 2 * abs(np.mean(samples * np.exp(-2j * np.pi * frequency * times)))
+
+
+class TestNumpyImport(unittest.TestCase):
+    def test_numpy_is_imported_on_first_use(self):
+        code = (
+            "import sys; from voispark_mcp.core.audio_prep import numpy; "
+            "print('numpy' in sys.modules); numpy(); print('numpy' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(out.split(), ["False", str(np is not None)])
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestPrepareWav(unittest.TestCase):
+    def test_stereo_is_downmixed_and_downsampled(self):
+        # Speech-band tone on the left, a tone above the new Nyquist on the right
+        data = _wav([_tone(440, 48000), _tone(15000, 48000)], 48000)
+        params, samples = _read(prepare_wav(data, 24000))
+        self.assertEqual((params.nchannels, params.sampwidth), (1, 2))
+        self.assertEqual((params.framerate, params.nframes), (24000, 24000))
+        self.assertAlmostEqual(_amplitude(samples, 440, 24000), 0.25, places=2)
+        # Would fold back to 9 kHz without the anti-aliasing filter
+        self.assertLess(_amplitude(samples, 9000, 24000), 0.001)
+
+    def test_other_sample_widths(self):
+        for width in (1, 3, 4):
+            with self.subTest(width=width):
+                data = _wav([_tone(300, 44100)] * 2, 44100, width)
+                params, samples = _read(prepare_wav(data, 16000))
+                self.assertEqual((params.nchannels, params.framerate), (1, 16000))
+                self.assertEqual(params.nframes, 16000)
+                self.assertAlmostEqual(_amplitude(samples, 300, 16000), 0.5, places=2)
+
+    def test_mono_below_the_target_rate_is_kept(self):
+        self.assertIsNone(prepare_wav(_wav([_tone(440, 16000)], 16000), 24000))
+        params, _ = _read(prepare_wav(_wav([_tone(440, 16000)] * 2, 16000), 24000))
+        self.assertEqual((params.nchannels, params.framerate), (1, 16000))
+
+    def test_other_audio_is_kept(self):
+        self.assertIsNone(prepare_wav(b"ID3\x04" + bytes(100), 24000))
+        self.assertIsNone(prepare_wav(b"RIFF\0\0\0\0WAVEjunk", 24000))
+        self.assertIsNone(prepare_wav(_wav([_tone(440, 48000)], 48000), 0))
+
+    def test_rate_per_provider(self):
+        with (
+            mock.patch.object(audio_prep, "UPLOAD_SAMPLE_RATE", 24000),
+            mock.patch.dict(os.environ, {"VOISPARK_UPLOAD_SAMPLE_RATE_CARTESIA": "0"}),
+        ):
+            self.assertEqual(upload_rate_for("cartesia"), 0)
+            self.assertEqual(upload_rate_for("elevenlabs"), 24000)
+
+    def test_base64_is_not_decoded_when_preparation_is_off(self):
+        audio = base64.b64encode(_wav([_tone(440, 48000)], 48000)).decode()
+        with (
+            mock.patch.object(audio_prep, "UPLOAD_SAMPLE_RATE", 0),
+            mock.patch.object(audio_prep.base64, "b64decode") as b64decode,
+        ):
+            self.assertIs(
+                asyncio.run(audio_prep.prepare_base64(audio, "cartesia")), audio
+            )
+            self.assertIs(audio_prep._prepare_base64(audio, 0, None), audio)
+        b64decode.assert_not_called()
+
+    def test_blocks_are_resampled_as_a_whole(self):
+        samples = np.random.default_rng(0).standard_normal(50_000).astype(np.float32)
+        for rate, target_rate in ((48000, 24000), (44100, 16000), (24000, 22050)):
+            with self.subTest(rate=rate, target_rate=target_rate):
+                resampler = Resampler(rate, target_rate)
+                blocks = [
+                    resampler.process(samples[start : start + size])
+                    for start, size in ((0, 7), (7, 1000), (1007, 48993))
+                ]
+                streamed = np.concatenate([*blocks, resampler.flush()])
+                whole = resample(samples, rate, target_rate)
+                self.assertEqual(len(whole), int(len(samples) * target_rate / rate))
+                np.testing.assert_allclose(streamed, whole, atol=1e-5)
+
+    def test_files_are_prepared_in_blocks(self):
+        path = OUTPUT_DIR / "stereo-48k-long.wav"
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(_wav([_tone(440, 48000, 3)] * 2, 48000))
+        self.addCleanup(path.unlink)
+        with mock.patch.object(audio_prep, "_READ_FRAMES", 10_000):
+            prepared = audio_prep._prepare_file(path, 24000, None)
+        self.addCleanup(prepared.unlink)
+        self.assertEqual(prepared.read_bytes(), prepare_wav(path.read_bytes(), 24000))
+        params, samples = _read(prepared.read_bytes())
+        self.assertEqual((params.nchannels, params.nframes), (1, 72000))
+        self.assertAlmostEqual(_amplitude(samples, 440, 24000), 0.5, places=2)
+
+
+def _recording(parts: list, rate: int = 16000):
+    """Tones for (seconds, True) parts and faint noise for (seconds, False) parts."""
+    rng = np.random.default_rng(0)
+    return np.concatenate(
+        [
+            (
+                _tone(200, rate, seconds)
+                if speech
+                else 1e-4 * rng.standard_normal(int(rate * seconds))
+            )
+            for seconds, speech in parts
+        ]
+    ).astype(np.float32)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestSelectSpeech(unittest.TestCase):
+    def test_silence_is_trimmed_and_pauses_shortened(self):
+        samples = _recording(
+            [
+                (2, False),
+                (3, True),
+                (0.3, False),
+                (3, True),
+                (4, False),
+                (2, True),
+                (3, False),
+            ]
+        )
+        kept = select_speech(samples, 16000, 10, 30, max_pause=0.5)
+        # The speech with a tenth of a second around it, the short pause and
+        # half a second of the long one
+        self.assertAlmostEqual(len(kept) / 16000, 8 + 4 * 0.1 + 0.3 + 0.5, delta=0.05)
+
+    def test_window_with_most_speech_is_kept(self):
+        sparse = [(0.3, True), (0.5, False)] * 25
+        dense = [(2, True), (0.3, False)] * 20
+        samples = _recording(sparse + dense)
+        kept = select_speech(samples, 16000, 10, 30, max_pause=0.5)
+        self.assertLessEqual(len(kept) / 16000, 30)
+        self.assertGreaterEqual(len(kept) / 16000, 10)
+        self.assertGreater(speech_frames(kept, 16000).mean(), 0.95)
+
+    def test_recording_without_speech_is_kept(self):
+        samples = np.zeros(16000 * 5, np.float32)
+        self.assertIs(select_speech(samples, 16000, 10, 30, 0.5), samples)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestPreparedUploads(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.bodies = []
+        patcher = mock.patch.object(audio_prep, "UPLOAD_SAMPLE_RATE", 24000)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        async def handler(request: web.Request) -> web.Response:
+            self.bodies.append(await request.json())
+            data = {"task_id": "t", "status": "success"}
+            if request.path == "/api/voice_clone/clone":
+                data = {"id": "v", "name": "n", "description": "", "provider": "p"}
+            return web.json_response({"code": 0, "message": "OK", "data": data})
+
+        app = web.Application(client_max_size=16 * 1024**2)
+        app.router.add_post("/api/voice_clone/clone", handler)
+        app.router.add_post("/api/conversation/generate", handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        self.audio = _wav([_tone(440, 48000)] * 2, 48000)
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_file_upload_is_prepared_and_removed(self):
+        path = OUTPUT_DIR / "stereo-48k.wav"
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(self.audio)
+        self.addCleanup(path.unlink)
+        before = set(OUTPUT_DIR.iterdir())
+        request = CloneVoiceRequest(
+            provider="p", model_id="m", audio_data="", configs=MiniMaxVoiceCloneConfig()
+        )
+        resp = await clone_voice(request, audio_path=str(path), session=self.session)
+        self.assertIsInstance(resp, dict)
+        params, _ = _read(base64.b64decode(self.bodies[0]["audio_data"]))
+        self.assertEqual((params.nchannels, params.framerate), (1, 24000))
+        self.assertEqual(set(OUTPUT_DIR.iterdir()), before)
+
+    async def test_raw_speakers_are_prepared(self):
+        speaker = SpeakerRawItem(
+            speaker_name="s",
+            audio=base64.b64encode(self.audio).decode(),
+            audio_text="Hello",
+        )
+        request = GenerateConversationRequest(
+            provider="p",
+            conversation=[ConversationTurn(text="Hi", speaker_index=0)],
+            speaker=[SpeakerConfigItem(type="raw", speaker=speaker)],
+        )
+        await generate_conversation(request, session=self.session)
+        audio = base64.b64decode(self.bodies[0]["speaker"][0]["speaker"]["audio"])
+        self.assertLess(len(audio), len(self.audio) / 3)
+        params, _ = _read(audio)
+        self.assertEqual((params.nchannels, params.framerate), (1, 24000))
+
+    async def test_clone_sample_is_trimmed_and_reported(self):
+        samples = _recording([(5, False), (20, True), (0.2, False), (20, True)])
+        audio = _wav([samples], 16000)
+        request = CloneVoiceRequest(
+            provider="p",
+            model_id="m",
+            audio_data=base64.b64encode(audio).decode(),
+            configs=MiniMaxVoiceCloneConfig(),
+        )
+        resp = await clone_voice(request, session=self.session)
+        sample = resp["sample"]
+        self.assertEqual(sample["original_seconds"], 45.2)
+        self.assertAlmostEqual(sample["seconds"], 30, delta=0.05)
+        self.assertAlmostEqual(sample["removed_seconds"], 15.2, delta=0.05)
+        self.assertEqual(sample["original_bytes"], len(audio))
+        uploaded = base64.b64decode(self.bodies[0]["audio_data"])
+        self.assertEqual(sample["removed_bytes"], len(audio) - len(uploaded))
+
+    async def test_clone_sample_with_transcript_is_kept(self):
+        audio = _wav(
+            [_recording([(2, False), (3, True), (2, False), (3, True)])], 16000
+        )
+        request = CloneVoiceRequest(
+            provider="p",
+            model_id="m",
+            audio_data=base64.b64encode(audio).decode(),
+            configs=CartesiaVoiceCloneConfig(
+                mode="similarity", transcript="Hello there. How are you?"
+            ),
+        )
+        resp = await clone_voice(request, session=self.session)
+        self.assertIsNone(resp["sample"])
+        self.assertEqual(base64.b64decode(self.bodies[0]["audio_data"]), audio)
@@ -0,0 +1,53 @@
+import asyncio
+import unittest
+
+from voispark_mcp.core.cache import TTLCache, cached, invalidate
+
+
+class TestTTLCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.calls = 0
+
+    async def load(self):
+        self.calls += 1
+        return {"version": self.calls}
+
+    async def test_hit_and_miss(self):
+        cache = TTLCache("test", ttl=60)
+        self.assertEqual(await cache.get("k", self.load), {"version": 1})
+        self.assertEqual(await cache.get("k", self.load), {"version": 1})
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((cache.stats.misses, cache.stats.hits), (1, 1))
+
+    async def test_stale_while_revalidate(self):
+        cache = TTLCache("test", ttl=0.01)
+        await cache.get("k", self.load)
+        await asyncio.sleep(0.02)
+        stale = await asyncio.gather(*(cache.get("k", self.load) for _ in range(5)))
+        self.assertEqual(stale, [{"version": 1}] * 5)
+        await asyncio.sleep(0)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(cache.stats.refreshes, 1)
+        self.assertEqual(await cache.get("k", self.load), {"version": 2})
+
+    async def test_uncacheable_values_are_not_stored(self):
+        cache = TTLCache("test", ttl=60)
+
+        async def failing():
+            self.calls += 1
+            return "Failed"
+
+        await cache.get("k", failing, cacheable=lambda value: isinstance(value, dict))
+        await cache.get("k", failing, cacheable=lambda value: isinstance(value, dict))
+        self.assertEqual(self.calls, 2)
+
+    async def test_cached_decorator_invalidation(self):
+        @cached("test_decorator", ttl=60)
+        async def getter(session=None):
+            return await self.load()
+
+        await getter(session=object())
+        await getter()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(invalidate("test_decorator"), ["test_decorator"])
+        self.assertEqual(await getter(), {"version": 2})
@@ -0,0 +1,148 @@
+import gzip
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tests.stand_in import make_app
+from voispark_mcp.api.tts import generate_tts
+from voispark_mcp.api.voice_changer import change_voice
+from voispark_mcp.api.voices import list_all_voices
+from voispark_mcp.core import api_request
+from voispark_mcp.core.api_request import create_session
+from voispark_mcp.core.compression import (
+    ENCODINGS,
+    accept_encoding,
+    compress,
+    decompress,
+    decompressor,
+)
+from voispark_mcp.msg.tts_msg import GenerateTTSRequest
+from voispark_mcp.msg.voice_changer_msg import ChangeVoiceRequest
+
+BODY = json.dumps({"voices": [{"id": f"voice-{i}"} for i in range(2000)]}).encode()
+# Encodings that requests and responses may be compressed with
+COMPRESSING = [encoding for encoding in ENCODINGS if encoding != "deflate"]
+
+
+class TestCodecs(unittest.IsolatedAsyncioTestCase):
+    async def test_round_trip(self):
+        for encoding in COMPRESSING:
+            with self.subTest(encoding=encoding):
+                compressed = await compress(BODY, encoding)
+                self.assertLess(len(compressed), len(BODY) / 5)
+                self.assertEqual(await decompress(compressed, encoding), BODY)
+
+    async def test_gzip_is_standard(self):
+        self.assertEqual(gzip.decompress(await compress(BODY, "gzip")), BODY)
+        self.assertEqual(await decompress(gzip.compress(BODY), "GZIP"), BODY)
+
+    async def test_encodings_are_undone_in_reverse(self):
+        twice = gzip.compress(await compress(BODY, COMPRESSING[0]))
+        self.assertEqual(await decompress(twice, f"{COMPRESSING[0]}, gzip"), BODY)
+        self.assertEqual(await decompress(BODY, "identity"), BODY)
+        self.assertEqual(await decompress(BODY, None), BODY)
+
+    async def test_errors(self):
+        with self.assertRaises(ValueError):
+            await decompress(b"not gzip", "gzip")
+        with self.assertRaises(ValueError):
+            decompressor("lzma")
+        with self.assertRaises(ValueError):
+            await compress(BODY, "deflate")
+
+    def test_accept_encoding_lists_gzip(self):
+        self.assertIn("gzip", accept_encoding().split(", "))
+
+
+class TestCompressedResponses(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = TestServer(make_app(payload_size=500))
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def wire_size(self, accept: str) -> tuple[str, int]:
+        headers = {"Accept-Encoding": accept}
+        async with self.session.get("/api/voices/p/list", headers=headers) as resp:
+            return resp.headers.get("Content-Encoding"), len(await resp.read())
+
+    async def test_every_encoding_is_negotiated_and_decoded(self):
+        _, plain = await self.wire_size("identity")
+        for encoding in COMPRESSING:
+            with self.subTest(encoding=encoding):
+                self.assertEqual(
+                    await self.wire_size(f"{encoding}, identity;q=0.1"),
+                    (encoding, mock.ANY),
+                )
+                _, size = await self.wire_size(encoding)
+                self.assertLess(size, plain / 5)
+                self.session.headers["Accept-Encoding"] = encoding
+                resp = await list_all_voices("p", "tts", session=self.session)
+                self.assertEqual(len(resp["default_voices"]), 500)
+
+    async def test_weights_are_honoured(self):
+        self.assertEqual(
+            await self.wire_size("gzip;q=0.2, identity"), ("gzip", mock.ANY)
+        )
+        self.assertEqual(await self.wire_size("gzip;q=0"), (None, mock.ANY))
+
+
+class TestCompressedRequests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = []
+
+        async def handler(request: web.Request) -> web.Response:
+            body = await request.read()
+            self.requests.append((request.headers.get("Content-Encoding"), body))
+            data = {"task_id": "t", "status": "pending"}
+            return web.json_response({"code": 0, "message": "OK", "data": data})
+
+        app = web.Application(handler_args={"auto_decompress": False})
+        app.router.add_post("/api/tts/generate", handler)
+        app.router.add_post("/api/voice_changer/change", handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        for name, value in (
+            ("REQUEST_COMPRESSION", "gzip"),
+            ("REQUEST_COMPRESSION_MIN_SIZE", 1000),
+        ):
+            patcher = mock.patch.object(api_request, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_large_bodies_are_compressed(self):
+        for text in ("Short text.", "A much longer text. " * 100):
+            request = GenerateTTSRequest(
+                text=text, provider="p", model_id="m", voice_id="v"
+            )
+            await generate_tts(request, session=self.session)
+        (small_encoding, small), (large_encoding, large) = self.requests
+        self.assertIsNone(small_encoding)
+        self.assertEqual(json.loads(small)["text"], "Short text.")
+        self.assertEqual(large_encoding, "gzip")
+        self.assertEqual(json.loads(gzip.decompress(large))["text"], text)
+
+    async def test_streamed_audio_is_compressed(self):
+        with tempfile.NamedTemporaryFile(suffix=".mp3") as audio:
+            audio.write(b"ID3" + bytes(100_000))
+            audio.flush()
+            request = ChangeVoiceRequest(
+                audio_data="", provider="p", model_id="m", voice_id="v"
+            )
+            await change_voice(request, audio_path=audio.name, session=self.session)
+        encoding, body = self.requests[0]
+        self.assertEqual(encoding, "gzip")
+        self.assertLess(len(body), 10_000)
+        self.assertEqual(json.loads(gzip.decompress(body))["voice_id"], "v")
@@ -1,6 +1,29 @@
+import base64
+import io
+import os
 import unittest
-from voispark_mcp.api.conversation import get_conversation_models
-from voispark_mcp.msg.conversation_msg import ConversationModelsResponse
+from unittest import mock
+import wave
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from voispark_mcp.api import conversation
+from voispark_mcp.api.conversation import (
+    generate_conversation_long,
+    get_conversation_models,
+    split_turns,
+)
+from voispark_mcp.core.api_request import create_download_session, create_session
+from voispark_mcp.msg.conversation_msg import (
+    ConversationModelsResponse,
+    ConversationTurn,
+    GenerateConversationRequest,
+    GenerateLongConversationResponse,
+    SpeakerConfigItem,
+    SpeakerIDItem,
+    SpeakerRawItem,
+)
 
 
 class TestConversation(unittest.IsolatedAsyncioTestCase):
@@ -9,3 +32,160 @@ class TestConversation(unittest.IsolatedAsyncioTestCase):
         self.assertIsInstance(resp, dict)
         resp = ConversationModelsResponse.model_validate(resp)
         self.assertIsInstance(resp, ConversationModelsResponse)
+
+
+def _wav(frames: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as output:
+        output.setnchannels(1)
+        output.setsampwidth(2)
+        output.setframerate(16000)
+        output.writeframes(frames)
+    return buffer.getvalue()
+
+
+def _turns(count: int) -> list[ConversationTurn]:
+    return [
+        ConversationTurn(text=f"Turn number {index}.", speaker_index=index % 2)
+        for index in range(count)
+    ]
+
+
+class TestSplitTurns(unittest.TestCase):
+    def test_segments_respect_both_limits(self):
+        turns = _turns(7)
+        self.assertEqual(
+            [len(segment) for segment in split_turns(turns, 3, 1000)], [3, 3, 1]
+        )
+        # Each turn has 15 characters, so two fit in 30
+        self.assertEqual(
+            [len(segment) for segment in split_turns(turns, 3, 30)], [2, 2, 2, 1]
+        )
+
+    def test_long_turn_gets_its_own_segment(self):
+        turns = [ConversationTurn(text="x" * 50, speaker_index=0), *_turns(2)]
+        self.assertEqual(
+            [len(segment) for segment in split_turns(turns, 8, 40)], [1, 2]
+        )
+
+
+class TestGenerateConversationLong(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.audio = {}
+        self.requests = []
+
+        async def generate(request: web.Request) -> web.Response:
+            body = await request.json()
+            self.requests.append(body)
+            text = " ".join(turn["text"] for turn in body["conversation"])
+            task_id = str(len(self.requests))
+            if text.startswith("Turn number 2.") and not any(
+                task.startswith("Turn number 2.") for task in self.audio.values()
+            ):
+                # The second segment fails on its first attempt
+                self.audio[task_id] = text
+                data = {"task_id": task_id, "status": "failed", "error": "Busy"}
+                return web.json_response({"code": 0, "message": "OK", "data": data})
+            self.audio[task_id] = text
+            data = {
+                "task_id": task_id,
+                "status": "success",
+                "details": {
+                    "url": str(self.server.make_url(f"/audio/{task_id}")),
+                    "format": {
+                        "container": "wav",
+                        "encoding": "pcm_s16le",
+                        "sample_rate": 16000,
+                        "channel": 1,
+                    },
+                },
+            }
+            return web.json_response({"code": 0, "message": "OK", "data": data})
+
+        async def audio(request: web.Request) -> web.Response:
+            text = self.audio[request.match_info["task_id"]]
+            return web.Response(body=_wav(text.encode().ljust(64, b"\0")))
+
+        app = web.Application()
+        app.router.add_post("/api/conversation/generate", generate)
+        app.router.add_get("/audio/{task_id}", audio)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        self.download_session = create_download_session()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.download_session.close()
+        await self.server.close()
+
+    async def test_segments_are_stitched_in_turn_order(self):
+        speakers = [
+            SpeakerConfigItem(type="speaker_id", speaker=SpeakerIDItem(speaker_id=id))
+            for id in ("a", "b")
+        ]
+        request = GenerateConversationRequest(
+            provider="p", conversation=_turns(5), speaker=speakers, sync=False
+        )
+        ready = []
+
+        async def on_segment(index, total, task):
+            ready.append((index, total))
+
+        resp = await generate_conversation_long(
+            request,
+            max_turns=2,
+            concurrency=3,
+            on_segment=on_segment,
+            session=self.session,
+            download_session=self.download_session,
+        )
+        resp = GenerateLongConversationResponse.model_validate(resp)
+        self.addCleanup(os.unlink, resp.path)
+
+        self.assertEqual(
+            [(s.first_turn, s.turns, s.attempts) for s in resp.segments],
+            [(0, 2, 1), (2, 2, 2), (4, 1, 1)],
+        )
+        self.assertEqual(sorted(ready), [(0, 3), (1, 3), (2, 3)])
+        # Only the failed segment was sent again, always with every speaker
+        self.assertEqual(len(self.requests), 4)
+        for body in self.requests:
+            self.assertEqual(len(body["speaker"]), 2)
+            self.assertTrue(body["sync"])
+        with wave.open(resp.path, "rb") as stitched:
+            frames = stitched.readframes(stitched.getnframes())
+        expected = b"".join(
+            text.encode().ljust(64, b"\0")
+            for text in (
+                "Turn number 0. Turn number 1.",
+                "Turn number 2. Turn number 3.",
+                "Turn number 4.",
+            )
+        )
+        self.assertEqual(frames, expected)
+
+    async def test_raw_speakers_are_prepared_once(self):
+        speaker = SpeakerRawItem(
+            speaker_name="s",
+            audio=base64.b64encode(_wav(bytes(64))).decode(),
+            audio_text="Hello",
+        )
+        request = GenerateConversationRequest(
+            provider="p",
+            conversation=_turns(5),
+            speaker=[SpeakerConfigItem(type="raw", speaker=speaker)],
+        )
+        with mock.patch.object(
+            conversation, "prepare_base64", side_effect=conversation.prepare_base64
+        ) as prepare:
+            resp = await generate_conversation_long(
+                request,
+                max_turns=2,
+                session=self.session,
+                download_session=self.download_session,
+            )
+        self.addCleanup(os.unlink, resp["path"])
+        # Three segments and one retry, with the audio prepared for all of them
+        self.assertEqual(len(self.requests), 4)
+        prepare.assert_awaited_once()
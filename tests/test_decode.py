@@ -0,0 +1,68 @@
+import json
+import unittest
+
+from pydantic import BaseModel, ValidationError, computed_field
+
+from tests.stand_in import make_catalog, make_history, make_voices
+from voispark_mcp.core.decode import decoder
+from voispark_mcp.msg.base_resp import BaseResponse
+from voispark_mcp.msg.history_msg import HistoryListResponse
+from voispark_mcp.msg.tts_msg import TTSProviderListResponse
+from voispark_mcp.msg.voices_msg import VoicesListResponse
+
+
+def _body(data: dict) -> bytes:
+    return json.dumps({"code": 0, "message": "Success", "data": data}).encode()
+
+
+class TestDecoder(unittest.TestCase):
+    def assertSameAsModelDump(self, model: type[BaseModel], body: bytes):
+        self.assertEqual(
+            decoder(model, as_dict=True)(body),
+            model.model_validate_json(body).model_dump(),
+        )
+
+    def test_dicts_match_model_dump(self):
+        voices = make_voices("p", 3)
+        # Defaulted fields are filled in and unknown fields dropped, as in models
+        del voices[0]["avatar_url"]
+        voices[1]["unknown"] = 1
+        self.assertSameAsModelDump(
+            BaseResponse[VoicesListResponse],
+            _body({"default_voices": voices, "user_voices": [], "ip_voices": []}),
+        )
+        self.assertSameAsModelDump(
+            BaseResponse[TTSProviderListResponse],
+            _body(make_catalog(20, languages=True)),
+        )
+        for source in ("tts", "conversation"):
+            entries = make_history(source, 3)
+            self.assertSameAsModelDump(
+                BaseResponse[HistoryListResponse],
+                _body({"history_list": entries, "total": 3}),
+            )
+
+    def test_invalid_bodies_raise(self):
+        decode = decoder(BaseResponse[VoicesListResponse], as_dict=True)
+        with self.assertRaises(ValidationError):
+            decode(_body({"default_voices": [{"id": 1}]}))
+        self.assertIsNone(decode(b'{"code": 40003, "message": "Unauthorized"}')["data"])
+
+    def test_unsupported_models_fall_back_to_model_dump(self):
+        class Counted(BaseModel):
+            items: list[int]
+
+            @computed_field
+            @property
+            def count(self) -> int:
+                return len(self.items)
+
+        self.assertEqual(
+            decoder(Counted, as_dict=True)(b'{"items": [1, 2]}'),
+            {"items": [1, 2], "count": 2},
+        )
+
+    def test_validators_are_cached(self):
+        model = BaseResponse[VoicesListResponse]
+        self.assertIs(decoder(model, as_dict=True), decoder(model, as_dict=True))
+        self.assertEqual(decoder(model), model.model_validate_json)
@@ -0,0 +1,123 @@
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tests.stand_in import make_app, make_history
+from voispark_mcp.api.history import HistoryPageError, get_history_list, iter_history
+from voispark_mcp.core.api_request import create_session
+
+
+class TestHistoryPages(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = TestServer(make_app(payload_size=120))
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_pages_follow_the_cursor(self):
+        first = await get_history_list("tts", session=self.session, limit=50)
+        self.assertEqual(len(first["history_list"]), 50)
+        self.assertEqual(first["total"], 120)
+        self.assertTrue(first["next_cursor"].endswith(":tts-49"))
+        last = await get_history_list(
+            "tts", session=self.session, cursor="100", limit=50
+        )
+        self.assertEqual(last["history_list"][0]["history_id"], "tts-100")
+        self.assertEqual((last["offset"], last["next_cursor"]), (100, None))
+        self.assertIsInstance(
+            await get_history_list("tts", session=self.session, cursor="x"), str
+        )
+
+    async def test_iterator_fetches_pages_lazily(self):
+        entries = iter_history("conversation", session=self.session, page_size=40)
+        first = await anext(entries)
+        self.assertEqual(first["history_id"], "conversation-0")
+        remaining = [entry async for entry in entries]
+        self.assertEqual(len(remaining), 119)
+        self.assertEqual(remaining[-1]["history_id"], "conversation-119")
+
+    async def test_iterator_raises_on_failure(self):
+        with self.assertRaises(HistoryPageError):
+            async for _ in iter_history("unknown", session=self.session):
+                pass
+
+
+class TestChangingHistory(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.entries = make_history("tts", 30)
+
+        async def history_list(request: web.Request) -> web.Response:
+            offset = int(request.query["offset"])
+            limit = int(request.query["limit"])
+            data = {
+                "history_list": self.entries[offset : offset + limit],
+                "total": len(self.entries),
+            }
+            return web.json_response({"code": 0, "message": "Success", "data": data})
+
+        app = web.Application()
+        app.router.add_get("/api/history/list", history_list)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def page(self, cursor):
+        return await get_history_list(
+            "tts", session=self.session, cursor=cursor, limit=10
+        )
+
+    async def test_added_entries_are_not_repeated(self):
+        first = await self.page(None)
+        newest = self.entries[0]["created_at"]
+        self.entries[:0] = [
+            {**self.entries[0], "history_id": f"new-{index}", "created_at": newest + 1}
+            for index in range(25)
+        ]
+        second = await self.page(first["next_cursor"])
+        self.assertEqual(second["history_list"][0]["history_id"], "tts-10")
+        self.assertEqual(second["offset"], 35)
+
+    async def test_deleted_entries_do_not_skip_entries(self):
+        first = await self.page(None)
+        del self.entries[:8]
+        second = await self.page(first["next_cursor"])
+        ids = [entry["history_id"] for entry in second["history_list"]]
+        self.assertEqual(ids, [f"tts-{index}" for index in range(10, 20)])
+        self.assertEqual(second["offset"], 2)
+
+
+class TestServerWithoutPagination(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        async def history_list(request: web.Request) -> web.Response:
+            entries = make_history("tts", 30)
+            data = {"history_list": entries, "total": len(entries)}
+            return web.json_response({"code": 0, "message": "Success", "data": data})
+
+        app = web.Application()
+        app.router.add_get("/api/history/list", history_list)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_pages_are_cut_from_the_whole_list(self):
+        page = await get_history_list("tts", session=self.session, cursor="20")
+        self.assertEqual(len(page["history_list"]), 10)
+        self.assertEqual(page["history_list"][0]["history_id"], "tts-20")
+        self.assertIsNone(page["next_cursor"])
+        ids = [
+            entry["history_id"]
+            async for entry in iter_history("tts", session=self.session, page_size=7)
+        ]
+        self.assertEqual(ids, [f"tts-{index}" for index in range(30)])
@@ -0,0 +1,122 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from aiohttp.test_utils import TestServer
+
+from tests.stand_in import make_app, make_history
+from voispark_mcp.api.history import search_history
+from voispark_mcp.core.api_request import create_session
+from voispark_mcp.core.history_index import HistoryIndex, timestamp
+
+
+class TestHistoryIndex(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.index = HistoryIndex("key", Path(self.directory.name), sync_interval=0)
+        self.entries = make_history("tts", 30)
+        self.read = 0
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+
+    async def fetch(self):
+        for entry in self.entries:
+            self.read += 1
+            yield entry
+
+    async def test_sync_stops_at_the_watermark(self):
+        self.assertEqual(await self.index.sync("tts", self.fetch), 30)
+        newest = self.entries[0]
+        self.entries.insert(
+            0,
+            {
+                **newest,
+                "history_id": "tts-new",
+                "created_at": newest["created_at"] + 60,
+                "ref_text": "A brand new line.",
+            },
+        )
+        self.read = 0
+        # The new entry, and the one at the watermark in case of same-second entries
+        self.assertEqual(await self.index.sync("tts", self.fetch), 2)
+        self.assertEqual(self.read, 3)
+        self.assertEqual(self.index.stats()["sources"]["tts"]["entries"], 31)
+        self.assertEqual(self.index.search("brand")[0]["history_id"], "tts-new")
+
+    async def test_recent_sync_is_skipped(self):
+        self.index.sync_interval = 60
+        await self.index.sync("tts", self.fetch)
+        self.read = 0
+        self.assertIsNone(await self.index.sync("tts", self.fetch))
+        self.assertEqual(self.read, 0)
+        self.assertEqual(await self.index.sync("tts", self.fetch, force=True), 1)
+
+    async def test_filters(self):
+        await self.index.sync("tts", self.fetch)
+        tts = self.entries
+        self.entries = make_history("conversation", 5)
+        for entry, tts_entry in zip(self.entries, tts):
+            entry["created_at"] = tts_entry["created_at"]
+        await self.index.sync("conversation", self.fetch)
+        newest = tts[0]["created_at"]
+
+        self.assertEqual(len(self.index.search(limit=100)), 35)
+        self.assertEqual(len(self.index.search(source="conversation", limit=100)), 5)
+        self.assertEqual(len(self.index.search(provider="sesame", limit=100)), 5)
+        self.assertEqual(len(self.index.search(voice_id="nope")), 0)
+        self.assertEqual(len(self.index.search(model_id="model-0", limit=100)), 30)
+        # Entries are a minute apart, newest first
+        found = self.index.search(since=newest - 150, until=newest)
+        self.assertCountEqual(
+            [entry["history_id"] for entry in found],
+            ["tts-1", "conversation-1", "tts-2", "conversation-2"],
+        )
+        self.assertEqual(found[-1]["created_at"], newest - 120)
+        self.assertEqual(
+            self.index.search('line 3 of "4"', source="conversation")[0]["source"],
+            "conversation",
+        )
+        self.index.clear()
+        self.assertEqual(self.index.search(), [])
+        self.assertTrue(self.index.needs_sync("tts"))
+
+    def test_timestamp(self):
+        self.assertEqual(timestamp("1970-01-02"), 86400)
+        self.assertEqual(timestamp("1970-01-01T01:00:00+01:00"), 0)
+        with self.assertRaises(ValueError):
+            timestamp("yesterday")
+
+
+class TestSearchHistory(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.index = HistoryIndex("key", Path(self.directory.name))
+        self.server = TestServer(make_app(payload_size=120))
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+        self.index.close()
+        self.directory.cleanup()
+
+    async def test_search_syncs_then_answers_locally(self):
+        resp = await search_history(self.index, "Line 2 of 7", session=self.session)
+        self.assertEqual(resp["stale_sources"], [])
+        self.assertEqual(resp["results"][0]["history_id"], "conversation-7")
+        self.assertEqual(self.index.stats()["entries"], 360)
+
+        await self.server.close()
+        resp = await search_history(self.index, source="tts", session=self.session)
+        self.assertEqual((resp["count"], resp["stale_sources"]), (20, []))
+        resp = await search_history(
+            self.index, source="tts", refresh=True, session=self.session
+        )
+        self.assertEqual((resp["count"], resp["stale_sources"]), (20, ["tts"]))
+
+    async def test_invalid_time_range(self):
+        resp = await search_history(self.index, since="soon", session=self.session)
+        self.assertIsInstance(resp, str)
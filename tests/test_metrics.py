@@ -0,0 +1,81 @@
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from voispark_mcp.api.voices import list_all_voices
+from voispark_mcp.core import metrics
+from voispark_mcp.core.api_request import create_session
+from voispark_mcp.core.metrics import Histogram, prometheus_text, snapshot, timed
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles(self):
+        histogram = Histogram((1.0, 2.0, 4.0))
+        for value in (0.5, 1.5, 1.5, 3.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [1, 2, 1, 0])
+        self.assertEqual(histogram.quantile(0.5), 1.5)
+        self.assertEqual(histogram.quantile(0.99), 3.0)
+        self.assertEqual(histogram.quantile(0.0), 0.5)
+
+
+class TestTimed(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.addCleanup(metrics.reset)
+
+    async def test_latency_errors_and_in_flight(self):
+        @timed("tool")
+        async def generate(provider: str, fail: bool = False):
+            self.assertEqual(snapshot()["in_flight"]["tool:generate"], 1)
+            if fail:
+                raise ValueError("boom")
+            return "Failed" if provider == "q" else {}
+
+        await generate("p")
+        await generate(provider="q")
+        with self.assertRaises(ValueError):
+            await generate("p", fail=True)
+
+        stats = snapshot()
+        self.assertEqual(stats["latency"]["tool"]["generate"]["p"]["count"], 2)
+        self.assertEqual(stats["latency"]["tool"]["generate"]["q"]["count"], 1)
+        self.assertEqual(stats["in_flight"]["tool:generate"], 0)
+        self.assertEqual(
+            stats["errors"]["generate"], {"ValueError": 1, "error_message": 1}
+        )
+        text = prometheus_text({"c": {"hits": 3, "misses": 1}})
+        self.assertIn(
+            'voispark_latency_seconds_count{kind="tool",name="generate",provider="p"} 2',
+            text,
+        )
+        self.assertIn('voispark_cache_hits_total{cache="c"} 3', text)
+
+
+class TestRequestMetrics(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        async def voices(request: web.Request) -> web.Response:
+            return web.json_response({"code": 40003, "message": "Unauthorized"})
+
+        app = web.Application()
+        app.router.add_get("/api/voices/{provider_id}/list", voices)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        self.addCleanup(metrics.reset)
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_error_codes_and_payload_sizes(self):
+        await list_all_voices("p", "all", session=self.session)
+        stats = snapshot()
+        self.assertEqual(
+            stats["errors"]["list_all_voices"],
+            {"UNAUTHORIZED": 1, "error_message": 1},
+        )
+        self.assertEqual(
+            stats["payload_bytes"]["list_all_voices"]["response"]["count"], 1
+        )
+        self.assertEqual(stats["latency"]["api"]["list_all_voices"]["p"]["count"], 1)
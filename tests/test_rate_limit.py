@@ -0,0 +1,123 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from voispark_mcp.api.tts import generate_tts
+from voispark_mcp.core import rate_limit
+from voispark_mcp.core.api_request import create_session
+from voispark_mcp.core.cache import invalidate
+from voispark_mcp.core.rate_limit import (
+    RateLimitExceeded,
+    TokenBucket,
+    admit,
+    credit_of,
+)
+from voispark_mcp.msg.tts_msg import GenerateTTSRequest
+
+CATALOG = {
+    "models": [
+        {
+            "provider": "p",
+            "name": "P",
+            "description": "",
+            "configs": [],
+            "model_list": [
+                {"model_name": "m", "credit": 3, "supported_languages": ["en"]}
+            ],
+        }
+    ]
+}
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_reservations_queue_behind_each_other(self):
+        bucket = TokenBucket("b", rate=10, burst=10)
+        self.assertEqual(bucket.wait_time(10), 0)
+        bucket.reserve(10)
+        self.assertAlmostEqual(bucket.wait_time(5), 0.5, places=2)
+        bucket.reserve(5)
+        self.assertAlmostEqual(bucket.wait_time(5), 1.0, places=2)
+
+    def test_credit_of(self):
+        self.assertEqual(credit_of(CATALOG, "p", "m"), 3)
+        self.assertEqual(credit_of(CATALOG, "p", "other"), 1)
+        self.assertEqual(credit_of("Failed to get TTS models", "p", "m"), 1)
+
+
+@mock.patch("voispark_mcp.core.rate_limit.RATE_LIMIT", 100.0)
+class TestAdmit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.addCleanup(rate_limit._buckets.clear)
+
+    async def test_requests_wait_for_credits(self):
+        start = time.monotonic()
+        waits = await asyncio.gather(*(admit("p", 50) for _ in range(4)))
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 1.0, places=1)
+        self.assertGreaterEqual(time.monotonic() - start, 0.9)
+
+    async def test_long_waits_are_rejected(self):
+        await admit("p", 100)
+        with self.assertRaises(RateLimitExceeded):
+            await admit("p", 100, max_wait=0.5)
+        self.assertEqual(rate_limit.rate_limits()["provider:p"]["rejected"], 1)
+
+    async def test_cancelled_requests_return_their_credits(self):
+        await admit("p", 100)
+        waiter = asyncio.create_task(admit("p", 100))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertLess(rate_limit._buckets["provider:p"].wait_time(100), 1.0)
+
+    @mock.patch("voispark_mcp.core.rate_limit.RATE_LIMIT_KEY", 10.0)
+    async def test_api_key_bucket_is_shared_by_providers(self):
+        await admit("p", 10, api_key="secret")
+        with self.assertRaises(RateLimitExceeded):
+            await admit("q", 10, api_key="secret", max_wait=0.5)
+        self.assertNotIn("secret", str(rate_limit.rate_limits()))
+
+
+@mock.patch("voispark_mcp.core.rate_limit.RATE_LIMIT", 1000.0)
+@mock.patch("voispark_mcp.core.rate_limit.RATE_LIMIT_MAX_WAIT", 0.1)
+class TestGenerateTTSCost(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        async def models(request: web.Request) -> web.Response:
+            return web.json_response({"code": 0, "message": "Success", "data": CATALOG})
+
+        async def generate(request: web.Request) -> web.Response:
+            return web.json_response(
+                {
+                    "code": 0,
+                    "message": "Success",
+                    "data": {"task_id": "1", "status": "success"},
+                }
+            )
+
+        app = web.Application()
+        app.router.add_get("/api/tts/models", models)
+        app.router.add_post("/api/tts/generate", generate)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        self.addCleanup(rate_limit._buckets.clear)
+        self.addCleanup(invalidate)
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_text_is_charged_by_model_credit(self):
+        request = GenerateTTSRequest(
+            text="x" * 300, provider="p", model_id="m", voice_id="v"
+        )
+        self.assertIsInstance(await generate_tts(request, session=self.session), dict)
+        self.assertAlmostEqual(rate_limit._buckets["provider:p"].tokens, 100, delta=1)
+        # 900 credits would need another 0.8s, more than the allowed wait
+        with self.assertRaises(RateLimitExceeded):
+            await generate_tts(request, session=self.session)
@@ -0,0 +1,140 @@
+import base64
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from voispark_mcp.api.tts import generate_tts
+from voispark_mcp.core.api_request import create_download_session, create_session
+from voispark_mcp.core.result_cache import ResultCache, tts_key, voice_changer_key
+from voispark_mcp.msg.tts_msg import GenerateTTSRequest
+from voispark_mcp.msg.voice_changer_msg import ChangeVoiceRequest
+
+
+def _response(task_id: str, url: str = "http://example.com/a.wav") -> dict:
+    return {
+        "task_id": task_id,
+        "status": "success",
+        "details": {
+            "url": url,
+            "format": {
+                "container": "wav",
+                "encoding": "pcm_s16le",
+                "sample_rate": 16000,
+                "channel": 1,
+            },
+        },
+    }
+
+
+class TestResultCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(Path(self.directory.name), store_audio=False)
+
+    async def asyncTearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    async def test_put_and_get(self):
+        self.assertIsNone(self.cache.get("k"))
+        await self.cache.put("k", "tts", _response("1"))
+        cached = self.cache.get("k")
+        self.assertEqual(cached["task_id"], "1")
+        self.assertTrue(cached["cached"])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    async def test_entries_expire(self):
+        self.cache.max_age = 0
+        await self.cache.put("k", "tts", _response("1"))
+        self.assertIsNone(self.cache.get("k"))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    async def test_least_recently_used_entries_are_evicted(self):
+        size = len(str(_response("1")))
+        self.cache.max_bytes = 2 * size + 10
+        await self.cache.put("a", "tts", _response("1"))
+        await self.cache.put("b", "tts", _response("2"))
+        self.cache.get("a")
+        await self.cache.put("c", "tts", _response("3"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    async def test_tts_key_normalizes_whitespace(self):
+        request = GenerateTTSRequest(
+            text="Hello  world\n", provider="p", model_id="m", voice_id="v"
+        )
+        other = request.model_copy(update={"text": "Hello world"})
+        self.assertEqual(tts_key(request), tts_key(other))
+        other = request.model_copy(update={"voice_id": "w"})
+        self.assertNotEqual(tts_key(request), tts_key(other))
+
+    async def test_voice_changer_key_hashes_audio_content(self):
+        audio = os.urandom(1000)
+        path = Path(self.directory.name) / "clip.wav"
+        path.write_bytes(audio)
+        inline = ChangeVoiceRequest(
+            provider="p",
+            model_id="m",
+            voice_id="v",
+            audio_data=base64.b64encode(audio).decode(),
+        )
+        from_file = inline.model_copy(update={"audio_data": ""})
+        self.assertEqual(
+            await voice_changer_key(inline), await voice_changer_key(from_file, path)
+        )
+        self.assertNotEqual(
+            await voice_changer_key(inline, upload_rate=16000),
+            await voice_changer_key(inline, upload_rate=24000),
+        )
+
+
+class TestGenerateTTSCached(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = 0
+
+        async def generate(request: web.Request) -> web.Response:
+            self.requests += 1
+            url = str(self.server.make_url("/audio/1.wav"))
+            return web.json_response(
+                {"code": 0, "message": "Success", "data": _response("1", url)}
+            )
+
+        async def audio(request: web.Request) -> web.Response:
+            return web.Response(body=b"RIFF audio")
+
+        app = web.Application()
+        app.router.add_post("/api/tts/generate", generate)
+        app.router.add_get("/audio/1.wav", audio)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        self.download_session = create_download_session()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(Path(self.directory.name), store_audio=True)
+
+    async def asyncTearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+        await self.session.close()
+        await self.download_session.close()
+        await self.server.close()
+
+    async def test_repeated_request_is_served_from_cache(self):
+        request = GenerateTTSRequest(
+            text="Hello", provider="p", model_id="m", voice_id="v"
+        )
+        for _ in range(3):
+            resp = await generate_tts(
+                request,
+                session=self.session,
+                result_cache=self.cache,
+                download_session=self.download_session,
+            )
+        self.assertEqual(self.requests, 1)
+        self.assertTrue(resp["cached"])
+        self.assertEqual(Path(resp["local_path"]).read_bytes(), b"RIFF audio")
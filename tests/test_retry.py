@@ -0,0 +1,111 @@
+import unittest
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from voispark_mcp.api.tts import generate_tts
+from voispark_mcp.api.voices import list_all_voices
+from voispark_mcp.core import circuit_breaker
+from voispark_mcp.core.api_request import create_session
+from voispark_mcp.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from voispark_mcp.core.error_code import ErrorCode
+from voispark_mcp.msg.tts_msg import GenerateTTSRequest
+
+
+class TestErrorCode(unittest.TestCase):
+    def test_is_retryable(self):
+        self.assertFalse(ErrorCode.is_retryable(ErrorCode.UNAUTHORIZED.code))
+        self.assertFalse(ErrorCode.is_retryable(40099))
+        self.assertTrue(ErrorCode.is_retryable(50000))
+
+
+@mock.patch("voispark_mcp.core.retry.RETRY_BASE_DELAY", 0.001)
+class TestRetry(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Responses served in order, then the last one over and over
+        self.statuses = []
+        self.calls = 0
+
+        async def respond(request: web.Request) -> web.Response:
+            self.calls += 1
+            status = self.statuses[min(self.calls, len(self.statuses)) - 1]
+            if status != 200:
+                return web.Response(status=status, text="Bad Gateway")
+            return web.json_response(
+                {
+                    "code": 0,
+                    "message": "Success",
+                    "data": {
+                        "default_voices": [],
+                        "user_voices": [],
+                        "ip_voices": [],
+                        "task_id": "1",
+                        "status": "success",
+                    },
+                }
+            )
+
+        app = web.Application()
+        app.router.add_get("/api/voices/{provider_id}/list", respond)
+        app.router.add_post("/api/tts/generate", respond)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        self.addCleanup(circuit_breaker._breakers.clear)
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_transient_get_failures_are_retried(self):
+        self.statuses = [503, 502, 200]
+        resp = await list_all_voices("p", "all", session=self.session)
+        self.assertIsInstance(resp, dict)
+        self.assertEqual(self.calls, 3)
+        self.assertEqual(circuit_breaker.breaker_states()["p"]["state"], "closed")
+
+    async def test_gives_up_after_the_last_attempt(self):
+        self.statuses = [503]
+        resp = await list_all_voices("p", "all", session=self.session)
+        self.assertEqual(resp, "Failed to list all voices")
+        self.assertEqual(self.calls, 3)
+
+    async def test_post_failure_responses_are_not_retried(self):
+        self.statuses = [503, 200]
+        request = GenerateTTSRequest(text="a", provider="p", model_id="m", voice_id="v")
+        resp = await generate_tts(request, session=self.session)
+        self.assertEqual(resp, "Failed to generate TTS audio")
+        self.assertEqual(self.calls, 1)
+
+    @mock.patch("voispark_mcp.core.api_request.RETRY_ATTEMPTS", 1)
+    async def test_open_circuit_fails_fast(self):
+        self.statuses = [503]
+        circuit_breaker._breakers["p"] = CircuitBreaker("p", failures=2)
+        for _ in range(2):
+            await list_all_voices("p", "all", session=self.session)
+        with self.assertRaises(CircuitOpenError):
+            await list_all_voices("p", "all", session=self.session)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(circuit_breaker.breaker_states()["p"]["state"], "open")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_half_open_trial(self):
+        breaker = CircuitBreaker("p", failures=1, reset_timeout=0)
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        breaker.before_call()
+        self.assertEqual(breaker.state, "half_open")
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_open_circuit_rejects_calls(self):
+        breaker = CircuitBreaker("p", failures=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        self.assertEqual(breaker.status()["rejected"], 1)
@@ -0,0 +1,103 @@
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+from typing import Literal, Union
+import unittest
+
+from mcp.server.fastmcp import Context
+from pydantic import BaseModel
+
+from voispark_mcp.core.schema_cache import CachedSchemaFastMCP, CachedSchemaTool
+
+
+class Fast(BaseModel):
+    speed: float = 1.0
+
+
+class Slow(BaseModel):
+    delay: int = 0
+
+
+def _server(path: Path) -> CachedSchemaFastMCP:
+    mcp = CachedSchemaFastMCP("test", schema_cache_path=path)
+
+    @mcp.tool()
+    async def configure(
+        name: str, configs: Union[Fast, Slow], mode: Literal["a", "b"] = "a"
+    ) -> dict:
+        """Configure something."""
+        return {"name": name, "configs": configs.model_dump(), "mode": mode}
+
+    @mcp.tool()
+    async def with_context(value: int, ctx: Context) -> int:
+        return value * 2
+
+    return mcp
+
+
+class TestSchemaCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "schemas.json"
+
+    async def test_cached_schemas_match_generated_ones(self):
+        generated = _server(self.path)
+        generated.save_schema_cache()
+        self.assertTrue(self.path.exists())
+        cached = _server(self.path)
+        self.assertIsInstance(
+            cached._tool_manager.get_tool("configure"), CachedSchemaTool
+        )
+        self.assertEqual(
+            [tool.model_dump() for tool in await cached.list_tools()],
+            [tool.model_dump() for tool in await generated.list_tools()],
+        )
+
+    async def test_cached_tools_validate_arguments(self):
+        _server(self.path).save_schema_cache()
+        mcp = _server(self.path)
+        result = await mcp.call_tool(
+            "configure", {"name": "n", "configs": {"delay": 3}, "mode": "b"}
+        )
+        self.assertIn('"delay": 3', result[0].text)
+        result = await mcp.call_tool("with_context", {"value": "4"})
+        self.assertEqual(result[0].text, "8")
+        with self.assertRaises(Exception):
+            await mcp.call_tool("configure", {"name": "n", "configs": {}, "mode": "c"})
+
+    def test_stale_cache_is_ignored(self):
+        self.path.write_text('{"key": "old", "tools": {"configure": {}}}')
+        mcp = _server(self.path)
+        self.assertNotIsInstance(
+            mcp._tool_manager.get_tool("configure"), CachedSchemaTool
+        )
+        self.assertNotEqual(mcp._tool_manager.get_tool("configure").parameters, {})
+
+    def test_unusable_cached_schema_falls_back(self):
+        _server(self.path).save_schema_cache()
+        mcp = CachedSchemaFastMCP("test", schema_cache_path=self.path)
+        mcp._cached_schemas["configure"] = "not a schema"
+
+        @mcp.tool()
+        async def configure(name: str) -> str:
+            return name
+
+        tool = mcp._tool_manager.get_tool("configure")
+        self.assertNotIsInstance(tool, CachedSchemaTool)
+        self.assertIn("name", tool.parameters["properties"])
+
+
+class TestDeferredImports(unittest.TestCase):
+    def test_server_import_defers_api_modules(self):
+        # In a new interpreter, since the test run has imported them already
+        code = (
+            "import sys, voispark_mcp.main; "
+            "print([m for m in sys.modules if m.startswith('voispark_mcp.api.')], "
+            "'numpy' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(out.split(), ["[]", "False"])
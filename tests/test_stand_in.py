@@ -0,0 +1,117 @@
+import asyncio
+import base64
+import unittest
+
+from aiohttp.test_utils import TestServer
+
+from tests.stand_in import make_app
+from voispark_mcp.api.conversation import (
+    generate_conversation,
+    get_conversation_models,
+    get_speaker_details,
+    get_speakers,
+)
+from voispark_mcp.api.history import get_history, get_history_list
+from voispark_mcp.api.task import get_task
+from voispark_mcp.api.tts import generate_tts, get_tts_models
+from voispark_mcp.api.voice_changer import change_voice, get_voice_changer_models
+from voispark_mcp.api.voice_clone import clone_voice, get_voice_clone_models
+from voispark_mcp.api.voices import get_providers, list_all_voices
+from voispark_mcp.core.api_request import create_session
+from voispark_mcp.core.cache import invalidate
+from voispark_mcp.msg.conversation_msg import (
+    ConversationTurn,
+    GenerateConversationRequest,
+    SpeakerConfigItem,
+    SpeakerIDItem,
+)
+from voispark_mcp.msg.tts_msg import GenerateTTSRequest
+from voispark_mcp.msg.voice_changer_msg import ChangeVoiceRequest
+from voispark_mcp.msg.voice_clone_msg import CartesiaVoiceCloneConfig, CloneVoiceRequest
+
+AUDIO = base64.b64encode(b"RIFF" + bytes(1000)).decode()
+
+
+class TestStandIn(unittest.IsolatedAsyncioTestCase):
+    """The stand-in must satisfy the response models of every api function."""
+
+    async def asyncSetUp(self):
+        self.server = TestServer(make_app(char_latency=0.005, payload_size=30))
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        self.addCleanup(invalidate)
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_catalogs(self):
+        for get_models in (
+            get_tts_models,
+            get_voice_changer_models,
+            get_voice_clone_models,
+            get_conversation_models,
+        ):
+            self.assertIsInstance(await get_models(session=self.session), dict)
+        self.assertIsInstance(await get_providers(session=self.session), dict)
+        voices = await list_all_voices("cartesia", "all", session=self.session)
+        self.assertEqual(len(voices["default_voices"]), 30)
+
+    async def test_speakers_and_history(self):
+        speakers = await get_speakers(session=self.session)
+        speaker_id = speakers["speakers"][0]["speaker_id"]
+        self.assertIsInstance(
+            await get_speaker_details(speaker_id, session=self.session), dict
+        )
+        for source in ("tts", "voice_changer", "conversation"):
+            history = await get_history_list(source, session=self.session)
+            self.assertEqual(history["total"], 30)
+            history_id = history["history_list"][0]["history_id"]
+            self.assertIsInstance(
+                await get_history(history_id, session=self.session), dict
+            )
+
+    async def test_generation(self):
+        tts = GenerateTTSRequest(
+            text="Hello", provider="cartesia", model_id="model-0", voice_id="v"
+        )
+        self.assertEqual(
+            (await generate_tts(tts, session=self.session))["status"], "success"
+        )
+        changed = ChangeVoiceRequest(
+            audio_data=AUDIO, provider="elevenlabs", model_id="model-0", voice_id="v"
+        )
+        self.assertEqual(
+            (await change_voice(changed, session=self.session))["status"], "success"
+        )
+        clone = CloneVoiceRequest(
+            audio_data=AUDIO,
+            provider="cartesia",
+            model_id="model-0",
+            configs=CartesiaVoiceCloneConfig(name="Clone"),
+        )
+        self.assertIsInstance(await clone_voice(clone, session=self.session), dict)
+        conversation = GenerateConversationRequest(
+            provider="sesame",
+            conversation=[ConversationTurn(text="Hi there", speaker_index=0)],
+            speaker=[
+                SpeakerConfigItem(
+                    type="speaker_id", speaker=SpeakerIDItem(speaker_id="speaker-0")
+                )
+            ],
+        )
+        resp = await generate_conversation(conversation, session=self.session)
+        self.assertEqual(resp["status"], "success")
+
+    async def test_async_tasks_finish_after_their_generation_time(self):
+        request = GenerateTTSRequest(
+            text="x" * 10, provider="cartesia", model_id="m", voice_id="v", sync=False
+        )
+        task_id = (await generate_tts(request, session=self.session))["task_id"]
+        self.assertEqual(
+            (await get_task(task_id, session=self.session))["status"], "processing"
+        )
+        await asyncio.sleep(0.1)
+        task = await get_task(task_id, session=self.session)
+        self.assertEqual(task["status"], "success")
+        self.assertTrue(task["details"]["url"].endswith(".wav"))
@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from voispark_mcp.core.task_poller import TaskPoller
+from voispark_mcp.msg.task_msg import TaskResponse
+
+
+@mock.patch("voispark_mcp.core.task_poller.TASK_POLL_INITIAL", 0.01)
+@mock.patch("voispark_mcp.core.task_poller.TASK_POLL_MAX", 0.02)
+class TestTaskPoller(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Number of polls after which each task succeeds
+        self.finish_after = {}
+        self.polls = {}
+
+        async def fetch(task_id: str):
+            self.polls[task_id] = self.polls.get(task_id, 0) + 1
+            if self.polls[task_id] < self.finish_after[task_id]:
+                return {"task_id": task_id, "status": "processing"}
+            return {"task_id": task_id, "status": "success"}
+
+        self.poller = TaskPoller(fetch)
+        self.poller.start()
+
+    async def asyncTearDown(self):
+        await self.poller.close()
+
+    def submit(self, task_id: str, finish_after: int):
+        self.finish_after[task_id] = finish_after
+        return self.poller.track(TaskResponse(task_id=task_id, status="pending"), "tts")
+
+    async def test_polls_until_done(self):
+        self.submit("a", 3)
+        self.submit("b", 1)
+        state = await self.poller.wait("a", timeout=5)
+        self.assertEqual(state.task.status, "success")
+        self.assertTrue(state.done)
+        self.assertEqual(state.polls, 3)
+        self.assertEqual(self.poller.get("b").polls, 1)
+        self.assertEqual(self.poller.pending, 0)
+
+    async def test_wait_timeout_returns_pending_state(self):
+        self.submit("slow", 1000)
+        state = await self.poller.wait("slow", timeout=0.05)
+        self.assertFalse(state.done)
+        self.assertEqual(state.task.status, "processing")
+
+    async def test_untracked_task(self):
+        self.assertIsNone(self.poller.get("unknown"))
+        self.assertIsNone(await self.poller.wait("unknown", timeout=0.01))
+
+    async def test_malformed_task_fails_only_its_job(self):
+        self.finish_after["bad"] = 1
+        self.poller.track(TaskResponse(task_id="bad", status="pending"))
+        fetch = self.poller._fetch
+
+        async def malformed(task_id: str):
+            if task_id == "bad":
+                return {"task_id": "bad", "status": "unknown"}
+            return await fetch(task_id)
+
+        self.poller._fetch = malformed
+        self.submit("good", 3)
+        state = await self.poller.wait("bad", timeout=5)
+        self.assertEqual(state.task.status, "failed")
+        self.assertEqual(state.task.error, "Malformed task response")
+        state = await self.poller.wait("good", timeout=5)
+        self.assertEqual(state.task.status, "success")
+
+    async def test_slow_poll_does_not_hold_back_others(self):
+        fetch = self.poller._fetch
+        stuck = asyncio.Event()
+
+        async def slow(task_id: str):
+            if task_id == "slow":
+                await stuck.wait()
+            return await fetch(task_id)
+
+        self.poller._fetch = slow
+        self.submit("slow", 1)
+        self.submit("quick", 5)
+        state = await self.poller.wait("quick", timeout=1)
+        self.assertEqual(state.task.status, "success")
+        self.assertFalse(self.poller.get("slow").done)
+        stuck.set()
+        state = await self.poller.wait("slow", timeout=5)
+        self.assertEqual(state.task.status, "success")
+
+
+class TestAsyncDelivery(unittest.IsolatedAsyncioTestCase):
+    async def test_deliver_is_rejected_with_async_mode(self):
+        from voispark_mcp.main import change_voice, generate_tts
+
+        resp = await generate_tts("p", "Hi", "m", "v", async_mode=True, deliver="path")
+        self.assertIn("wait_for_task", resp)
+        resp = await change_voice(
+            "p", "m", "v", audio_data="AAAA", async_mode=True, deliver="embedded"
+        )
+        self.assertIn("wait_for_task", resp)
@@ -0,0 +1,31 @@
+import unittest
+
+from voispark_mcp.core.text_split import split_text
+
+
+class TestSplitText(unittest.TestCase):
+    def test_packs_sentences_up_to_limit(self):
+        text = "One two. Three four! Five six? Seven."
+        self.assertEqual(
+            split_text(text, 20), ["One two. Three four!", "Five six? Seven."]
+        )
+
+    def test_breaks_at_paragraphs(self):
+        self.assertEqual(
+            split_text("Short.\n\nAlso short.", 100), ["Short.", "Also short."]
+        )
+
+    def test_keeps_closing_quotes(self):
+        self.assertEqual(
+            split_text('He said "hi." Then left.', 15), ['He said "hi."', "Then left."]
+        )
+
+    def test_cjk_sentences(self):
+        self.assertEqual(
+            split_text("你好。我很好！谢谢。", 7), ["你好。我很好！", "谢谢。"]
+        )
+
+    def test_long_sentence_is_split_at_whitespace(self):
+        chunks = split_text("word " * 30, 24)
+        self.assertTrue(all(len(chunk) <= 24 for chunk in chunks))
+        self.assertEqual(" ".join(chunks).split(), ["word"] * 30)
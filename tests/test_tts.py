@@ -1,7 +1,21 @@
+import asyncio
+import io
+import os
 import unittest
+import wave
 
-from voispark_mcp.api.tts import get_tts_models
-from voispark_mcp.msg.tts_msg import TTSProviderListResponse
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from voispark_mcp.api.tts import generate_tts_batch, generate_tts_long, get_tts_models
+from voispark_mcp.core.api_request import create_download_session, create_session
+from voispark_mcp.msg.tts_msg import (
+    GenerateLongTTSResponse,
+    GenerateTTSBatchResponse,
+    GenerateTTSRequest,
+    TTSBatchItem,
+    TTSProviderListResponse,
+)
 
 
 class TestTTS(unittest.IsolatedAsyncioTestCase):
@@ -10,3 +24,153 @@ class TestTTS(unittest.IsolatedAsyncioTestCase):
         self.assertIsInstance(resp, dict)
         resp = TTSProviderListResponse.model_validate(resp)
         self.assertIsInstance(resp, TTSProviderListResponse)
+
+
+class TestGenerateTTSBatch(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.texts = []
+        self.active = 0
+        self.max_active = 0
+
+        async def generate(request: web.Request) -> web.Response:
+            body = await request.json()
+            self.texts.append(body["text"])
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            if body["text"] == "fail":
+                return web.json_response({"code": 40000, "message": "Common Error"})
+            return web.json_response(
+                {
+                    "code": 0,
+                    "message": "Success",
+                    "data": {"task_id": body["text"], "status": "success"},
+                }
+            )
+
+        app = web.Application()
+        app.router.add_post("/api/tts/generate", generate)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_batch(self):
+        texts = ["a", "b", "a", "fail", "c", "d", "e"]
+        items = [
+            TTSBatchItem(text=text, provider="p", model_id="m", voice_id="v")
+            for text in texts
+        ]
+        resp = await generate_tts_batch(items, concurrency=2, session=self.session)
+        resp = GenerateTTSBatchResponse.model_validate(resp)
+
+        self.assertEqual(sorted(self.texts), sorted(set(texts)))
+        self.assertLessEqual(self.max_active, 2)
+        self.assertEqual([result.index for result in resp.results], list(range(7)))
+        self.assertEqual(resp.results[2].duplicate_of, 0)
+        self.assertEqual(resp.results[2].task.task_id, "a")
+        self.assertEqual(resp.results[3].status, "failed")
+        self.assertEqual(resp.results[6].task.task_id, "e")
+        self.assertEqual((resp.succeeded, resp.failed), (6, 1))
+
+
+def _wav(frames: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as output:
+        output.setnchannels(1)
+        output.setsampwidth(2)
+        output.setframerate(16000)
+        output.writeframes(frames)
+    return buffer.getvalue()
+
+
+class TestGenerateTTSLong(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.audio = {}
+
+        async def generate(request: web.Request) -> web.Response:
+            body = await request.json()
+            task_id = str(len(self.audio))
+            self.audio[task_id] = _wav(body["text"].encode().ljust(32, b"\0"))
+            # Later chunks finish first to check that stitching keeps text order
+            await asyncio.sleep(0.05 / len(self.audio))
+            return web.json_response(
+                {
+                    "code": 0,
+                    "message": "Success",
+                    "data": {
+                        "task_id": task_id,
+                        "status": "success",
+                        "details": {
+                            "url": str(self.server.make_url(f"/audio/{task_id}")),
+                            "format": {
+                                "container": "wav",
+                                "encoding": "pcm_s16le",
+                                "sample_rate": 16000,
+                                "channel": 1,
+                            },
+                        },
+                    },
+                }
+            )
+
+        async def audio(request: web.Request) -> web.Response:
+            return web.Response(body=self.audio[request.match_info["task_id"]])
+
+        app = web.Application()
+        app.router.add_post("/api/tts/generate", generate)
+        app.router.add_get("/audio/{task_id}", audio)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        self.download_session = create_download_session()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.download_session.close()
+        await self.server.close()
+
+    async def test_chunks_are_stitched_in_order(self):
+        sentences = [f"Sentence number {index}." for index in range(6)]
+        request = GenerateTTSRequest(
+            text=" ".join(sentences), provider="p", model_id="m", voice_id="v"
+        )
+        ready = []
+
+        async def on_chunk(index, total, task):
+            ready.append(index)
+
+        resp = await generate_tts_long(
+            request,
+            max_chars=20,
+            concurrency=3,
+            on_chunk=on_chunk,
+            session=self.session,
+            download_session=self.download_session,
+        )
+        resp = GenerateLongTTSResponse.model_validate(resp)
+        self.addCleanup(os.unlink, resp.path)
+
+        self.assertEqual(len(resp.chunks), 6)
+        self.assertEqual(sorted(ready), list(range(6)))
+        with wave.open(resp.path, "rb") as stitched:
+            self.assertEqual(stitched.getframerate(), 16000)
+            frames = stitched.readframes(stitched.getnframes())
+        expected = b"".join(
+            sentence.encode().ljust(32, b"\0") for sentence in sentences
+        )
+        self.assertEqual(frames, expected)
+
+    async def test_max_chars_must_be_positive(self):
+        request = GenerateTTSRequest(
+            text="Hello.", provider="p", model_id="m", voice_id="v"
+        )
+        for max_chars in (0, -5):
+            resp = await generate_tts_long(
+                request, max_chars=max_chars, session=self.session
+            )
+            self.assertEqual(resp, "max_chars must be a positive number of characters")
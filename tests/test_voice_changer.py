@@ -1,7 +1,22 @@
+import base64
+import json
+import os
+from pathlib import Path
+import tempfile
 import unittest
+from unittest import mock
 
-from voispark_mcp.api.voice_changer import get_voice_changer_models
-from voispark_mcp.msg.voice_changer_msg import VoiceChangerModelsResponse
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from voispark_mcp.api.voice_changer import change_voice, get_voice_changer_models
+from voispark_mcp.core import audio_file
+from voispark_mcp.core.api_request import create_session
+from voispark_mcp.msg.voice_changer_msg import (
+    ChangeVoiceRequest,
+    ChangeVoiceResponse,
+    VoiceChangerModelsResponse,
+)
 
 
 class TestVoiceChanger(unittest.IsolatedAsyncioTestCase):
@@ -10,3 +25,81 @@ class TestVoiceChanger(unittest.IsolatedAsyncioTestCase):
         self.assertIsInstance(resp, dict)
         resp = VoiceChangerModelsResponse.model_validate(resp)
         self.assertIsInstance(resp, VoiceChangerModelsResponse)
+
+
+class TestChangeVoiceFromFile(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.received = {}
+
+        async def change(request: web.Request) -> web.Response:
+            self.received["content_length"] = request.content_length
+            self.received["body"] = json.loads(await request.read())
+            return web.json_response(
+                {
+                    "code": 0,
+                    "message": "Success",
+                    "data": {"task_id": "task-1", "status": "success"},
+                }
+            )
+
+        app = web.Application(client_max_size=16 * 1024**2)
+        app.router.add_post("/api/voice_changer/change", change)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+
+        self.audio = os.urandom(1_000_003)
+        file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+        file.write(self.audio)
+        file.close()
+        self.audio_path = file.name
+
+    async def asyncTearDown(self):
+        os.unlink(self.audio_path)
+        await self.session.close()
+        await self.server.close()
+
+    async def test_streams_audio_file(self):
+        request = ChangeVoiceRequest(
+            audio_data="", provider="elevenlabs", model_id="m", voice_id="v"
+        )
+        resp = await change_voice(
+            request, audio_path=f"file://{self.audio_path}", session=self.session
+        )
+        ChangeVoiceResponse.model_validate(resp)
+
+        body = self.received["body"]
+        self.assertEqual(base64.b64decode(body.pop("audio_data")), self.audio)
+        self.assertEqual(body, request.model_dump(mode="json", exclude={"audio_data"}))
+        self.assertIsNotNone(self.received["content_length"])
+
+    async def test_missing_file(self):
+        request = ChangeVoiceRequest(
+            audio_data="", provider="elevenlabs", model_id="m", voice_id="v"
+        )
+        resp = await change_voice(
+            request, audio_path="/does/not/exist.wav", session=self.session
+        )
+        self.assertEqual(resp, "Audio file not found: /does/not/exist.wav")
+
+    async def test_file_outside_the_audio_root(self):
+        request = ChangeVoiceRequest(
+            audio_data="", provider="elevenlabs", model_id="m", voice_id="v"
+        )
+        with tempfile.TemporaryDirectory() as root:
+            with mock.patch.object(audio_file, "AUDIO_ROOT", Path(root).resolve()):
+                resp = await change_voice(
+                    request, audio_path=self.audio_path, session=self.session
+                )
+                self.assertEqual(
+                    resp,
+                    f"Audio file outside the allowed directory: {self.audio_path}",
+                )
+                self.assertNotIn("body", self.received)
+            with mock.patch.object(
+                audio_file, "AUDIO_ROOT", Path(self.audio_path).parent.resolve()
+            ):
+                resp = await change_voice(
+                    request, audio_path=self.audio_path, session=self.session
+                )
+                ChangeVoiceResponse.model_validate(resp)
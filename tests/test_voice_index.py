@@ -0,0 +1,146 @@
+import unittest
+
+from aiohttp.test_utils import TestServer
+
+from tests.stand_in import PROVIDER_IDS, make_app, make_voices
+from voispark_mcp.api.voices import search_voices
+from voispark_mcp.core.api_request import create_session
+from voispark_mcp.core.cache import invalidate
+from voispark_mcp.core.voice_index import VoiceIndex
+
+
+def _voice(voice_id: str, name: str, description: str, provider: str = "p") -> dict:
+    return {
+        "id": voice_id,
+        "name": name,
+        "description": description,
+        "provider": provider,
+    }
+
+
+def _list(*default_voices: dict, user_voices: tuple = ()) -> dict:
+    return {
+        "default_voices": list(default_voices),
+        "user_voices": list(user_voices),
+        "ip_voices": [],
+    }
+
+
+class TestVoiceIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = VoiceIndex()
+        self.narrator = _voice("v1", "Calm Narrator", "A british storyteller")
+        self.announcer = _voice("v2", "Announcer", "An energetic narrator")
+        self.index.update("p", "tts", _list(self.narrator, self.announcer))
+        self.index.update(
+            "q",
+            "voice_changer",
+            _list(user_voices=(_voice("v3", "Robot", "Metallic", "q"),)),
+        )
+
+    def ids(self, voices: list[dict]) -> list[str]:
+        return [voice["id"] for voice in voices]
+
+    def test_ranking(self):
+        # A name match outranks a description match
+        self.assertEqual(self.ids(self.index.search("narrator")), ["v1", "v2"])
+        # Matching more words ranks higher
+        self.assertEqual(
+            self.ids(self.index.search("narrator energetic announcer"))[0], "v2"
+        )
+        # Prefixes and typos
+        self.assertEqual(self.ids(self.index.search("narr")), ["v1", "v2"])
+        self.assertEqual(self.ids(self.index.search("storyteler")), ["v1"])
+        self.assertEqual(self.index.search("zzz"), [])
+
+    def test_filters_and_lookup(self):
+        self.assertEqual(self.ids(self.index.search(ability="voice_changer")), ["v3"])
+        self.assertEqual(self.ids(self.index.search(provider="p")), ["v2", "v1"])
+        voice = self.index.get("v3")
+        self.assertEqual(
+            (voice["collection"], voice["abilities"]), ("user", ["voice_changer"])
+        )
+        self.assertIsNone(self.index.get("v9"))
+
+    def test_incremental_update(self):
+        self.assertEqual(
+            self.index.update("p", "tts", _list(self.narrator, self.announcer)), 0
+        )
+        renamed = {**self.announcer, "name": "Herald"}
+        self.assertEqual(
+            self.index.update("p", "tts", _list(self.narrator, renamed)), 1
+        )
+        self.assertEqual(self.ids(self.index.search("herald")), ["v2"])
+        self.assertEqual(self.ids(self.index.search("announcer")), [])
+
+        # A voice in several lists has all of their abilities until it leaves one
+        self.index.update("p", "voice_clone", _list(self.narrator))
+        self.assertEqual(self.index.get("v1")["abilities"], ["tts", "voice_clone"])
+        self.index.retain({("p", "tts"), ("q", "voice_changer")})
+        self.assertEqual(self.index.get("v1")["abilities"], ["tts"])
+        self.index.retain(set())
+        self.assertEqual(self.index.stats()["words"], 0)
+        self.assertEqual(self.index.search(), [])
+
+    def test_voice_ids_shared_by_providers(self):
+        clone = _voice("v1", "Deep Baritone", "A low voice", "q")
+        self.index.update("q", "tts", _list(clone))
+        self.assertEqual(self.index.stats()["voices"], 4)
+        # Neither provider's voice overwrites the other's
+        self.assertEqual(self.ids(self.index.search("narrator")), ["v1", "v2"])
+        self.assertEqual(self.index.search("baritone")[0]["provider"], "q")
+        self.assertEqual(
+            [voice["provider"] for voice in self.index.lookup("v1")], ["p", "q"]
+        )
+        self.assertEqual(self.index.get("v1", "q")["name"], "Deep Baritone")
+        self.assertEqual(self.index.get("v1", "p")["abilities"], ["tts"])
+        self.assertEqual(
+            [
+                (voice["provider"], voice["id"])
+                for voice in self.index.search(ability="tts")
+            ],
+            [("p", "v2"), ("p", "v1"), ("q", "v1")],
+        )
+        # Removing one provider's voice keeps the other's
+        self.index.update("q", "tts", _list())
+        self.assertEqual(self.index.lookup("v1"), [self.index.get("v1", "p")])
+        self.assertEqual(self.index.search("baritone"), [])
+
+
+class TestSearchVoices(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = TestServer(make_app(payload_size=50))
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        self.index = VoiceIndex()
+        self.addCleanup(invalidate)
+
+    async def asyncTearDown(self):
+        await self.index.close()
+        await self.session.close()
+        await self.server.close()
+
+    async def test_index_is_built_on_first_search(self):
+        resp = await search_voices(
+            self.index, "minimax voice 7", ability="tts", session=self.session
+        )
+        self.assertEqual(resp["voices"][0]["id"], "minimax-voice-7")
+        self.assertEqual(
+            resp["voices"][0]["abilities"], ["tts", "voice_changer", "voice_clone"]
+        )
+        self.assertEqual(self.index.stats()["voices"], 50 * len(PROVIDER_IDS))
+
+        await self.server.close()
+        resp = await search_voices(
+            self.index, voice_id="cartesia-voice-3", session=self.session
+        )
+        # Looked up in the index, without the server
+        [voice] = resp["voices"]
+        self.assertEqual(voice["name"], make_voices("cartesia", 4)[3]["name"])
+        self.assertEqual(voice["provider"], "cartesia")
+
+    async def test_failed_build(self):
+        await self.server.close()
+        self.assertIsInstance(
+            await search_voices(self.index, session=self.session), str
+        )
@@ -0,0 +1,82 @@
+import asyncio
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tests.stand_in import make_voices
+from voispark_mcp.api.voices import list_voices_of_all_providers
+from voispark_mcp.core.api_request import create_session
+from voispark_mcp.core.cache import invalidate
+from voispark_mcp.msg.voices_msg import AllVoicesListResponse
+
+PROVIDERS = [
+    {"id": "fast", "name": "Fast", "description": "", "abilities": ["tts"]},
+    {"id": "slow", "name": "Slow", "description": "", "abilities": ["tts"]},
+    {"id": "broken", "name": "Broken", "description": "", "abilities": ["tts"]},
+    {"id": "other", "name": "Other", "description": "", "abilities": ["voice_clone"]},
+    {"id": "more", "name": "More", "description": "", "abilities": ["tts"]},
+]
+
+
+class TestVoicesOfAllProviders(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        async def providers(request: web.Request) -> web.Response:
+            data = {"providers": PROVIDERS}
+            return web.json_response({"code": 0, "message": "Success", "data": data})
+
+        async def voices(request: web.Request) -> web.Response:
+            provider = request.match_info["provider_id"]
+            self.requested.append(provider)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(1 if provider == "slow" else 0.02)
+            finally:
+                self.in_flight -= 1
+            if provider == "broken":
+                return web.json_response({"code": 40003, "message": "Unauthorized"})
+            data = {
+                "default_voices": make_voices(provider, 2),
+                "user_voices": make_voices(provider, 1),
+                "ip_voices": [],
+            }
+            return web.json_response({"code": 0, "message": "Success", "data": data})
+
+        app = web.Application()
+        app.router.add_get("/api/voices/providers", providers)
+        app.router.add_get("/api/voices/{provider_id}/list", voices)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        self.addCleanup(invalidate)
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def test_failed_providers_do_not_fail_the_call(self):
+        resp = await list_voices_of_all_providers(
+            "tts", concurrency=2, timeout=0.3, session=self.session
+        )
+        AllVoicesListResponse.model_validate(resp)
+        self.assertCountEqual(self.requested, ["fast", "slow", "broken", "more"])
+        self.assertEqual(self.max_in_flight, 2)
+        self.assertEqual(resp["providers"], ["fast", "more"])
+        self.assertEqual(
+            [failure["provider"] for failure in resp["failed_providers"]],
+            ["slow", "broken"],
+        )
+        self.assertEqual(
+            [voice["id"] for voice in resp["default_voices"]],
+            ["fast-voice-0", "fast-voice-1", "more-voice-0", "more-voice-1"],
+        )
+        self.assertEqual(len(resp["user_voices"]), 2)
+
+    async def test_voice_type_without_providers(self):
+        resp = await list_voices_of_all_providers("voice_changer", session=self.session)
+        self.assertEqual((resp["providers"], resp["default_voices"]), ([], []))
@@ -0,0 +1,84 @@
+import asyncio
+import sys
+import unittest
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tests.stand_in import make_app
+from voispark_mcp.core.api_request import create_session
+from voispark_mcp.core.cache import cache_stats, invalidate
+from voispark_mcp.main import _CATALOGS, _warm_up
+
+# The package exports the entry point as `main`, shadowing the module
+main = sys.modules["voispark_mcp.main"]
+
+
+class TestWarmUp(unittest.IsolatedAsyncioTestCase):
+    async def start(self, app: web.Application):
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.session = create_session(str(self.server.make_url("/")))
+        self.addAsyncCleanup(self.server.close)
+        self.addAsyncCleanup(self.session.close)
+        self.addCleanup(invalidate)
+
+    async def test_catalogs_are_read_concurrently(self):
+        await self.start(make_app(latency=0.2))
+        # Read one after another, the catalogs would take 1.2s
+        pending = await _warm_up(self.session, timeout=1)
+        self.assertEqual(pending, set())
+        self.assertTrue(all(cache_stats()[name]["size"] for name in _CATALOGS))
+
+    async def test_slow_catalogs_finish_in_the_background(self):
+        await self.start(make_app(latency=0.2))
+        pending = await _warm_up(self.session, timeout=0.05)
+        self.assertEqual(len(pending), len(_CATALOGS))
+        for task in pending:
+            await task
+        self.assertTrue(all(cache_stats()[name]["size"] for name in _CATALOGS))
+
+    async def test_startup_does_not_wait_by_default(self):
+        await self.start(make_app(latency=0.2))
+        pending = await _warm_up(self.session, timeout=0)
+        self.assertEqual(len(pending), len(_CATALOGS))
+        await asyncio.gather(*pending)
+        self.assertTrue(all(cache_stats()[name]["size"] for name in _CATALOGS))
+
+    async def test_failures_are_logged(self):
+        async def unauthorized(request: web.Request) -> web.Response:
+            return web.json_response({"code": 40003, "message": "Unauthorized"})
+
+        app = web.Application()
+        app.router.add_get("/{path:.*}", unauthorized)
+        await self.start(app)
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertEqual(await _warm_up(self.session, timeout=1), set())
+        self.assertEqual(len(logs.records), len(_CATALOGS))
+        self.assertFalse(any(cache_stats()[name]["size"] for name in _CATALOGS))
+
+
+class TestAppContext(unittest.IsolatedAsyncioTestCase):
+    @mock.patch.object(main, "WARMUP", False)
+    async def test_client_sessions_share_the_context(self):
+        self.addAsyncCleanup(main._close_context)
+        async with main.app_lifespan(main.mcp) as first:
+            pass
+        async with main.app_lifespan(main.mcp) as second:
+            self.assertIs(second, first)
+        self.assertFalse(first.session.closed)
+        await main._close_context()
+        self.assertTrue(first.session.closed)
+        self.assertTrue(first.download_session.closed)
+
+    @mock.patch.object(main, "RESULT_CACHE", True)
+    async def test_failed_result_cache_leaves_nothing_open(self):
+        with (
+            mock.patch.object(main, "ResultCache", side_effect=OSError("read-only")),
+            mock.patch.object(main, "create_session") as create_session,
+        ):
+            with self.assertRaises(OSError):
+                await main._open_context()
+        create_session.assert_not_called()
+        self.assertIsNone(main._context)